@@ -1,113 +1,181 @@
 import os
 import time
-import csv
 import random
 import shutil
-from minio import Minio, S3Error
-
-# Configuration for MinIO (single region scenario)
-region1 = Minio("localhost:9001", access_key="minioadmin", secret_key="minioadmin", secure=False)
+from access_verifier import verify_bucket
+from backup_store import open_backup_store, DEFAULT_BACKUP_FORMAT
+from bulk_ops import clear_bucket, delete_objects, list_bucket, listing_cache, upload_directory
+from dataset_generator import generate_dataset, DEFAULT_SEED
+from instant_recovery import (AccessCounter, RecoveryReader, SkewedReadLoad, access_stats_path, restore_order,
+                              primary_share_seconds)
+from integrity_manifest import IntegrityManifest, verify_region, verify_store, manifest_path
+from object_bundler import plan_bundles, fetch_bundle, DEFAULT_BUNDLE_SIZE
+from multipart_transfer import multipart_download, finish_download, LARGE_OBJECT_THRESHOLD
+from replication_engine import TransferStats
+from restore_pipeline import BackgroundRestore, parallel_restore, DEFAULT_WORKERS
+from results_store import record_results
+from storage_backend import make_region_client
+from topology import load_topology
+from tracing import Tracer
+from write_workload import WriteWorkload
+
+# Single-region scenario on the primary region of the topology (see topology.py)
+primary_region = load_topology().primary
+primary = make_region_client(primary_region.endpoint)
 
 bucket_name = "test-bucket"
-sample_data_dir = "./sample_data"
 backup_dir = "./backups"
 
-def clean_up_data_dir():
-    if os.path.exists(sample_data_dir):
-        shutil.rmtree(sample_data_dir)
-
-def clean_up_backup_dir():
+def clean_up_backup_dir(backup_dir=backup_dir):
     if os.path.exists(backup_dir):
         shutil.rmtree(backup_dir)
 
-def generate_large_dataset(num_files=100, min_kb=10, max_kb=1024):
-    """Generate a dataset with a range of file sizes."""
-    print(f"Generating {num_files} files with sizes between {min_kb}KB and {max_kb}KB...")
-    os.makedirs(sample_data_dir, exist_ok=True)
-    for i in range(num_files):
-        filename = f"file_{i+1}.txt"
-        size_kb = random.randint(min_kb, max_kb)
-        file_path = os.path.join(sample_data_dir, filename)
-        content = ("X" * (size_kb * 1024))
-        with open(file_path, "w") as f:
-            f.write(content)
-    print("Dataset generation completed.")
-
-def upload_files(region_client, bucket_name, directory):
-    """Upload generated files to a given bucket."""
-    print(f"Uploading files to bucket: {bucket_name}")
-    if not region_client.bucket_exists(bucket_name):
-        region_client.make_bucket(bucket_name)
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        region_client.fput_object(bucket_name, filename, file_path)
-    print("Upload completed.")
-
-def create_partial_backup(region_client, bucket_name, backup_fraction=0.5):
-    """Create a partial backup of a fraction of the files."""
+def generate_large_dataset(num_files=100, min_kb=10, max_kb=1024, seed=DEFAULT_SEED, distribution="uniform",
+                           profile="repetitive"):
+    """Generate (or reuse from the cache) a dataset with a range of file sizes; return its directory."""
+    return generate_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution, profile=profile)
+
+def create_partial_backup(region_client, bucket_name, backup_fraction=0.5, backup_format=DEFAULT_BACKUP_FORMAT,
+                          backup_dir=backup_dir, bundle_threshold=0, bundle_size=DEFAULT_BUNDLE_SIZE):
+    """Create a partial backup of a fraction of the files; return (files, bytes, failures).
+
+    With bundle_threshold > 0, objects below it are downloaded in bundles of about
+    bundle_size bytes whose GETs overlap instead of one round trip after another.
+    """
     print(f"Creating a partial backup for bucket: {bucket_name} at fraction: {backup_fraction}")
     os.makedirs(backup_dir, exist_ok=True)
-    objects = list(region_client.list_objects(bucket_name, recursive=True))
+    objects = list(listing_cache.get(region_client, bucket_name))
     random.shuffle(objects)
     backup_count = int(len(objects) * backup_fraction)
     objects_to_backup = objects[:backup_count]
 
-    backed_up_files = 0
-    for obj in objects_to_backup:
+    store = open_backup_store(backup_format, backup_dir)
+    backed_up_files = backed_up_bytes = 0
+    bundles, singles = plan_bundles(objects_to_backup, bundle_threshold, bundle_size) if bundle_threshold \
+        else ([], objects_to_backup)
+    for bundle in bundles:
+        to_fetch = [obj for obj in bundle if not store.reuse(obj.object_name, obj.etag, obj.size)]
         try:
-            data = region_client.get_object(bucket_name, obj.object_name)
-            backup_file_path = os.path.join(backup_dir, obj.object_name)
-            with open(backup_file_path, "wb") as backup_file:
-                for d in data.stream(32 * 1024):
-                    backup_file.write(d)
+            entries = fetch_bundle(region_client, bucket_name, [obj.object_name for obj in to_fetch])
+        except Exception as e:
+            print(f"Failed to back up a bundle of {len(to_fetch)} files: {e}")
+            bundle = [obj for obj in bundle if obj not in to_fetch]
+            entries = []
+        etags = {obj.object_name: obj.etag for obj in to_fetch}
+        for name, data in entries:
+            store.add(name, [data], etag=etags[name])
+        backed_up_files += len(bundle)
+        backed_up_bytes += sum(obj.size or 0 for obj in bundle)
+    for obj in singles:
+        try:
+            # Objects unchanged since the previous backup are carried over without a download
+            if not store.reuse(obj.object_name, obj.etag, obj.size):
+                if (obj.size or 0) >= LARGE_OBJECT_THRESHOLD:
+                    # Large objects download as parallel ranges into a checkpointed spool file,
+                    # so an interrupted backup resumes them from the last completed part
+                    spool_path = multipart_download(region_client, bucket_name, obj.object_name, obj.size, obj.etag)
+                    with open(spool_path, "rb") as f:
+                        store.add(obj.object_name, iter(lambda: f.read(32 * 1024), b""), etag=obj.etag)
+                    finish_download(spool_path)
+                else:
+                    data = region_client.get_object(bucket_name, obj.object_name)
+                    try:
+                        store.add(obj.object_name, data.stream(32 * 1024), etag=obj.etag)
+                    finally:
+                        data.close()
+                        data.release_conn()
             backed_up_files += 1
+            backed_up_bytes += obj.size or 0
         except Exception as e:
             print(f"Failed to back up {obj.object_name}: {e}")
+    store.close()
     print(f"Partial backup completed! {backed_up_files}/{len(objects_to_backup)} files backed up.")
+    return backed_up_files, backed_up_bytes, len(objects_to_backup) - backed_up_files
 
 def simulate_partial_failure(region_client, bucket_name, deletion_fraction=0.5):
-    """Simulate accidental deletion of a fraction of the files."""
+    """Simulate accidental deletion of a fraction of the files; return how many were deleted."""
     print(f"Simulating partial failure by deleting {deletion_fraction*100}% of files...")
-    objects = list(region_client.list_objects(bucket_name, recursive=True))
+    objects = listing_cache.get(region_client, bucket_name)
     failure_count = int(len(objects) * deletion_fraction)
     objects_to_delete = random.sample(objects, failure_count)
 
-    for obj in objects_to_delete:
-        region_client.remove_object(bucket_name, obj.object_name)
-    print(f"Deleted {failure_count} files.")
+    deleted = delete_objects(region_client, bucket_name, [obj.object_name for obj in objects_to_delete])
+    print(f"Deleted {deleted} files.")
+    return deleted
 
 def measure_access_time(region_client, bucket_name):
     """Measure how long it takes to read all files currently in the bucket."""
-    start_time = time.time()
-    objects = list(region_client.list_objects(bucket_name, recursive=True))
-    accessible_count = 0
-    for obj in objects:
-        try:
-            data = region_client.get_object(bucket_name, obj.object_name)
-            data.read()
-            accessible_count += 1
-        except S3Error as e:
-            print(f"Failed to access {obj.object_name}: {e}")
-    end_time = time.time()
-    duration = end_time - start_time
-    return accessible_count, duration
-
-def restore_from_backup(region_client, bucket_name):
-    """Restore files from backup directory to the bucket."""
+    report = verify_bucket(region_client, bucket_name)
+    for object_name, error in report.failed:
+        print(f"Failed to access {object_name}: {error}")
+    print(f"Access check: {report.describe()}")
+    return report.accessible, report.elapsed, report
+
+def restore_from_backup(region_client, bucket_name, backup_format=DEFAULT_BACKUP_FORMAT, object_names=None,
+                        workers=DEFAULT_WORKERS, backup_dir=backup_dir, bundle_threshold=0,
+                        bundle_size=DEFAULT_BUNDLE_SIZE):
+    """Restore files (or only object_names) from the backup store to the bucket.
+
+    bundle_threshold and bundle_size bundle small objects as in parallel_restore.
+    Returns (recovery time, TransferStats).
+    """
     print("Restoring from backup...")
     start_time = time.time()
-    for filename in os.listdir(backup_dir):
-        file_path = os.path.join(backup_dir, filename)
-        region_client.fput_object(bucket_name, filename, file_path)
+    store = open_backup_store(backup_format, backup_dir)
+    if workers > 1:
+        stats = parallel_restore(region_client, bucket_name, store, object_names=object_names, workers=workers,
+                                 bundle_threshold=bundle_threshold, bundle_size=bundle_size)
+        print(f"Restored {stats.summary()}")
+    else:
+        stats = TransferStats()
+        for object_name, size, reader in store.iter_objects(object_names):
+            # Stream each object out of the store instead of buffering whole files
+            with reader:
+                result = region_client.put_object(bucket_name, object_name, reader, length=size)
+            stats.record_success(object_name, size, getattr(result, "etag", None), 1)
+        stats.finish()
     end_time = time.time()
     recovery_time = end_time - start_time
     print(f"Restoration completed! Recovery Time (restore phase): {recovery_time:.2f} seconds")
-    return recovery_time
-
-def calculate_rpo(region_client, bucket_name, original_file_count):
-    # Count how many files are currently in the bucket
-    objects_after_recovery = list(region_client.list_objects(bucket_name, recursive=True))
-    recovered_count = len(objects_after_recovery)
+    return recovery_time, stats
+
+def instant_restore(region_client, bucket_name, backup_format=DEFAULT_BACKUP_FORMAT, counts=None, priority="access",
+                    workers=DEFAULT_WORKERS, backup_dir=backup_dir, start_reads=None):
+    """Restore the objects missing from the bucket in the background while reads are served.
+
+    Reads go through a RecoveryReader that answers misses from the backup store and
+    promotes them in the restore queue; the rest is restored in restore_order
+    (most-read first by default). Objects the bucket still has are not rewritten.
+    start_reads(reader) may start a read load once the read path is up.
+    Returns (recovery time, TransferStats, reader).
+    """
+    print(f"Instant recovery: serving reads from the backup while restoring (priority: {priority})...")
+    start_time = time.time()
+    store = open_backup_store(backup_format, backup_dir)
+    present = {obj.object_name for obj in list_bucket(region_client, bucket_name)}
+    missing = [name for name in store.object_names() if name not in present]
+    sizes = {name: store.object_size(name) for name in missing}
+    restore = BackgroundRestore(region_client, bucket_name, store, restore_order(missing, sizes, counts, priority),
+                                workers=workers)
+    reader = RecoveryReader(region_client, bucket_name, store, on_miss=restore.promote)
+    if start_reads is not None:
+        start_reads(reader)
+    stats = restore.start().wait()
+    recovery_time = time.time() - start_time
+    print(f"Restored {stats.summary()}; {restore.promoted} objects promoted by reads")
+    print(f"Instant recovery completed! Full restore in {recovery_time:.2f} seconds")
+    return recovery_time, stats, reader
+
+def calculate_rpo(region_client, bucket_name, original_file_count, original_names=None, integrity=None):
+    if integrity is not None:
+        # Only copies that match the upload manifest count as recovered
+        recovered_count = integrity.intact
+    else:
+        # Count how many files (of original_names, if given) are currently in the bucket
+        objects_after_recovery = listing_cache.get(region_client, bucket_name)
+        if original_names is not None:
+            objects_after_recovery = [obj for obj in objects_after_recovery if obj.object_name in original_names]
+        recovered_count = len(objects_after_recovery)
     data_loss_count = original_file_count - recovered_count
 
     # Calculate RPO as percentage of data restored
@@ -119,115 +187,205 @@ def calculate_rpo(region_client, bucket_name, original_file_count):
     print(f"Original file count: {original_file_count}")
     print(f"Recovered file count: {recovered_count}")
     print(f"Data loss (files not recovered): {data_loss_count}")
+    if integrity is not None:
+        print(f"Of which corrupt: {len(integrity.corrupt)}, stale: {len(integrity.stale)}, "
+              f"missing: {len(integrity.missing)}")
     print(f"RPO (Data Restored): {restored_percentage:.2f}%")
 
     return restored_percentage
 
-def clear_bucket(region_client, bucket_name):
-    """Clean up the bucket to prepare for the next test."""
-    if region_client.bucket_exists(bucket_name):
-        objects = region_client.list_objects(bucket_name, recursive=True)
-        for obj in objects:
-            region_client.remove_object(bucket_name, obj.object_name)
-        region_client.remove_bucket(bucket_name)
-
-def log_results_to_csv(filename, scenario_name, num_files, min_kb, max_kb, backup_fraction, deletion_fraction, rto, baseline_time, rpo_percentage):
-    header = [
-        "scenario_name", 
-        "num_files", 
-        "min_file_kb", 
-        "max_file_kb", 
-        "backup_fraction", 
-        "deletion_fraction", 
-        "RTO_seconds", 
-        "baseline_access_time_seconds",
-        "RPO_data_restored_percentage"
-    ]
-    row = [
-        scenario_name, 
-        num_files, 
-        min_kb, 
-        max_kb, 
-        backup_fraction, 
-        deletion_fraction, 
-        rto, 
-        baseline_time,
-        rpo_percentage
-    ]
-
-    file_exists = os.path.exists(filename)
-    with open(filename, 'a', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(header)
-        writer.writerow(row)
-
-def run_automated_backup_test(num_files=100, min_kb=10, max_kb=1024, backup_fraction=0.75, deletion_fraction=0.5):
-    """Run one automated backup test scenario with RPO measurement."""
+def run_automated_backup_test(num_files=100, min_kb=10, max_kb=1024, backup_fraction=0.75, deletion_fraction=0.5,
+                              backup_format=DEFAULT_BACKUP_FORMAT, seed=DEFAULT_SEED, distribution="uniform",
+                              profile="repetitive", bucket_name=bucket_name, backup_dir=backup_dir, write_rate=0.0,
+                              write_size_mix=None, verify="full", cprofile_phase=None, bundle_threshold_kb=0,
+                              bundle_size_mb=DEFAULT_BUNDLE_SIZE // (1024 * 1024), recovery="restore", read_threads=0,
+                              read_seconds=2.0, read_skew=1.0, restore_priority="access", matrix_name=None):
+    """Run one automated backup test scenario with RPO measurement; return its headline metrics.
+
+    With write_rate > 0 a live workload keeps writing from before the backup until the
+    deletion, and acknowledged writes missing after the restore are reported as a time window.
+    The backup is hashed against the upload manifest, and the restored bucket is checked
+    with verify ("full" hashes every object, "etag" trusts conclusive listing ETags); only intact objects count toward RPO. Every phase is
+    traced (see tracing.py); cprofile_phase names one to run under cProfile. With
+    bundle_threshold_kb > 0, backup and restore move smaller objects in bundles of
+    about bundle_size_mb.
+
+    recovery="instant" serves reads from the backup while the restore runs in the
+    background, most-read objects first (restore_priority "access", "size" or an
+    explicit list / file of names). With read_threads > 0, that many readers with
+    Zipf(read_skew) popularity run for read_seconds before the failure to record
+    access counts and keep reading during recovery, to measure the time to the
+    first servable read of a lost object; the time until 99% of the recoverable
+    read traffic is served from the primary is reported either way.
+    """
     scenario_name = "Automated Backup and Restore Scenario"
+    tracer = Tracer(bucket_name, cprofile_phase=cprofile_phase)
     
     # Clean up from previous runs
-    clean_up_data_dir()
-    clean_up_backup_dir()
-    clear_bucket(region1, bucket_name)
-
-    # Step 1: Generate data
-    generate_large_dataset(num_files, min_kb, max_kb)
-
-    # Step 2: Upload to region1
-    upload_files(region1, bucket_name, sample_data_dir)
-    original_objects = list(region1.list_objects(bucket_name, recursive=True))
-    original_file_count = len(original_objects)
+    with tracer.span("cleanup"):
+        clean_up_backup_dir(backup_dir)
+        clear_bucket(primary, bucket_name)
+
+    # Step 1: Generate data (cached datasets are reused across runs)
+    with tracer.span("generate"):
+        data_dir = generate_large_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution,
+                                          profile=profile)
+
+    # Step 2: Upload to the primary
+    with tracer.span("upload") as span:
+        manifest = IntegrityManifest()
+        uploaded_files, uploaded_bytes = upload_directory(primary, bucket_name, data_dir, manifest)
+        manifest.save(manifest_path(bucket_name))
+        span.add(bytes=uploaded_bytes, objects=uploaded_files)
+    with tracer.span("list") as span:
+        listing_cache.invalidate(primary, bucket_name)
+        original_objects = listing_cache.get(primary, bucket_name)
+        original_file_count = len(original_objects)
+        span.add(objects=original_file_count)
 
     # Step 3: Measure baseline access time
-    baseline_accessible, baseline_time = measure_access_time(region1, bucket_name)
+    with tracer.span("baseline_read") as span:
+        baseline_accessible, baseline_time, baseline_report = measure_access_time(primary, bucket_name)
+        span.add(bytes=baseline_report.bytes, objects=baseline_accessible, errors=len(baseline_report.failed),
+                 listing_seconds=baseline_report.listing_seconds)
     print(f"Baseline: Accessed {baseline_accessible}/{num_files} files in {baseline_time:.2f}s.")
 
-    # Step 4: Create a partial backup
-    create_partial_backup(region1, bucket_name, backup_fraction=backup_fraction)
+    # Record how often each object is read, to prioritise the restore
+    original_names = [obj.object_name for obj in original_objects]
+    if read_threads:
+        with tracer.span("access_record") as span:
+            counter = AccessCounter()
+            access_load = SkewedReadLoad(RecoveryReader(primary, bucket_name, counter=counter), original_names,
+                                         read_threads, read_skew, seed).start()
+            time.sleep(read_seconds)
+            access_load.stop()
+            counter.save(access_stats_path(bucket_name))
+            span.add(objects=len(access_load.reads))
+    else:
+        counter = AccessCounter.load(access_stats_path(bucket_name))
+
+    # Step 4: Create a partial backup (while the live workload, if any, keeps writing)
+    workload = None
+    if write_rate:
+        workload = WriteWorkload(primary, bucket_name, rate=write_rate, seed=seed,
+                                 **({"size_mix": write_size_mix} if write_size_mix else {})).start()
+        listing_cache.invalidate(primary, bucket_name)
+    with tracer.span("backup") as span:
+        backed_up_files, backed_up_bytes, backup_failures = create_partial_backup(
+            primary, bucket_name, backup_fraction=backup_fraction, backup_format=backup_format, backup_dir=backup_dir,
+            bundle_threshold=bundle_threshold_kb * 1024, bundle_size=bundle_size_mb * 1024 * 1024)
+        span.add(bytes=backed_up_bytes, objects=backed_up_files, errors=backup_failures)
+    with tracer.span("backup_integrity") as span:
+        store = open_backup_store(backup_format, backup_dir)
+        backup_integrity = verify_store(store, manifest,
+                                        object_names=[n for n in store.object_names() if n in manifest.entries])
+        span.add(bytes=backup_integrity.hashed_bytes, objects=backup_integrity.intact,
+                 errors=backup_integrity.expected - backup_integrity.intact)
+    print(f"Backup integrity: {backup_integrity.describe()}")
 
     # Step 5: Simulate partial failure
-    simulate_partial_failure(region1, bucket_name, deletion_fraction=deletion_fraction)
+    failure_time = time.time()
+    if workload is not None:
+        workload.stop()
+        # The workload's writes are part of what the failure can hit
+        listing_cache.invalidate(primary, bucket_name)
+    with tracer.span("fault") as span:
+        span.add(objects=simulate_partial_failure(primary, bucket_name, deletion_fraction=deletion_fraction))
+        remaining = {obj.object_name for obj in listing_cache.get(primary, bucket_name)}
+        lost = [name for name in original_names if name not in remaining]
 
     # Step 6: Restore from backup and measure RTO
+    read_load = None
+
+    def start_reads(reader):
+        nonlocal read_load
+        if read_threads:
+            read_load = SkewedReadLoad(reader, original_names, read_threads, read_skew, seed).start()
+
     start_rto = time.time()
-    restore_from_backup(region1, bucket_name)
-    post_restore_accessible, _ = measure_access_time(region1, bucket_name)
+    recovery_start = time.monotonic()
+    with tracer.span("restore") as span:
+        if recovery == "instant":
+            restore_time, restore_stats, recovery_reader = instant_restore(
+                primary, bucket_name, backup_format=backup_format, counts=counter.counts, priority=restore_priority,
+                backup_dir=backup_dir, start_reads=start_reads)
+        else:
+            # Without instant recovery, readers only see what the restore has already written
+            recovery_reader = RecoveryReader(primary, bucket_name)
+            start_reads(recovery_reader)
+            restore_time, restore_stats = restore_from_backup(primary, bucket_name, backup_format=backup_format,
+                                                              backup_dir=backup_dir,
+                                                              bundle_threshold=bundle_threshold_kb * 1024,
+                                                              bundle_size=bundle_size_mb * 1024 * 1024)
+        span.add(bytes=restore_stats.bytes, objects=restore_stats.objects, errors=len(restore_stats.failed),
+                 retries=restore_stats.retries)
+    if read_load is not None:
+        read_load.stop()
+    first_servable = read_load.first_read_of(lost, recovery_start) if read_load is not None else None
+    primary_99 = primary_share_seconds(original_names, lost, restore_stats.completed_at, counter.counts,
+                                       recovery_start)
+    print(f"Recovery reads: {recovery_reader.primary_reads} from primary, {recovery_reader.backup_reads} from backup, "
+          f"{recovery_reader.failed_reads} failed; first servable read of a lost object after "
+          f"{'-' if first_servable is None else f'{first_servable:.3f}s'}, 99% of reads served from primary after "
+          f"{'-' if primary_99 is None else f'{primary_99:.2f}s'}")
+    with tracer.span("verify") as span:
+        post_restore_accessible, verification_time, verification_report = measure_access_time(primary, bucket_name)
+        span.add(bytes=verification_report.bytes, objects=post_restore_accessible,
+                 errors=len(verification_report.failed), listing_seconds=verification_report.listing_seconds)
     end_rto = time.time()
     rto = end_rto - start_rto
-    print(f"RTO measured as the time from start of restore to all accessible: {rto:.2f}s.")
-
-    # Step 7: Calculate RPO
-    rpo_percentage = calculate_rpo(region1, bucket_name, original_file_count)
-
-    # Step 8: Log results
-    log_results_to_csv("backup_results_r.csv", scenario_name, num_files, min_kb, max_kb, backup_fraction, deletion_fraction, rto, baseline_time, rpo_percentage)
-
-    # Cleanup data on the host machine
-    clean_up_data_dir()
-    clean_up_backup_dir()
-
-    print(f"Test scenario completed. RTO: {rto:.2f}s, RPO: {rpo_percentage:.2f}%. Check backup_results_r.csv for recorded metrics.\n\n")
+    print(f"RTO measured as the time from start of restore to all accessible: {rto:.2f}s "
+          f"(restore {restore_time:.2f}s, verification {verification_time:.2f}s).")
+
+    # Step 7: Verify the restored bucket against the upload manifest and calculate RPO
+    with tracer.span("integrity") as span:
+        integrity = verify_region(primary, bucket_name, manifest, mode=verify)
+        span.add(bytes=integrity.hashed_bytes, objects=integrity.intact, errors=integrity.expected - integrity.intact)
+    print(f"{primary_region.name} integrity: {integrity.describe()}")
+    rpo_percentage = calculate_rpo(primary, bucket_name, original_file_count, integrity=integrity)
+    loss = None
+    if workload is not None:
+        with tracer.span("loss_analysis"):
+            loss = workload.analyze_loss(primary, bucket_name, failure_time)
+
+    # Step 8: Record results
+    metrics = {"RTO_seconds": rto, "RPO_data_restored_percentage": rpo_percentage,
+               "baseline_access_time_seconds": baseline_time, "restore_seconds": restore_time,
+               "verification_seconds": verification_time, "first_servable_read_seconds": first_servable,
+               "primary_99_seconds": primary_99, "recovery_primary_reads": recovery_reader.primary_reads,
+               "recovery_backup_reads": recovery_reader.backup_reads,
+               "recovery_failed_reads": recovery_reader.failed_reads}
+    metrics.update(integrity.metrics())
+    metrics.update(backup_integrity.metrics("backup_"))
+    if loss is not None:
+        metrics.update(loss)
+    params = {"num_files": num_files, "min_kb": min_kb, "max_kb": max_kb, "backup_fraction": backup_fraction,
+              "deletion_fraction": deletion_fraction, "backup_format": backup_format, "seed": seed,
+              "distribution": distribution, "profile": profile, "bucket_name": bucket_name,
+              "write_rate": write_rate, "write_size_mix": write_size_mix, "verify": verify,
+              "bundle_threshold_kb": bundle_threshold_kb, "bundle_size_mb": bundle_size_mb, "recovery": recovery,
+              "read_threads": read_threads, "read_seconds": read_seconds, "read_skew": read_skew,
+              "restore_priority": restore_priority}
+    latencies = {"baseline_ttfb": baseline_report.ttfb.summary(), "baseline_read": baseline_report.full_read.summary(),
+                 "verify_ttfb": verification_report.ttfb.summary(), "verify_read": verification_report.full_read.summary()}
+    if read_load is not None:
+        latencies["recovery_read"] = recovery_reader.latency.summary()
+    tracer.save(params)
+    record_results("backup", scenario_name, params, metrics, tracer.phases(), latencies, matrix_name=matrix_name)
+
+    # Cleanup backups on the host machine
+    clean_up_backup_dir(backup_dir)
+
+    print(f"Test scenario completed. RTO: {rto:.2f}s, RPO: {rpo_percentage:.2f}%. Check results.db for recorded metrics.\n\n")
+    return metrics
 
 def main():
-    # Multiple test cases with different parameters
-
-    # 1. Small number of files, high backup fraction, moderate deletion
-    run_automated_backup_test(num_files=100, min_kb=10, max_kb=50, backup_fraction=0.75, deletion_fraction=0.5)
-
-    # 2. More files, smaller backup fraction (less coverage), and moderate deletion
-    run_automated_backup_test(num_files=500, min_kb=10, max_kb=1024, backup_fraction=0.5, deletion_fraction=0.5)
-
-    # 3. Even more files, very high backup fraction, larger sizes
-    run_automated_backup_test(num_files=1000, min_kb=50, max_kb=1024, backup_fraction=0.9, deletion_fraction=0.5)
-
-    # 4. Medium number of files, small backup fraction (test minimal backups)
-    run_automated_backup_test(num_files=500, min_kb=10, max_kb=512, backup_fraction=0.25, deletion_fraction=0.5)
-
-    # 5. Smaller dataset but high deletion fraction (80% deletion)
-    run_automated_backup_test(num_files=100, min_kb=10, max_kb=100, backup_fraction=0.75, deletion_fraction=0.8)
+    # The backup scenarios are declared in the scenario matrix and run in parallel, each in its own bucket
+    from scenario_runner import load_matrix, run_matrix, DEFAULT_MATRIX_PATH
+    run_matrix(load_matrix(DEFAULT_MATRIX_PATH), scenario_type="backup",
+               runners={"backup": run_automated_backup_test})
 
-    print("All backup test scenarios have been executed. Review backup_results.csv for comparisons.")
+    print("All backup test scenarios have been executed. Compare them with: python scripts/results_store.py summary --type backup")
 
 if __name__ == "__main__":
     main()
@@ -1,114 +1,102 @@
-import os
 import time
-import csv
-import random
-import shutil
-from minio import Minio, S3Error
+from access_verifier import verify_bucket
+from bulk_ops import clear_bucket, list_bucket, upload_directory
+from dataset_generator import generate_dataset, DEFAULT_SEED
+from failover_client import FailoverClient, ReadLoad, RESET_TIMEOUT
+from fault_injection import FaultInjector, FaultInjectionError, make_fault
+from integrity_manifest import IntegrityManifest, verify_region, manifest_path
+from object_bundler import DEFAULT_BUNDLE_SIZE
+from readiness_tracker import ReadinessTracker, DEFAULT_READY_TIMEOUT, MAX_POLL_INTERVAL
+from replication_daemon import ReplicationDaemon
+from replication_engine import replicate_bucket, DEFAULT_WORKERS
+from replication_manifest import replicate_incremental, DEFAULT_MANIFEST_PATH
+from results_store import record_results
+from storage_backend import make_region_client
+from topology import load_topology
+from tracing import Tracer
+from write_workload import WriteWorkload
 
-# Configuration for MinIO Clients
-region1 = Minio("localhost:9001", access_key="minioadmin", secret_key="minioadmin", secure=False)
-region2 = Minio("localhost:9002", access_key="minioadmin", secret_key="minioadmin", secure=False)
+# Regions from the topology (see topology.py): the primary fails over to the nearest secondary
+topology = load_topology()
+if len(topology.regions) < 2:
+    raise ValueError("A geo-failover test needs at least two regions in the topology")
+primary_region, secondary_region = topology.primary, topology.failover_order()[0]
+primary = make_region_client(primary_region.endpoint)
+secondary = make_region_client(secondary_region.endpoint)
 
 bucket_name = "test-bucket"
-sample_data_dir = "./sample_data"
-
-def clean_up_data_dir():
-    if os.path.exists(sample_data_dir):
-        shutil.rmtree(sample_data_dir)
-
-def generate_large_dataset(num_files=100, min_kb=10, max_kb=1024):
-    """Generate a dataset with a range of file sizes."""
-    print(f"Generating {num_files} files with sizes between {min_kb}KB and {max_kb}KB...")
-    os.makedirs(sample_data_dir, exist_ok=True)
-    for i in range(num_files):
-        filename = f"file_{i+1}.txt"
-        size_kb = random.randint(min_kb, max_kb)
-        file_path = os.path.join(sample_data_dir, filename)
-        content = ("X" * (size_kb * 1024))
-        with open(file_path, "w") as f:
-            f.write(content)
-    print("Dataset generation completed.")
-
-def upload_files(region_client, bucket_name, directory):
-    """Upload generated files to a given bucket in a given region."""
-    print(f"Uploading files to bucket: {bucket_name}")
-    if not region_client.bucket_exists(bucket_name):
-        region_client.make_bucket(bucket_name)
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        region_client.fput_object(bucket_name, filename, file_path)
-    print("Upload completed.")
-
-def replicate_files(source_client, target_client, bucket_name):
+injector = FaultInjector()
+
+def generate_large_dataset(num_files=100, min_kb=10, max_kb=1024, seed=DEFAULT_SEED, distribution="uniform",
+                           profile="repetitive"):
+    """Generate (or reuse from the cache) a dataset with a range of file sizes; return its directory."""
+    return generate_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution, profile=profile)
+
+def replicate_files(source_client, target_client, bucket_name, workers=DEFAULT_WORKERS, incremental=False,
+                    manifest_path=DEFAULT_MANIFEST_PATH, propagate_deletes=False, bundle_threshold=0,
+                    bundle_size=DEFAULT_BUNDLE_SIZE):
     """Replicate files from source region to target region."""
-    print("Replicating files from Region 1 to Region 2...")
-    if not target_client.bucket_exists(bucket_name):
-        target_client.make_bucket(bucket_name)
-    objects = source_client.list_objects(bucket_name, recursive=True)
-    for obj in objects:
-        data = source_client.get_object(bucket_name, obj.object_name)
-        target_client.put_object(bucket_name, obj.object_name, data, length=-1, part_size=10*1024*1024)
+    print(f"Replicating files from {primary_region.name} to {secondary_region.name}...")
+    if incremental:
+        stats = replicate_incremental(source_client, target_client, bucket_name, manifest_path=manifest_path,
+                                      propagate_deletes=propagate_deletes, workers=workers,
+                                      bundle_threshold=bundle_threshold, bundle_size=bundle_size)
+    else:
+        stats = replicate_bucket(source_client, target_client, bucket_name, workers=workers,
+                                 bundle_threshold=bundle_threshold, bundle_size=bundle_size)
     print("Replication completed.")
+    return stats
 
 def measure_access_time(region_client, bucket_name):
     """Measure how long it takes to read all files from a given region once."""
-    start_time = time.time()
-    objects = list(region_client.list_objects(bucket_name, recursive=True))
-    accessible_count = 0
-    for obj in objects:
-        try:
-            data = region_client.get_object(bucket_name, obj.object_name)
-            data.read()  # Confirm the object is readable
-            accessible_count += 1
-        except S3Error as e:
-            print(f"Failed to access {obj.object_name}: {e}")
-    end_time = time.time()
-    duration = end_time - start_time
-    return accessible_count, duration
-
-def simulate_outage():
-    """Simulate Region 1 outage by stopping the docker container."""
-    print("Simulating Region 1 outage...")
-    # Adjust the container name as per your docker-compose setup
-    os.system("docker stop minio-region1")
-    print("Region 1 is now offline.")
-
-def restore_region():
-    """Restore Region 1 after the test."""
-    print("Restarting Region 1 container...")
-    os.system("docker start minio-region1")
-    print("Region 1 is back online.")
-
-def measure_rto_from_region2(bucket_name, expected_file_count, poll_interval=5):
-    """Measure how long it takes for Region 2 to serve all files after Region 1 goes down."""
-    print("Measuring RTO from Region 2...")
-    start_time = time.time()
-    while True:
-        objects = list(region2.list_objects(bucket_name, recursive=True))
-        accessible_files = 0
-        for obj in objects:
-            try:
-                data = region2.get_object(bucket_name, obj.object_name)
-                data.read()  
-                accessible_files += 1
-            except:
-                pass
-        if accessible_files == expected_file_count:
-            break
-        print(f"Accessible Files: {accessible_files}/{expected_file_count}, waiting {poll_interval}s...")
-        time.sleep(poll_interval)
-    end_time = time.time()
-    rto = end_time - start_time
-    print(f"All files accessible from Region 2. RTO: {rto:.2f} seconds")
-    return rto
-
-def clear_bucket(region_client, bucket_name):
-    """Clean up the bucket to prepare for the next test."""
-    if region_client.bucket_exists(bucket_name):
-        objects = region_client.list_objects(bucket_name, recursive=True)
-        for obj in objects:
-            region_client.remove_object(bucket_name, obj.object_name)
-        region_client.remove_bucket(bucket_name)
+    report = verify_bucket(region_client, bucket_name)
+    for object_name, error in report.failed:
+        print(f"Failed to access {object_name}: {error}")
+    print(f"Access check: {report.describe()}")
+    return report.accessible, report.elapsed, report
+
+def measure_baseline(tracer, bucket_name, num_files):
+    """Traced baseline read of every file from the primary."""
+    with tracer.span("baseline_read") as span:
+        baseline_accessible, baseline_time, baseline_report = measure_access_time(primary, bucket_name)
+        span.add(bytes=baseline_report.bytes, objects=baseline_accessible, errors=len(baseline_report.failed),
+                 listing_seconds=baseline_report.listing_seconds)
+    print(f"Baseline: Accessed {baseline_accessible}/{num_files} files in {baseline_time:.2f}s "
+          f"from {primary_region.name}.")
+    return baseline_accessible, baseline_time, baseline_report
+
+def simulate_outage(mode="stop"):
+    """Simulate a primary outage (kill, stop, pause or partition); return the FaultEvent."""
+    print(f"Simulating {primary_region.name} outage ({mode})...")
+    event = injector.inject(make_fault(mode, primary, container=primary_region.container,
+                                       endpoint=primary_region.endpoint))
+    print(f"{primary_region.name} is now offline.")
+    return event
+
+def restore_region(event):
+    """Restore the primary after the test."""
+    print(f"Restoring {primary_region.name}...")
+    injector.recover(event)
+    print(f"{primary_region.name} is back online.")
+
+def measure_rto_from_secondary(bucket_name, expected_file_count, poll_interval=MAX_POLL_INTERVAL, expected_names=None,
+                               fault_event=None, timeout=DEFAULT_READY_TIMEOUT):
+    """Measure how long it takes for the secondary to serve all files after the primary goes down.
+
+    With a fault_event the RTO is measured from the instant the fault took effect. If not
+    every file is readable within timeout seconds the RTO is -1, as for a failed run.
+    """
+    print(f"Measuring RTO from {secondary_region.name}...")
+    tracker = ReadinessTracker(secondary, bucket_name, expected_names=expected_names,
+                               expected_count=expected_file_count, max_interval=poll_interval)
+    rto = tracker.wait_until_ready(timeout=timeout, since=fault_event.effective_at if fault_event else None)
+    print(f"Failover read: {tracker.report.describe()}")
+    print(f"Availability over time: {tracker.describe_curve()}")
+    if rto is None:
+        print(f"{tracker.expected_count - len(tracker.available_at)} files still not accessible from {secondary_region.name} after {timeout:.0f}s.")
+        return -1, tracker.report
+    print(f"All files accessible from {secondary_region.name}. RTO: {rto:.2f} seconds")
+    return rto, tracker.report
 
 def calculate_rpo(original_file_count, recovered_file_count):
     """Calculate RPO as the percentage of original data that is accessible after failover."""
@@ -118,123 +106,218 @@ def calculate_rpo(original_file_count, recovered_file_count):
     else:
         restored_percentage = 100.0
     print(f"Original file count: {original_file_count}")
-    print(f"Recovered (accessible) file count in Region 2: {recovered_file_count}")
+    print(f"Recovered (accessible) file count in {secondary_region.name}: {recovered_file_count}")
     print(f"Data loss (files not recovered): {data_loss_count}")
     print(f"RPO (Data Restored): {restored_percentage:.2f}%")
     return restored_percentage
 
-def log_results_to_csv(filename, scenario_name, num_files, min_kb, max_kb, replication_used, rto, baseline_time, rpo_percentage):
-    """Log the results of the scenario to a CSV file."""
-    header = [
-        "scenario_name", 
-        "num_files", 
-        "min_file_kb", 
-        "max_file_kb", 
-        "replication_used", 
-        "RTO_seconds", 
-        "baseline_access_time_seconds",
-        "RPO_data_restored_percentage"
-    ]
-    row = [
-        scenario_name, 
-        num_files, 
-        min_kb, 
-        max_kb, 
-        replication_used, 
-        rto, 
-        baseline_time,
-        rpo_percentage
-    ]
-
-    file_exists = os.path.exists(filename)
-    with open(filename, 'a', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(header)
-        writer.writerow(row)
-
-def run_geo_failover_test(num_files=100, min_kb=10, max_kb=1024, use_replication=True):
-    """Run one geo-failover test with given parameters."""
+def run_geo_failover_test(num_files=100, min_kb=10, max_kb=1024, use_replication=True, seed=DEFAULT_SEED,
+                          distribution="uniform", profile="repetitive", bucket_name=bucket_name, replication="bulk",
+                          outage_delay=0.0, write_rate=0.0, write_size_mix=None, outage_mode="stop",
+                          client_reads=0, outage_duration=0.0, verify="full", cprofile_phase=None,
+                          bundle_threshold_kb=0, bundle_size_mb=DEFAULT_BUNDLE_SIZE // (1024 * 1024), matrix_name=None):
+    """Run one geo-failover test with given parameters; return its headline metrics.
+
+    replication="bulk" copies everything before the outage; "continuous" replicates
+    asynchronously while the upload runs and cuts the primary outage_delay seconds after
+    it, so RPO is also reported as the replication lag at the outage instant.
+    With write_rate > 0 a live workload keeps writing to the primary until the outage and
+    the acknowledged writes missing from the secondary are reported as a time window.
+    outage_mode is the fault injected into the primary: kill, stop, pause or partition.
+    With client_reads > 0 that many readers keep reading through a hedged FailoverClient
+    across the outage and the recovery, measuring client-observed RTO and tail latency.
+    The primary stays down for at least outage_duration seconds. verify selects how the secondary's
+    copies are checked against the upload manifest: "full" (hash, the default) or "etag" (listing only).
+    Every phase is traced (see tracing.py); cprofile_phase names one to run under cProfile.
+    With bundle_threshold_kb > 0, bulk replication copies smaller objects in bundles of
+    about bundle_size_mb.
+    """
     scenario_name = "Geo-Redundancy Failover Test" if use_replication else "Single-Region Outage (No Replication)"
+    tracer = Tracer(bucket_name, cprofile_phase=cprofile_phase)
     
     # Clean up from previous runs
-    clean_up_data_dir()
-    clear_bucket(region1, bucket_name)
-    clear_bucket(region2, bucket_name)
+    with tracer.span("cleanup"):
+        clear_bucket(primary, bucket_name)
+        clear_bucket(secondary, bucket_name)
 
-    # Step 1: Generate data
-    generate_large_dataset(num_files, min_kb, max_kb)
+    # Step 1: Generate data (cached datasets are reused across runs)
+    with tracer.span("generate"):
+        data_dir = generate_large_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution,
+                                          profile=profile)
 
-    # Step 2: Upload to region1
-    upload_files(region1, bucket_name, sample_data_dir)
+    # Step 2: Upload to the primary (with the replication daemon already running in continuous mode)
+    daemon = None
+    if use_replication and replication == "continuous":
+        if not primary.bucket_exists(bucket_name):
+            primary.make_bucket(bucket_name)
+        daemon = ReplicationDaemon(primary, secondary, bucket_name).start()
+    with tracer.span("upload") as span:
+        manifest = IntegrityManifest()
+        uploaded_files, uploaded_bytes = upload_directory(primary, bucket_name, data_dir, manifest)
+        manifest.save(manifest_path(bucket_name))
+        span.add(bytes=uploaded_bytes, objects=uploaded_files)
 
     # Record original file count after uploading
-    original_objects = list(region1.list_objects(bucket_name, recursive=True))
-    original_file_count = len(original_objects)
+    with tracer.span("list") as span:
+        original_objects = list_bucket(primary, bucket_name)
+        original_file_count = len(original_objects)
+        span.add(objects=original_file_count)
 
-    # Step 3: Replicate to region2 if replication is on
-    if use_replication:
-        replicate_files(region1, region2, bucket_name)
-    else:
-        clear_bucket(region2, bucket_name)
+    # Step 3: Replicate to the secondary if replication is on
+    if daemon is None and use_replication:
+        with tracer.span("replicate") as span:
+            stats = replicate_files(primary, secondary, bucket_name, bundle_threshold=bundle_threshold_kb * 1024,
+                                    bundle_size=bundle_size_mb * 1024 * 1024)
+            span.add(bytes=stats.bytes, objects=stats.objects, errors=len(stats.failed), retries=stats.retries)
+    elif not use_replication:
+        clear_bucket(secondary, bucket_name)
+    workload = None
+    if write_rate:
+        workload = WriteWorkload(primary, bucket_name, rate=write_rate, seed=seed,
+                                 **({"size_mix": write_size_mix} if write_size_mix else {})).start()
+    client = read_load = None
+    if client_reads:
+        client = FailoverClient([(primary_region.name, primary), (secondary_region.name, secondary)])
+        read_load = ReadLoad(client, bucket_name, [obj.object_name for obj in original_objects],
+                             concurrency=client_reads, seed=seed).start()
+    if daemon is not None or workload is not None or read_load is not None:
+        time.sleep(outage_delay)
 
-    # Step 4: Measure baseline access time from region1
-    baseline_accessible, baseline_time = measure_access_time(region1, bucket_name)
-    print(f"Baseline: Accessed {baseline_accessible}/{num_files} files in {baseline_time:.2f}s from Region 1.")
+    # Step 4: Measure baseline access time from the primary (after the test in continuous mode, so the
+    # baseline reads do not give the daemon extra time to catch up)
+    if daemon is None:
+        baseline_accessible, baseline_time, baseline_report = measure_baseline(tracer, bucket_name, num_files)
 
-    # Step 5: Simulate outage of region1
-    simulate_outage()
+    # Step 5: Simulate outage of the primary; whatever the daemon has not copied yet is lost
+    with tracer.span("fault"):
+        try:
+            fault_event = simulate_outage(outage_mode)
+        except FaultInjectionError:
+            # No outage happened, so there is no RTO to report: stop the background load and fail the run
+            if workload is not None:
+                workload.stop()
+            if daemon is not None:
+                daemon.stop()
+            if read_load is not None:
+                read_load.stop()
+                client.close()
+            raise
+    failure_time = fault_event.wall_at
+    # The lag at the outage instant is the RPO signal; stopping the daemon first would
+    # let it drain its in-flight copies and report an empty backlog
+    lag = daemon.lag() if daemon is not None else None
+    # Requests to a paused region hang, so in-flight work is abandoned rather than awaited
+    if workload is not None:
+        workload.stop(wait=outage_mode != "pause")
+    if daemon is not None:
+        print(f"Replication at outage: lag {lag['lag_seconds']:.2f}s, backlog {lag['backlog_objects']} objects / "
+              f"{lag['backlog_bytes'] / (1024 * 1024):.2f} MB, writes of the last {lag['unobserved_seconds']:.2f}s "
+              f"not seen yet")
+        daemon.stop(wait=outage_mode != "pause")
+        print(f"Replication daemon stopped: {daemon.describe()}")
 
-    # Step 6: Measure RTO from region2 if replication is used
+    # Step 6: Measure RTO from the secondary if replication is used
     if use_replication:
-        rto = measure_rto_from_region2(bucket_name, expected_file_count=num_files)
-        # After measuring RTO, count how many files Region 2 actually has
-        region2_objects = list(region2.list_objects(bucket_name, recursive=True))
-        recovered_count = len(region2_objects)
+        # Continuous replication may have lost writes; RTO then covers what the secondary does hold
+        expected_names = [obj.object_name for obj in original_objects]
+        if daemon is not None:
+            expected_names = [obj.object_name for obj in list_bucket(secondary, bucket_name)]
+        with tracer.span("failover_read") as span:
+            rto, failover_report = measure_rto_from_secondary(bucket_name, expected_file_count=len(expected_names),
+                                                            expected_names=expected_names, fault_event=fault_event)
+            span.add(bytes=failover_report.bytes, objects=failover_report.accessible,
+                     errors=len(failover_report.failed))
     else:
         # No replication scenario
-        start_time = time.time()
-        objects = list(region2.list_objects(bucket_name, recursive=True))
-        accessible_count = 0
-        for obj in objects:
+        with tracer.span("failover_read") as span:
             try:
-                data = region2.get_object(bucket_name, obj.object_name)
-                data.read()
-                accessible_count += 1
-            except:
-                pass
+                failover_report = verify_bucket(secondary, bucket_name)
+                accessible_count = failover_report.accessible
+                span.add(bytes=failover_report.bytes, objects=accessible_count, errors=len(failover_report.failed))
+            except Exception:
+                failover_report = None
+                accessible_count = 0
+                span.add(errors=1)
         if accessible_count == 0:
             rto = -1  # Indicates failure/no access
         else:
-            rto = time.time() - start_time
-        recovered_count = accessible_count
+            rto = time.monotonic() - fault_event.effective_at
 
-    # Step 7: Calculate RPO based on how many files are available in Region 2
-    rpo_percentage = calculate_rpo(original_file_count, recovered_count)
+    # Verify the secondary's copies against the upload manifest; only intact objects count as recovered
+    with tracer.span("integrity") as span:
+        integrity = verify_region(secondary, bucket_name, manifest, mode=verify)
+        span.add(bytes=integrity.hashed_bytes, objects=integrity.intact, errors=integrity.expected - integrity.intact)
+    print(f"{secondary_region.name} integrity: {integrity.describe()}")
+    recovered_count = integrity.intact
+    loss = None
+    if workload is not None:
+        with tracer.span("loss_analysis"):
+            loss = workload.analyze_loss(secondary, bucket_name, failure_time)
 
-    # Step 8: Log results
-    log_results_to_csv("results.csv", scenario_name, num_files, min_kb, max_kb, use_replication, rto, baseline_time, rpo_percentage)
+    # Restore the primary after the test; the read load keeps going long enough to fail back
+    time.sleep(max(0.0, fault_event.effective_at + outage_duration - time.monotonic()))
+    with tracer.span("recover") as span:
+        restore_region(fault_event)
+        span.add(errors=fault_event.error is not None)
+    client_metrics = {}
+    if read_load is not None:
+        time.sleep(RESET_TIMEOUT * 2)
+        read_load.stop()
+        client.close()
+        client_rto = client.observed_rto(fault_event.effective_at)
+        failback = client.first_served_by(primary_region.name, fault_event.recovered_at)
+        after_fault = client.latency_since(fault_event.effective_at)
+        print(f"Client reads: {client.describe()}")
+        print(f"Client-observed RTO: {'-' if client_rto is None else f'{client_rto:.3f}s'}, "
+              f"after the fault {after_fault.describe()}")
+        client_metrics = {"client_rto_seconds": client_rto, "client_failback_seconds": failback,
+                          "client_errors": client.errors_since(fault_event.effective_at),
+                          "client_hedged_reads": client.hedged, "client_reads": len(client.reads)}
+    if daemon is not None:
+        baseline_accessible, baseline_time, baseline_report = measure_baseline(tracer, bucket_name, num_files)
 
-    # Optional: Restore region1 after testj
-    restore_region()
+    # Step 7: Calculate RPO based on how many files the secondary holds intact
+    rpo_percentage = calculate_rpo(original_file_count, recovered_count)
 
-    # Cleanup data on the host machine
-    clean_up_data_dir()
+    # Step 8: Record results
+    metrics = {"RTO_seconds": rto, "RPO_data_restored_percentage": rpo_percentage,
+               "baseline_access_time_seconds": baseline_time}
+    if lag is not None:
+        metrics.update({"replication_lag_seconds": lag["lag_seconds"], "backlog_objects": lag["backlog_objects"],
+                        "backlog_bytes": lag["backlog_bytes"], "unobserved_seconds": lag["unobserved_seconds"],
+                        "replication_rpo_seconds": max(lag["lag_seconds"], lag["unobserved_seconds"])})
+    if loss is not None:
+        metrics.update(loss)
+    metrics["fault_inject_seconds"] = fault_event.inject_seconds()
+    metrics.update(integrity.metrics())
+    metrics.update(client_metrics)
+    params = {"num_files": num_files, "min_kb": min_kb, "max_kb": max_kb, "use_replication": use_replication,
+              "seed": seed, "distribution": distribution, "profile": profile, "bucket_name": bucket_name,
+              "replication": replication, "outage_delay": outage_delay, "write_rate": write_rate,
+              "write_size_mix": write_size_mix, "outage_mode": outage_mode, "client_reads": client_reads,
+              "outage_duration": outage_duration, "verify": verify, "bundle_threshold_kb": bundle_threshold_kb,
+              "bundle_size_mb": bundle_size_mb}
+    latencies = {"baseline_ttfb": baseline_report.ttfb.summary(), "baseline_read": baseline_report.full_read.summary()}
+    if failover_report is not None:
+        latencies["failover_ttfb"] = failover_report.ttfb.summary()
+        latencies["failover_read"] = failover_report.full_read.summary()
+    if daemon is not None:
+        latencies["replication_delay"] = daemon.delay.summary()
+    if client is not None:
+        latencies["client_read"] = client.latency.summary()
+        latencies["client_read_after_fault"] = after_fault.summary()
+    tracer.save(params)
+    record_results("geo", scenario_name, params, metrics, tracer.phases(), latencies, matrix_name=matrix_name)
 
-    print(f"Test scenario completed. RTO: {rto:.2f}s, RPO: {rpo_percentage:.2f}%. Check results.csv for recorded metrics.\n\n")
+    print(f"Test scenario completed. RTO: {rto:.2f}s, RPO: {rpo_percentage:.2f}%. Check results.db for recorded metrics.\n\n")
+    return metrics
 
 def main():
-    # Test cases:
-    # With replication
-    run_geo_failover_test(num_files=100, min_kb=10, max_kb=50, use_replication=True)
-    run_geo_failover_test(num_files=500, min_kb=50, max_kb=512, use_replication=True)
-    run_geo_failover_test(num_files=1000, min_kb=10, max_kb=1024, use_replication=True)
-
-    # Without replication
-    run_geo_failover_test(num_files=100, min_kb=10, max_kb=50, use_replication=False)
-    run_geo_failover_test(num_files=500, min_kb=10, max_kb=1024, use_replication=False)
+    # The geo scenarios are declared in the scenario matrix; outages are exclusive, so they run one at a time
+    from scenario_runner import load_matrix, run_matrix, DEFAULT_MATRIX_PATH
+    run_matrix(load_matrix(DEFAULT_MATRIX_PATH), scenario_type="geo", runners={"geo": run_geo_failover_test})
 
-    print("All test scenarios have been executed. Review results.csv for comparisons.")
+    print("All test scenarios have been executed. Compare them with: python scripts/results_store.py summary --type geo")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,137 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bulk_ops import list_bucket
+
+# Defaults for concurrent verification reads
+DEFAULT_WORKERS = 8
+READ_BUFFER_SIZE = 64 * 1024
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with about 2% relative error per bucket."""
+
+    MIN_SECONDS = 1e-5
+    GROWTH = 1.02
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        return int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+
+    def record(self, seconds):
+        bucket = self._bucket(seconds)
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Return the upper bound of the bucket holding the p-th percentile (p in 0..100)."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH ** bucket, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return {"count": self.count, "mean": self.mean(), "p50": self.percentile(50), "p95": self.percentile(95),
+                "p99": self.percentile(99), "max": self.max}
+
+    def describe(self):
+        s = self.summary()
+        return (f"p50={s['p50'] * 1000:.1f}ms p95={s['p95'] * 1000:.1f}ms "
+                f"p99={s['p99'] * 1000:.1f}ms max={s['max'] * 1000:.1f}ms")
+
+class AccessReport:
+    """Outcome of one verification pass over a bucket."""
+
+    def __init__(self):
+        self.accessible = 0
+        self.failed = []
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.listing_seconds = 0.0
+        self.ttfb = LatencyHistogram()
+        self.full_read = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def record_success(self, size, ttfb, duration):
+        self.ttfb.record(ttfb)
+        self.full_read.record(duration)
+        with self._lock:
+            self.accessible += 1
+            self.bytes += size
+
+    def record_failure(self, object_name, error):
+        with self._lock:
+            self.failed.append((object_name, str(error)))
+
+    def mb_per_second(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def describe(self):
+        return (f"{self.accessible} objects, {self.bytes / (1024 * 1024):.2f} MB in {self.elapsed:.2f}s "
+                f"({self.mb_per_second():.2f} MB/s), {len(self.failed)} failed\n"
+                f"  time to first byte: {self.ttfb.describe()}\n"
+                f"  full read:          {self.full_read.describe()}")
+
+def read_object(region_client, bucket_name, object_name, buffer_size=READ_BUFFER_SIZE):
+    """Stream an object through a fixed-size buffer; return (bytes, ttfb, duration)."""
+    start = time.perf_counter()
+    response = region_client.get_object(bucket_name, object_name)
+    ttfb = None
+    size = 0
+    try:
+        for data in response.stream(buffer_size):
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(data)
+    finally:
+        response.close()
+        response.release_conn()
+    duration = time.perf_counter() - start
+    return size, ttfb if ttfb is not None else duration, duration
+
+def verify_objects(region_client, bucket_name, object_names, workers=DEFAULT_WORKERS, buffer_size=READ_BUFFER_SIZE):
+    """Read the given objects concurrently and return an AccessReport."""
+    report = AccessReport()
+    start = time.perf_counter()
+
+    def task(object_name):
+        try:
+            size, ttfb, duration = read_object(region_client, bucket_name, object_name, buffer_size)
+            report.record_success(size, ttfb, duration)
+        except Exception as e:
+            report.record_failure(object_name, e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for object_name in object_names:
+            pool.submit(task, object_name)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def verify_bucket(region_client, bucket_name, workers=DEFAULT_WORKERS, buffer_size=READ_BUFFER_SIZE):
+    """List a bucket and read every object in it; the listing counts toward elapsed time."""
+    start = time.perf_counter()
+    object_names = [obj.object_name for obj in list_bucket(region_client, bucket_name)]
+    listing_seconds = time.perf_counter() - start
+    report = verify_objects(region_client, bucket_name, object_names, workers=workers, buffer_size=buffer_size)
+    report.listing_seconds = listing_seconds
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,202 @@
+import glob
+import json
+import lzma
+import os
+import struct
+import time
+import zlib
+
+# Pack file layout: MAGIC, compressed object entries, JSON index, then a fixed
+# trailer (index offset, index length, MAGIC) so the index is found with one seek.
+MAGIC = b"RPOPACK1"
+TRAILER = struct.Struct(">QQ8s")
+PACK_TARGET_BYTES = 256 * 1024 * 1024
+IO_BLOCK_SIZE = 64 * 1024
+CODECS = ("zlib", "lzma")
+
+def _compressor(codec):
+    if codec == "zlib":
+        return zlib.compressobj(6)
+    if codec == "lzma":
+        return lzma.LZMACompressor(preset=1)
+    raise ValueError(f"Unknown pack codec {codec!r}, expected one of {CODECS}")
+
+class PackEntryReader:
+    """File-like reader that decompresses one object out of a pack in bounded memory."""
+
+    def __init__(self, pack_file, entry, owns_file=True):
+        self._file = pack_file
+        self._owns_file = owns_file
+        self._remaining = entry["length"]
+        self._pending = entry["size"]
+        self._codec = entry["codec"]
+        self._d = zlib.decompressobj() if self._codec == "zlib" else lzma.LZMADecompressor()
+        self._file.seek(entry["offset"])
+
+    def _read_compressed(self):
+        data = self._file.read(min(IO_BLOCK_SIZE, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self._pending
+        out = bytearray()
+        while len(out) < size and self._pending > 0:
+            want = size - len(out)
+            if self._codec == "zlib":
+                data = self._d.unconsumed_tail or self._read_compressed()
+                chunk = self._d.decompress(data, want)
+            else:
+                data = self._read_compressed() if self._d.needs_input else b""
+                chunk = self._d.decompress(data, max_length=want)
+            if not chunk and not data:
+                raise IOError("Truncated pack entry")
+            out += chunk
+            self._pending -= len(chunk)
+        return bytes(out)
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PackWriter:
+    """Append compressed objects to a single pack file and write its index on close."""
+
+    def __init__(self, path, codec="zlib"):
+        self.path = path
+        self.codec = codec
+        self.index = {}
+        self.raw_bytes = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def add(self, object_name, stream, etag=None):
+        offset = self._file.tell()
+        compressor = _compressor(self.codec)
+        size = 0
+        for block in stream:
+            size += len(block)
+            self._file.write(compressor.compress(block))
+        self._file.write(compressor.flush())
+        self.index[object_name] = {"offset": offset, "length": self._file.tell() - offset, "size": size,
+                                   "codec": self.codec, "etag": etag}
+        self.raw_bytes += size
+        return size
+
+    def close(self):
+        index = json.dumps(self.index).encode()
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(TRAILER.pack(index_offset, len(index), MAGIC))
+        self._file.close()
+
+def read_pack_index(path):
+    """Load the footer index of a pack file."""
+    with open(path, "rb") as f:
+        f.seek(-TRAILER.size, os.SEEK_END)
+        index_offset, index_length, magic = TRAILER.unpack(f.read(TRAILER.size))
+        if magic != MAGIC:
+            raise IOError(f"{path} is not a backup pack")
+        f.seek(index_offset)
+        return json.loads(f.read(index_length))
+
+class PackStore:
+    """Backup store that groups objects into a few large compressed pack files.
+
+    Layout: packs/<backup_id>-<n>.pack holds the objects of one backup and LATEST
+    names the newest backup.
+    """
+
+    def __init__(self, root, codec="zlib", pack_size=PACK_TARGET_BYTES):
+        self.root = root
+        self.codec = codec
+        self.pack_size = pack_size
+        self.pack_dir = os.path.join(root, "packs")
+        self._writer = None
+        self._backup_id = None
+        self._pack_count = 0
+        self._written = 0
+        self._compressed = 0
+        self._entries = self._load_latest()
+
+    def _load_latest(self):
+        latest_path = os.path.join(self.root, "LATEST")
+        if not os.path.exists(latest_path):
+            return {}
+        with open(latest_path) as f:
+            backup_id = f.read().strip()
+        entries = {}
+        for path in sorted(glob.glob(os.path.join(self.pack_dir, f"{backup_id}-*.pack"))):
+            for object_name, entry in read_pack_index(path).items():
+                entries[object_name] = dict(entry, pack=path)
+        return entries
+
+    def _roll_pack(self):
+        if self._writer is not None:
+            self._finish_pack()
+        if self._backup_id is None:
+            self._backup_id = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1000000:06d}"
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self._pack_count += 1
+        path = os.path.join(self.pack_dir, f"{self._backup_id}-{self._pack_count:04d}.pack")
+        self._writer = PackWriter(path, self.codec)
+
+    def _finish_pack(self):
+        self._writer.close()
+        self._written += self._writer.raw_bytes
+        self._compressed += os.path.getsize(self._writer.path)
+        self._writer = None
+
+    def reuse(self, object_name, etag, size):
+        return False
+
+    def add(self, object_name, stream, etag=None):
+        if self._writer is None or self._writer.raw_bytes >= self.pack_size:
+            self._roll_pack()
+        return self._writer.add(object_name, stream, etag=etag)
+
+    def close(self):
+        """Finish the open pack and make this backup the latest one."""
+        if self._writer is None:
+            return
+        self._finish_pack()
+        with open(os.path.join(self.root, "LATEST"), "w") as f:
+            f.write(self._backup_id)
+        self._entries = self._load_latest()
+        print(f"Pack store: {self._pack_count} packs, {self._written / (1024 * 1024):.2f} MB compressed "
+              f"to {self._compressed / (1024 * 1024):.2f} MB ({self.codec})")
+
+    def object_names(self):
+        return sorted(self._entries)
+
+    def object_size(self, object_name):
+        return self._entries[object_name]["size"]
+
+    def open_object(self, object_name):
+        entry = self._entries[object_name]
+        return PackEntryReader(open(entry["pack"], "rb"), entry)
+
+    def iter_objects(self, object_names=None):
+        """Yield (name, size, reader) in pack order, one open file per pack.
+
+        Each reader must be consumed before the next one is requested.
+        """
+        names = self._entries if object_names is None else object_names
+        ordered = sorted(names, key=lambda name: (self._entries[name]["pack"], self._entries[name]["offset"]))
+        pack_file = None
+        for object_name in ordered:
+            entry = self._entries[object_name]
+            if pack_file is None or pack_file.name != entry["pack"]:
+                if pack_file is not None:
+                    pack_file.close()
+                pack_file = open(entry["pack"], "rb")
+            yield object_name, entry["size"], PackEntryReader(pack_file, entry, owns_file=False)
+        if pack_file is not None:
+            pack_file.close()
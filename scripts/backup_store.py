@@ -0,0 +1,55 @@
+import os
+from backup_pack import PackStore
+from chunk_store import ChunkStore
+
+# Supported on-disk backup layouts
+BACKUP_FORMATS = ("files", "chunks", "pack", "pack-lzma")
+DEFAULT_BACKUP_FORMAT = "chunks"
+
+class LooseFileStore:
+    """The original backup layout: one plain file per object in the backup directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def reuse(self, object_name, etag, size):
+        return False
+
+    def add(self, object_name, stream, etag=None):
+        os.makedirs(self.root, exist_ok=True)
+        size = 0
+        with open(os.path.join(self.root, object_name), "wb") as backup_file:
+            for d in stream:
+                backup_file.write(d)
+                size += len(d)
+        return size
+
+    def close(self):
+        pass
+
+    def object_names(self):
+        if not os.path.exists(self.root):
+            return []
+        return sorted(os.listdir(self.root))
+
+    def object_size(self, object_name):
+        return os.path.getsize(os.path.join(self.root, object_name))
+
+    def open_object(self, object_name):
+        return open(os.path.join(self.root, object_name), "rb")
+
+    def iter_objects(self, object_names=None):
+        for object_name in (self.object_names() if object_names is None else object_names):
+            yield object_name, self.object_size(object_name), self.open_object(object_name)
+
+def open_backup_store(backup_format, root):
+    """Open the backup store of the given format rooted at a directory."""
+    if backup_format == "files":
+        return LooseFileStore(root)
+    if backup_format == "chunks":
+        return ChunkStore(root)
+    if backup_format == "pack":
+        return PackStore(root, codec="zlib")
+    if backup_format == "pack-lzma":
+        return PackStore(root, codec="lzma")
+    raise ValueError(f"Unknown backup format {backup_format!r}, expected one of {BACKUP_FORMATS}")
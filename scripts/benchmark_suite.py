@@ -0,0 +1,309 @@
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from results_store import ResultsStore, DEFAULT_RESULTS_DB, FAILED_RTO, SCALAR_COLUMNS, git_revision
+from scenario_runner import load_matrix, expand_scenarios, run_scenario, DEFAULT_MATRIX_PATH, SCENARIO_TYPES
+
+# Trials per scenario, significance level and the smallest change worth flagging
+DEFAULT_TRIALS = 5
+DEFAULT_WARMUPS = 1
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_EFFECT = 0.05
+# Fewest successful trials on each side for a comparison to mean anything
+DEFAULT_MIN_SAMPLES = 3
+CONFIDENCE = 0.95
+DEFAULT_BASELINE_PATH = "./benchmarks/baseline.json"
+LATENCY_PERCENTILES = ("p50", "p95", "p99")
+# Measurements where a larger value is an improvement
+HIGHER_IS_BETTER = ("per_second", "throughput", "percentage", "intact_objects", "acked_writes", "client_reads")
+
+def _betacf(a, b, x):
+    # Continued fraction of the incomplete beta function (Numerical Recipes, modified Lentz)
+    tiny = 1e-30
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-12:
+            break
+    return h
+
+def _incomplete_beta(a, b, x):
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def t_cdf(t, df):
+    """Cumulative distribution function of Student's t with df degrees of freedom."""
+    tail = 0.5 * _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t >= 0 else tail
+
+def t_quantile(p, df):
+    """Inverse of t_cdf, by bisection."""
+    lo, hi = -1e3, 1e3
+    for _ in range(200):
+        mid = (lo + hi) / 2.0
+        if t_cdf(mid, df) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+class Sample:
+    """Trials of one measurement: mean, sample standard deviation and a t confidence interval."""
+
+    def __init__(self, values):
+        self.values = [v for v in values if v is not None]
+        self.n = len(self.values)
+        self.mean = statistics.fmean(self.values) if self.values else None
+        self.stddev = statistics.stdev(self.values) if self.n > 1 else 0.0
+
+    def confidence_interval(self, confidence=CONFIDENCE):
+        if self.n < 2:
+            return self.mean, self.mean
+        half = t_quantile(0.5 + confidence / 2.0, self.n - 1) * self.stddev / math.sqrt(self.n)
+        return self.mean - half, self.mean + half
+
+    def to_dict(self):
+        return {"values": self.values, "mean": self.mean, "stddev": self.stddev}
+
+def welch_test(baseline, candidate):
+    """Welch's t-test; returns (t, degrees of freedom, two-sided p-value), or None if undefined."""
+    if baseline.n < 2 or candidate.n < 2:
+        return None
+    va, vb = baseline.stddev ** 2 / baseline.n, candidate.stddev ** 2 / candidate.n
+    if va + vb == 0:
+        # Both constant: any difference is exact, none is not a difference at all
+        return (math.inf if candidate.mean != baseline.mean else 0.0), math.inf, \
+            (0.0 if candidate.mean != baseline.mean else 1.0)
+    t = (candidate.mean - baseline.mean) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / ((va ** 2 / (baseline.n - 1) if va else 0.0) + (vb ** 2 / (candidate.n - 1) if vb else 0.0))
+    return t, df, 2.0 * (1.0 - t_cdf(abs(t), df))
+
+def higher_is_better(name):
+    return any(marker in name for marker in HIGHER_IS_BETTER)
+
+def run_measurements(store, run_id):
+    """Flatten one recorded run into {measurement: value}: headline metrics, throughputs
+    and latency percentiles (latency.<measurement>.<percentile>)."""
+    run = store.query("SELECT * FROM runs WHERE run_id = ?", (run_id,))[0]
+    values = {name: run[column] for name, column in SCALAR_COLUMNS.items() if run[column] is not None}
+    for row in store.query("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,)):
+        values[row["name"]] = row["value"]
+    for row in store.query("SELECT * FROM latencies WHERE run_id = ?", (run_id,)):
+        if row["count"]:
+            for percentile in LATENCY_PERCENTILES:
+                values[f"latency.{row['measurement']}.{percentile}"] = row[percentile]
+    return values
+
+def _latest_run_id(store):
+    return store.query("SELECT COALESCE(MAX(run_id), 0) AS run_id FROM runs")[0]["run_id"]
+
+def trial_failed(values):
+    """Whether a trial's measurements come from a run that failed (no RTO could be measured)."""
+    return values.get("RTO_seconds") == FAILED_RTO
+
+def summarize_trials(trial_values):
+    """{measurement: Sample} over the successful trials, and how many failed trials were dropped.
+
+    A failed trial's RTO is the FAILED_RTO sentinel and its other measurements describe
+    an outage that never ended, so the whole trial is left out rather than averaged in.
+    """
+    kept = [values for values in trial_values if values is not None and not trial_failed(values)]
+    names = sorted({name for values in kept for name in values})
+    return {name: Sample([values.get(name) for values in kept]) for name in names}, len(trial_values) - len(kept)
+
+def run_trials(scenario, trials=DEFAULT_TRIALS, warmups=DEFAULT_WARMUPS, store=None, label=None):
+    """Run warmups (discarded) then trials of one scenario, one at a time.
+
+    Returns ({measurement: Sample}, failed trials dropped); see summarize_trials. Every
+    run is still recorded in the results store; trials are tagged with source
+    "benchmark:<label>", warmups with "warmup" and failed trials with "failed" so they
+    can be told apart.
+    """
+    store = store or ResultsStore(DEFAULT_RESULTS_DB)
+    label = label or git_revision()
+    trial_values = []
+    for index in range(warmups + trials):
+        warmup = index < warmups
+        print(f"== {scenario['name']}: {'warmup' if warmup else 'trial'} "
+              f"{index + 1 if warmup else index - warmups + 1}/{warmups if warmup else trials}")
+        before = _latest_run_id(store)
+        result = run_scenario(scenario)
+        run_ids = [row["run_id"] for row in store.query("SELECT run_id FROM runs WHERE run_id > ?", (before,))]
+        values = None
+        if result["status"] == "ok":
+            values = {}
+            for run_id in run_ids:
+                values.update(run_measurements(store, run_id))
+            values["wall_seconds"] = result["wall_seconds"]
+        failed = values is None or trial_failed(values)
+        store.tag_runs(run_ids, "warmup" if warmup else "failed" if failed else f"benchmark:{label}")
+        if failed:
+            print(f"== {scenario['name']}: {'warmup' if warmup else 'trial'} failed "
+                  f"({result['status'] if values is None else 'no recovery'})")
+        if not warmup:
+            trial_values.append(values)
+    samples, dropped = summarize_trials(trial_values)
+    if dropped:
+        print(f"== {scenario['name']}: dropped {dropped} failed trial(s) of {trials}")
+    return samples, dropped
+
+def compare_samples(baseline, candidate, alpha=DEFAULT_ALPHA, min_effect=DEFAULT_MIN_EFFECT,
+                    min_samples=DEFAULT_MIN_SAMPLES):
+    """Compare each measurement present in both; a regression is a change in the worse
+    direction that is both significant (Bonferroni-corrected over the measurements)
+    and larger than min_effect relative to the baseline mean.
+
+    Measurements with fewer than min_samples values on either side are not compared.
+    """
+    names = [name for name in sorted(candidate) if name in baseline and baseline[name].n >= min_samples
+             and candidate[name].n >= min_samples]
+    corrected_alpha = alpha / max(1, len(names))
+    rows = []
+    for name in names:
+        a, b = baseline[name], candidate[name]
+        change = (b.mean - a.mean) / abs(a.mean) if a.mean else None
+        test = welch_test(a, b)
+        p_value = test[2] if test else None
+        significant = p_value is not None and p_value < corrected_alpha
+        worse = change is not None and (change < 0 if higher_is_better(name) else change > 0)
+        large = change is not None and abs(change) >= min_effect
+        verdict = "regression" if significant and worse and large else \
+            "improvement" if significant and not worse and large else ""
+        rows.append({"measurement": name, "baseline_mean": a.mean, "candidate_mean": b.mean,
+                     "change_percent": None if change is None else change * 100, "p_value": p_value,
+                     "verdict": verdict})
+    return rows
+
+def save_baseline(path, results, label, dropped=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"label": label, "created_at": time.time(),
+                   "scenarios": {scenario: {name: sample.to_dict() for name, sample in samples.items()}
+                                 for scenario, samples in results.items()},
+                   "dropped_trials": dropped or {}}, f, indent=2)
+    print(f"Saved baseline {label} to {path}")
+
+def load_baseline(path):
+    with open(path) as f:
+        data = json.load(f)
+    # Baselines saved before failed trials were dropped may hold the RTO sentinel
+    return data["label"], {scenario: {name: Sample([v for v in sample["values"]
+                                                    if not (name == "RTO_seconds" and v == FAILED_RTO)])
+                                      for name, sample in samples.items()}
+                           for scenario, samples in data["scenarios"].items()}
+
+def scenario_trials(samples):
+    """Successful trials behind a scenario's samples (wall_seconds is measured for every one)."""
+    sample = samples.get("wall_seconds")
+    return sample.n if sample is not None else max((s.n for s in samples.values()), default=0)
+
+def _fmt(value, digits=4):
+    return "-" if value is None else f"{value:.{digits}g}"
+
+def print_samples(scenario_name, samples):
+    print(f"\n{scenario_name}")
+    print(f"  {'measurement':44} {'n':>3} {'mean':>10} {'stddev':>10} {'95% CI':>23}")
+    for name, sample in samples.items():
+        lo, hi = sample.confidence_interval()
+        print(f"  {name[:44]:44} {sample.n:>3} {_fmt(sample.mean):>10} {_fmt(sample.stddev):>10} "
+              f"{f'[{_fmt(lo)}, {_fmt(hi)}]':>23}")
+
+def print_comparison(scenario_name, rows):
+    flagged = [row for row in rows if row["verdict"]]
+    print(f"\n{scenario_name}: {len(flagged)} significant change(s) over {len(rows)} measurements")
+    for row in flagged:
+        print(f"  {row['verdict'].upper():11} {row['measurement'][:44]:44} {_fmt(row['baseline_mean'])} -> "
+              f"{_fmt(row['candidate_mean'])} ({row['change_percent']:+.1f}%, p={row['p_value']:.2g})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scenarios repeatedly and compare them with a stored baseline.")
+    parser.add_argument("matrix", nargs="?", default=DEFAULT_MATRIX_PATH, help="JSON or TOML scenario matrix")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="benchmark only these scenarios")
+    parser.add_argument("--type", choices=sorted(SCENARIO_TYPES), help="benchmark only scenarios of this type")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS)
+    parser.add_argument("--warmups", type=int, default=DEFAULT_WARMUPS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT,
+                        help="smallest relative change to flag (default 0.05 = 5%%)")
+    parser.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES,
+                        help="fewest successful trials on each side needed to compare (default 3)")
+    parser.add_argument("--label", help="name of this run (default: the git revision)")
+    parser.add_argument("--wan-profile", metavar="PROFILE",
+                        help="run every region client over this WAN link profile (see wan_proxy.py)")
+    args = parser.parse_args()
+    if args.wan_profile:
+        os.environ["WAN_PROFILE"] = args.wan_profile
+
+    scenarios = expand_scenarios(load_matrix(args.matrix))
+    if args.type:
+        scenarios = [s for s in scenarios if s["type"] == args.type]
+    if args.only:
+        scenarios = [s for s in scenarios if s["name"] in args.only]
+    if not scenarios:
+        parser.error("no scenarios selected")
+    label = args.label or git_revision()
+    store = ResultsStore(DEFAULT_RESULTS_DB)
+
+    results = {}
+    dropped = {}
+    for scenario in scenarios:
+        results[scenario["name"]], dropped[scenario["name"]] = run_trials(scenario, args.trials, args.warmups,
+                                                                          store, label)
+        print_samples(scenario["name"], results[scenario["name"]])
+
+    regressions = refused = 0
+    if os.path.exists(args.baseline):
+        baseline_label, baseline = load_baseline(args.baseline)
+        print(f"\nCompared with baseline {baseline_label} ({args.baseline})")
+        for name, samples in results.items():
+            if name not in baseline:
+                print(f"\n{name}: not in the baseline")
+                continue
+            trials, baseline_trials = scenario_trials(samples), scenario_trials(baseline[name])
+            if min(trials, baseline_trials) < args.min_samples:
+                print(f"\n{name}: not compared, {trials} successful trial(s) ({dropped[name]} failed) against "
+                      f"{baseline_trials} in the baseline; at least {args.min_samples} are needed on each side")
+                refused += 1
+                continue
+            rows = compare_samples(baseline[name], samples, args.alpha, args.min_effect, args.min_samples)
+            print_comparison(name, rows)
+            regressions += sum(row["verdict"] == "regression" for row in rows)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, label, dropped)
+    if regressions:
+        print(f"\n{regressions} regression(s) found.")
+    if refused:
+        print(f"\n{refused} scenario(s) had too few successful trials to compare.")
+    if regressions or refused:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import os
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from storage_backend import LIST_PAGE_SIZE
+
+# S3 lists and deletes at most LIST_PAGE_SIZE keys per request
+DEFAULT_LIST_WORKERS = 16
+SPLIT_AFTER = LIST_PAGE_SIZE
+DELETE_BATCH_SIZE = LIST_PAGE_SIZE
+DEFAULT_DELETE_WORKERS = 8
+# Fallback characters to cut a key range with when the keys seen so far offer no cut;
+# keys outside it are still listed, they only land in a wider shard
+SHARD_ALPHABET = "".join(sorted(set(string.digits + string.ascii_letters + "!-./_")))
+
+def _common_prefix(a, b):
+    return os.path.commonprefix([a, b])
+
+def _char_kind(c):
+    if c.isdigit():
+        return "digit"
+    if c.isalpha():
+        return "lower" if c.islower() else "upper"
+    return c
+
+def _split_points(objects, stop_at, prefix):
+    """Boundaries cutting the keys after the last of objects (and up to stop_at) into shards.
+
+    The keys seen so far share a common prefix; the keys still to come either continue
+    it (file_1898 -> file_19) or move on to its siblings (file_2, file_3, ...). Both cuts
+    use the characters the seen keys have right after the common prefix, so every shard
+    covers names that exist; SHARD_ALPHABET is only used when those offer no cut.
+    """
+    names = [obj.object_name for obj in objects]
+    last = names[-1]
+    depth = len(_common_prefix(names[0], last))
+    if depth >= len(last):
+        return []
+    # Keys past the last one seen mostly use characters seen deeper in the names (file_2899
+    # -> file_29), of the kinds that follow the common prefix (digits here, not the "txt")
+    suffixes = [name[depth:] for name in names]
+    kinds = {_char_kind(suffix[0]) for suffix in suffixes if suffix}
+    seen = sorted({c for suffix in suffixes for c in suffix if _char_kind(c) in kinds})
+    for alphabet in (seen, SHARD_ALPHABET):
+        points = set()
+        for level in (depth - 1, depth):
+            if level < len(prefix):
+                continue
+            base = last[:level]
+            points.update(base + c for c in alphabet
+                          if c > last[level] and (stop_at is None or base + c < stop_at))
+        if points:
+            return sorted(points)
+    return []
+
+def _list_shard(region_client, bucket_name, prefix, start_after, stop_at, split_after):
+    """List the keys in (start_after, stop_at] under prefix.
+
+    After split_after keys the rest of the range is handed back as child shards so
+    idle workers can pick it up; returns (objects, child ranges).
+    """
+    objects = []
+    for obj in region_client.list_objects(bucket_name, prefix=prefix, recursive=True, start_after=start_after):
+        if stop_at is not None and obj.object_name > stop_at:
+            break
+        objects.append(obj)
+        if len(objects) % split_after == 0:
+            points = _split_points(objects, stop_at, prefix)
+            if points:
+                bounds = [obj.object_name] + points + [stop_at]
+                return objects, list(zip(bounds, bounds[1:]))
+    return objects, []
+
+def list_bucket(region_client, bucket_name, prefix=None, workers=DEFAULT_LIST_WORKERS, split_after=SPLIT_AFTER):
+    """List every object of a bucket (recursively), sharding the key space across workers.
+
+    Shards are contiguous key ranges, so the listing is exact whatever the key names;
+    a shard that turns out to be large splits its remainder into narrower ranges.
+    Returns the objects in key order.
+    """
+    prefix = prefix or ""
+    shards = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_list_shard, region_client, bucket_name, prefix, None, None, split_after): None}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start_after = pending.pop(future)
+                objects, children = future.result()
+                shards[start_after] = objects
+                for child_start, child_stop in children:
+                    pending[pool.submit(_list_shard, region_client, bucket_name, prefix, child_start, child_stop,
+                                        split_after)] = child_start
+    ordered = sorted(shards, key=lambda start_after: "" if start_after is None else start_after)
+    return [obj for start_after in ordered for obj in shards[start_after]]
+
+class ListingCache:
+    """Listing snapshots per (region client, bucket, prefix), reused until invalidated.
+
+    Within a phase nothing but the scenario itself changes the bucket, so repeated
+    counts can share one listing; deletions through this module invalidate it, and
+    callers invalidate after writing (or when a live workload has been writing).
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get(self, region_client, bucket_name, prefix=None, workers=DEFAULT_LIST_WORKERS):
+        key = (id(region_client), bucket_name, prefix or "")
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+        snapshot = list_bucket(region_client, bucket_name, prefix, workers=workers)
+        with self._lock:
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def invalidate(self, region_client=None, bucket_name=None):
+        """Drop the snapshots of one bucket (of one client), or all of them."""
+        with self._lock:
+            for key in list(self._snapshots):
+                if (region_client is None or key[0] == id(region_client)) and \
+                        (bucket_name is None or key[1] == bucket_name):
+                    del self._snapshots[key]
+
+listing_cache = ListingCache()
+
+def _delete_entries(object_names):
+    from minio.deleteobjects import DeleteObject
+    return [DeleteObject(name) for name in object_names]
+
+def delete_objects(region_client, bucket_name, object_names, workers=DEFAULT_DELETE_WORKERS,
+                   batch_size=DELETE_BATCH_SIZE):
+    """Delete objects with batched multi-object deletes, several batches at a time.
+
+    Returns the number of objects deleted; failures are printed.
+    """
+    object_names = list(object_names)
+    batches = [object_names[i:i + batch_size] for i in range(0, len(object_names), batch_size)]
+
+    def task(batch):
+        # remove_objects is lazy: the request is only sent while its errors are iterated
+        errors = list(region_client.remove_objects(bucket_name, _delete_entries(batch)))
+        for error in errors:
+            print(f"Failed to delete {error.name}: {error.code} {error.message}")
+        return len(batch) - len(errors)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(task, batches))
+    finally:
+        listing_cache.invalidate(region_client, bucket_name)
+
+def upload_directory(region_client, bucket_name, directory, manifest=None):
+    """Upload every file of a directory (a generated dataset) under its file name, creating the
+    bucket if needed; with a manifest (see integrity_manifest.py), hash each file while it uploads.
+
+    Returns (files, bytes) uploaded.
+    """
+    print(f"Uploading files to bucket: {bucket_name}")
+    if not region_client.bucket_exists(bucket_name):
+        region_client.make_bucket(bucket_name)
+    if manifest is not None:
+        from integrity_manifest import upload_file
+    uploaded_files = uploaded_bytes = 0
+    try:
+        for filename in os.listdir(directory):
+            file_path = os.path.join(directory, filename)
+            if manifest is not None:
+                upload_file(region_client, bucket_name, filename, file_path, manifest)
+            else:
+                region_client.fput_object(bucket_name, filename, file_path)
+            uploaded_files += 1
+            uploaded_bytes += os.path.getsize(file_path)
+    finally:
+        listing_cache.invalidate(region_client, bucket_name)
+    print("Upload completed.")
+    return uploaded_files, uploaded_bytes
+
+def clear_bucket(region_client, bucket_name, workers=DEFAULT_LIST_WORKERS):
+    """Empty and remove a bucket to prepare for the next test."""
+    if region_client.bucket_exists(bucket_name):
+        delete_objects(region_client, bucket_name,
+                       [obj.object_name for obj in list_bucket(region_client, bucket_name, workers=workers)])
+        region_client.remove_bucket(bucket_name)
+    listing_cache.invalidate(region_client, bucket_name)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import time
+
+# Content-defined chunking parameters
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+
+# Chunk boundaries are anchored on content: every byte is mapped to one pseudo-random
+# bit (bytes.translate runs at C speed) and a chunk ends right after the 16-bit
+# ANCHOR pattern, which gives ~64 KiB chunks that survive insertions and shifts.
+_BIT_TABLE = bytes(b"01"[hashlib.sha256(bytes([i])).digest()[0] & 1] for i in range(256))
+ANCHOR = b"1011001110001101"
+
+def find_cut_point(buf, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """Return the length of the first content-defined chunk in buf."""
+    if len(buf) <= min_size:
+        return len(buf)
+    start = min_size - len(ANCHOR)
+    end = min(len(buf), max_size)
+    index = bytes(buf[start:end]).translate(_BIT_TABLE).find(ANCHOR)
+    if index < 0:
+        return end
+    return start + index + len(ANCHOR)
+
+def iter_chunks(stream, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """Split an iterable of byte blocks into content-defined chunks."""
+    buf = bytearray()
+    for block in stream:
+        buf += block
+        while len(buf) >= max_size:
+            cut = find_cut_point(buf, min_size, max_size)
+            yield bytes(buf[:cut])
+            del buf[:cut]
+    while buf:
+        cut = find_cut_point(buf, min_size, max_size)
+        yield bytes(buf[:cut])
+        del buf[:cut]
+
+class ChunkReader:
+    """File-like reader that streams an object back out of its chunks."""
+
+    def __init__(self, store, chunk_ids):
+        self._store = store
+        self._chunk_ids = chunk_ids
+        self._next = 0
+        self._current = None
+
+    def read(self, size=-1):
+        out = bytearray()
+        while size < 0 or len(out) < size:
+            if self._current is None:
+                if self._next >= len(self._chunk_ids):
+                    break
+                self._current = open(self._store.chunk_path(self._chunk_ids[self._next]), "rb")
+                self._next += 1
+            data = self._current.read(-1 if size < 0 else size - len(out))
+            if not data:
+                self._current.close()
+                self._current = None
+                continue
+            out += data
+        return bytes(out)
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ChunkStore:
+    """Backup store that keeps every unique chunk once, addressed by its SHA-256.
+
+    Layout: chunks/<2 hex>/<sha256> holds chunk data, manifests/<backup_id>.json maps
+    each backed-up object to its chunk list, and LATEST names the newest backup.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self._latest = self._load_latest()
+        self._pending = None
+        self.new_chunks = 0
+        self.new_bytes = 0
+        self.dedup_bytes = 0
+
+    def _load_latest(self):
+        latest_path = os.path.join(self.root, "LATEST")
+        if not os.path.exists(latest_path):
+            return {"backup_id": None, "objects": {}}
+        with open(latest_path) as f:
+            backup_id = f.read().strip()
+        return self.load_manifest(backup_id)
+
+    def load_manifest(self, backup_id):
+        with open(os.path.join(self.manifest_dir, f"{backup_id}.json")) as f:
+            return json.load(f)
+
+    def chunk_path(self, chunk_id):
+        return os.path.join(self.chunk_dir, chunk_id[:2], chunk_id)
+
+    def _put_chunk(self, chunk):
+        chunk_id = hashlib.sha256(chunk).hexdigest()
+        path = self.chunk_path(chunk_id)
+        if os.path.exists(path):
+            self.dedup_bytes += len(chunk)
+            return chunk_id
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(chunk)
+        os.replace(tmp_path, path)
+        self.new_chunks += 1
+        self.new_bytes += len(chunk)
+        return chunk_id
+
+    def _begin(self):
+        if self._pending is None:
+            backup_id = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1000000:06d}"
+            self._pending = {"backup_id": backup_id, "created": time.time(), "objects": {}}
+        return self._pending
+
+    def reuse(self, object_name, etag, size):
+        """Carry an unchanged object over from the previous backup without reading it."""
+        previous = self._latest["objects"].get(object_name)
+        if previous is None or etag is None or previous.get("etag") != etag or previous["size"] != size:
+            return False
+        self._begin()["objects"][object_name] = previous
+        self.dedup_bytes += size
+        return True
+
+    def add(self, object_name, stream, etag=None):
+        """Chunk a stream of byte blocks into the store and record it in the current backup."""
+        chunk_ids = []
+        size = 0
+        for chunk in iter_chunks(stream):
+            chunk_ids.append(self._put_chunk(chunk))
+            size += len(chunk)
+        self._begin()["objects"][object_name] = {"size": size, "etag": etag, "chunks": chunk_ids}
+        return size
+
+    def close(self):
+        """Write the manifest of the current backup and make it the latest one."""
+        if self._pending is None:
+            return
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        backup_id = self._pending["backup_id"]
+        with open(os.path.join(self.manifest_dir, f"{backup_id}.json"), "w") as f:
+            json.dump(self._pending, f)
+        with open(os.path.join(self.root, "LATEST"), "w") as f:
+            f.write(backup_id)
+        self._latest = self._pending
+        self._pending = None
+        print(f"Chunk store: {self.new_chunks} new chunks ({self.new_bytes / (1024 * 1024):.2f} MB written), "
+              f"{self.dedup_bytes / (1024 * 1024):.2f} MB deduplicated")
+
+    def object_names(self):
+        return sorted(self._latest["objects"])
+
+    def object_size(self, object_name):
+        return self._latest["objects"][object_name]["size"]
+
+    def open_object(self, object_name):
+        return ChunkReader(self, self._latest["objects"][object_name]["chunks"])
+
+    def iter_objects(self, object_names=None):
+        for object_name in (self.object_names() if object_names is None else object_names):
+            yield object_name, self.object_size(object_name), self.open_object(object_name)
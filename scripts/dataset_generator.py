@@ -0,0 +1,124 @@
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import threading
+import uuid
+
+# Generated datasets are cached here, one directory per parameter hash
+DEFAULT_CACHE_DIR = "./dataset_cache"
+DEFAULT_SEED = 42
+BLOCK_SIZE = 1024 * 1024
+GENERATOR_VERSION = 1
+
+DISTRIBUTIONS = ("uniform", "lognormal", "buckets")
+PROFILES = ("repetitive", "text", "random", "mixed")
+
+_REPETITIVE_BLOCK = b"X" * BLOCK_SIZE
+_TEXT_BLOCK = (b"Sample Data\n" * (BLOCK_SIZE // 12 + 1))[:BLOCK_SIZE]
+
+# Concurrent scenarios often ask for the same dataset; one lock per cache entry makes
+# the later callers wait for the first one and reuse what it published
+_entry_locks = {}
+_entry_locks_lock = threading.Lock()
+
+def _entry_lock(dataset_dir):
+    with _entry_locks_lock:
+        return _entry_locks.setdefault(os.path.abspath(dataset_dir), threading.Lock())
+
+def sample_size_kb(rng, min_kb, max_kb, distribution="uniform", size_buckets=None):
+    """Draw one file size in KB from the given distribution."""
+    if distribution == "uniform":
+        return rng.randint(min_kb, max_kb)
+    if distribution == "lognormal":
+        # Median at the geometric mean of the range, most mass inside it
+        mu = (math.log(max(min_kb, 1)) + math.log(max_kb)) / 2
+        sigma = (math.log(max_kb) - math.log(max(min_kb, 1))) / 4 or 0.1
+        return int(min(max(rng.lognormvariate(mu, sigma), min_kb), max_kb))
+    if distribution == "buckets":
+        buckets = size_buckets or [(min_kb, 1), ((min_kb + max_kb) // 2, 1), (max_kb, 1)]
+        sizes = [size for size, _ in buckets]
+        weights = [weight for _, weight in buckets]
+        return rng.choices(sizes, weights=weights)[0]
+    raise ValueError(f"Unknown size distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+
+def _blocks(rng, size, profile):
+    remaining = size
+    while remaining > 0:
+        n = min(BLOCK_SIZE, remaining)
+        if profile == "repetitive":
+            yield _REPETITIVE_BLOCK[:n]
+        elif profile == "text":
+            yield _TEXT_BLOCK[:n]
+        elif profile == "random":
+            yield rng.randbytes(n)
+        elif profile == "mixed":
+            # Half of the blocks compress well, half not at all
+            yield rng.randbytes(n) if rng.random() < 0.5 else _TEXT_BLOCK[:n]
+        else:
+            raise ValueError(f"Unknown content profile {profile!r}, expected one of {PROFILES}")
+        remaining -= n
+
+def write_file(path, size, profile="repetitive", rng=None, header=b""):
+    """Write a file of exactly size bytes in BLOCK_SIZE pieces."""
+    rng = rng or random.Random(DEFAULT_SEED)
+    with open(path, "wb") as f:
+        f.write(header[:size])
+        for block in _blocks(rng, size - min(len(header), size), profile):
+            f.write(block)
+
+def dataset_key(**params):
+    """Stable hash of the generation parameters, used as the cache directory name."""
+    payload = json.dumps(dict(params, version=GENERATOR_VERSION), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def generate_dataset(num_files=100, min_kb=10, max_kb=1024, seed=DEFAULT_SEED, distribution="uniform",
+                     profile="repetitive", size_buckets=None, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """Generate (or reuse) a seeded dataset and return its directory."""
+    params = {"num_files": num_files, "min_kb": min_kb, "max_kb": max_kb, "seed": seed,
+              "distribution": distribution, "profile": profile, "size_buckets": size_buckets}
+    key = dataset_key(**params)
+    dataset_dir = os.path.join(cache_dir, key)
+    with _entry_lock(dataset_dir):
+        if use_cache and os.path.isdir(dataset_dir):
+            print(f"Reusing cached dataset {dataset_dir} ({num_files} files, {distribution}/{profile}).")
+            return dataset_dir
+
+        print(f"Generating {num_files} files with sizes between {min_kb}KB and {max_kb}KB "
+              f"({distribution} sizes, {profile} content, seed {seed})...")
+        os.makedirs(cache_dir, exist_ok=True)
+        # Each call writes its own copy, so another process generating the same entry never touches it
+        tmp_dir = f"{dataset_dir}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_dir)
+        size_rng = random.Random(seed)
+        content_rng = random.Random(seed + 1)
+        total_bytes = 0
+        for i in range(num_files):
+            size = sample_size_kb(size_rng, min_kb, max_kb, distribution, size_buckets) * 1024
+            write_file(os.path.join(tmp_dir, f"file_{i+1}.txt"), size, profile, content_rng)
+            total_bytes += size
+
+        # Publish atomically so an interrupted run never leaves a half-written cache entry. An entry
+        # another process published meanwhile holds the same files and may be in use: keep it.
+        if use_cache and os.path.isdir(dataset_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"Reusing dataset {dataset_dir}, published while this copy was generated.")
+            return dataset_dir
+        if os.path.isdir(dataset_dir):
+            stale_dir = f"{dataset_dir}.old-{uuid.uuid4().hex}"
+            os.replace(dataset_dir, stale_dir)
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, dataset_dir)
+        except OSError:
+            # Another process published it between the check and the rename
+            if not os.path.isdir(dataset_dir):
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return dataset_dir
+        with open(f"{dataset_dir}.json", "w") as f:
+            json.dump(dict(params, total_bytes=total_bytes), f, indent=2)
+    print(f"Dataset generation completed ({total_bytes / (1024 * 1024):.2f} MB in {dataset_dir}).")
+    return dataset_dir
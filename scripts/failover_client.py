@@ -0,0 +1,262 @@
+import collections
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from access_verifier import LatencyHistogram
+
+# Hedging and circuit-breaker defaults
+DEFAULT_HEDGE_PERCENTILE = 95
+MIN_HEDGE_DELAY = 0.005
+INITIAL_HEDGE_DELAY = 0.05
+LATENCY_WINDOW = 200
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 1.0
+DEFAULT_POOL_SIZE = 64
+
+class CircuitBreaker:
+    """closed -> open after failure_threshold consecutive failures; after reset_timeout a
+    single half-open probe decides between closing again and re-opening."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.transitions = []
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set(self, state):
+        if state != self.state:
+            self.state = state
+            self.transitions.append((time.monotonic(), state))
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set("half-open")
+            if self.state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set("open")
+
+class RegionHealth:
+    """A region client with its circuit breaker and recent latencies."""
+
+    def __init__(self, name, client, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.client = client
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self._recent = collections.deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds):
+        self.latency.record(seconds)
+        with self._lock:
+            self._recent.append(seconds)
+        self.breaker.record_success()
+
+    def record_failure(self):
+        with self._lock:
+            self.errors += 1
+        self.breaker.record_failure()
+
+    def recent_percentile(self, p):
+        with self._lock:
+            recent = sorted(self._recent)
+        if len(recent) < 10:
+            return None
+        return recent[min(len(recent) - 1, int(len(recent) * p / 100.0))]
+
+class FailoverClient:
+    """Read client over several region clients, in order of preference.
+
+    Each read goes to the first region whose breaker allows it. If it has not answered
+    within that region's recent hedge_percentile latency, the same read is also sent
+    to the next region and the first success wins; errors fail over immediately.
+    Breakers keep a failed region out of the rotation until a probe succeeds, which
+    is also how reads fail back to the primary.
+    """
+
+    def __init__(self, regions, hedge_percentile=DEFAULT_HEDGE_PERCENTILE, min_hedge_delay=MIN_HEDGE_DELAY,
+                 failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, pool_size=DEFAULT_POOL_SIZE):
+        self.regions = [RegionHealth(name, client, failure_threshold, reset_timeout) for name, client in regions]
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.latency = LatencyHistogram()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failed = 0
+        self.reads = []
+        self._pool = ThreadPoolExecutor(max_workers=pool_size)
+        self._lock = threading.Lock()
+
+    def _hedge_delay(self, region):
+        delay = region.recent_percentile(self.hedge_percentile)
+        return max(self.min_hedge_delay, INITIAL_HEDGE_DELAY if delay is None else delay)
+
+    def _read(self, region, bucket_name, object_name):
+        start = time.monotonic()
+        try:
+            response = region.client.get_object(bucket_name, object_name)
+            try:
+                data = response.read()
+            finally:
+                response.close()
+                response.release_conn()
+        except Exception as e:
+            region.record_failure()
+            return None, e
+        region.record_success(time.monotonic() - start)
+        return data, None
+
+    def get_object_bytes(self, bucket_name, object_name):
+        """Read a whole object from the best available region; raises the last error if all fail."""
+        issued_at = time.monotonic()
+        # A breaker is asked only when its region is about to be read: a half-open one admits a
+        # single probe, and a probe that is never sent would keep it shut to every later read
+        remaining = list(self.regions)
+        launched = []
+        pending = {}
+        forced = False
+        hedged = False
+        last_error = None
+
+        def launch():
+            while remaining:
+                region = remaining.pop(0)
+                if forced or region.breaker.allow():
+                    launched.append(region)
+                    pending[self._pool.submit(self._read, region, bucket_name, object_name)] = region
+                    return True
+            return False
+
+        if not launch():
+            # Every breaker is open: try the regions in order anyway rather than fail unread
+            remaining.extend(self.regions)
+            forced = True
+            launch()
+        while pending:
+            timeout = self._hedge_delay(launched[-1]) if remaining else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = launch() or hedged
+                continue
+            for future in done:
+                region = pending.pop(future)
+                data, error = future.result()
+                if error is None:
+                    # A region still working on a read its hedge already answered counts as
+                    # failed, so a hung region trips its breaker instead of tying up the pool
+                    for slower in pending.values():
+                        if launched.index(slower) < launched.index(region):
+                            slower.breaker.record_failure()
+                    self._record(issued_at, region, hedged, region is not launched[0])
+                    return data
+                last_error = error
+            if not pending and remaining:
+                launch()
+        self._record(issued_at, None, hedged, False)
+        raise last_error
+
+    def _record(self, issued_at, region, hedged, hedge_won):
+        completed_at = time.monotonic()
+        with self._lock:
+            self.reads.append((issued_at, completed_at, region.name if region else None, hedged))
+            self.hedged += hedged
+            self.hedge_wins += hedged and hedge_won
+            self.failed += region is None
+        if region is not None:
+            self.latency.record(completed_at - issued_at)
+
+    def observed_rto(self, since):
+        """Seconds from since (a time.monotonic() instant, e.g. a fault) until the first
+        read issued after it succeeded; None if none has yet."""
+        with self._lock:
+            completions = [done for issued, done, region, _ in self.reads if issued >= since and region]
+        return min(completions) - since if completions else None
+
+    def latency_since(self, since):
+        """Client-observed latency histogram of successful reads issued after since."""
+        histogram = LatencyHistogram()
+        with self._lock:
+            reads = [(issued, done) for issued, done, region, _ in self.reads if issued >= since and region]
+        for issued, done in reads:
+            histogram.record(done - issued)
+        return histogram
+
+    def first_served_by(self, region_name, since):
+        """Seconds from since until the first read issued after it was served by region_name."""
+        with self._lock:
+            completions = [done for issued, done, region, _ in self.reads if issued >= since and region == region_name]
+        return min(completions) - since if completions else None
+
+    def errors_since(self, since):
+        with self._lock:
+            return sum(1 for issued, _, region, _ in self.reads if issued >= since and region is None)
+
+    def served_by(self):
+        counts = collections.Counter()
+        with self._lock:
+            counts.update(region or "failed" for _, _, region, _ in self.reads)
+        return dict(counts)
+
+    def describe(self):
+        return (f"{len(self.reads)} reads, {self.failed} failed, {self.hedged} hedged ({self.hedge_wins} won by the "
+                f"hedge), served by {self.served_by()}; latency {self.latency.describe()}")
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+class ReadLoad:
+    """Closed-loop readers that keep reading random objects through a FailoverClient."""
+
+    def __init__(self, client, bucket_name, object_names, concurrency=4, seed=0):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_names = list(object_names)
+        self.concurrency = concurrency
+        self.seed = seed
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def _run(self, index):
+        rng = random.Random(self.seed + index)
+        while not self._stopped.is_set():
+            try:
+                self.client.get_object_bytes(self.bucket_name, rng.choice(self.object_names))
+            except Exception:
+                # Counted by the client; back off briefly so a full outage is not a busy loop
+                self._stopped.wait(0.01)
+
+    def start(self):
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._run, args=(index,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout)
@@ -0,0 +1,316 @@
+import json
+import subprocess
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from storage_backend import InMemoryBackend
+
+# docker-compose containers behind each endpoint
+REGION_CONTAINERS = {
+    "localhost:9001": "minio-region1",
+    "localhost:9002": "minio-region2",
+    "localhost:9003": "minio-raid",
+}
+FAULT_KINDS = ("kill", "stop", "pause", "partition", "drive")
+DEFAULT_STOP_TIMEOUT = 10
+# Polling of the endpoint while a graceful stop shuts the server down
+PROBE_INTERVAL = 0.05
+PROBE_TIMEOUT = 1.0
+
+def docker(*args):
+    """Run a docker CLI command and return its stdout; raises CalledProcessError on failure."""
+    return subprocess.run(["docker", *args], check=True, capture_output=True, text=True).stdout
+
+def endpoint_answers(endpoint, timeout=PROBE_TIMEOUT):
+    """Whether the MinIO server at endpoint still answers its liveness check."""
+    try:
+        with urllib.request.urlopen(f"http://{endpoint}/minio/health/live", timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+class FaultInjectionError(Exception):
+    """A fault could not be injected; event is the logged attempt, with its error."""
+
+    def __init__(self, event):
+        super().__init__(f"Fault injection failed ({event.fault.describe()}): {event.error}")
+        self.event = event
+
+class FaultEvent:
+    """Timestamps of one injected fault.
+
+    started_at is when injection was issued and effective_at when the fault was
+    certainly in effect: when the endpoint stopped answering during a graceful stop
+    (see ContainerFault), otherwise when the docker command returned. Both are
+    time.monotonic() values. wall_at is the wall-clock time of effective_at, for
+    comparing with server-side timestamps and write journals.
+    """
+
+    def __init__(self, fault):
+        self.fault = fault
+        self.started_at = None
+        self.effective_at = None
+        self.wall_at = None
+        self.recover_started_at = None
+        self.recovered_at = None
+        self.error = None
+
+    def inject_seconds(self):
+        return self.effective_at - self.started_at
+
+    def duration(self):
+        if self.recovered_at is None:
+            return None
+        return self.recovered_at - self.effective_at
+
+    def to_dict(self):
+        return {"fault": self.fault.describe(), "started_at": self.started_at, "effective_at": self.effective_at,
+                "wall_at": self.wall_at, "recover_started_at": self.recover_started_at,
+                "recovered_at": self.recovered_at, "error": self.error}
+
+class ContainerFault:
+    """kill (SIGKILL), stop (graceful, SIGTERM then SIGKILL after stop_timeout),
+    pause (freeze every process) or partition (disconnect from all networks).
+
+    docker stop returns only once the server has exited, up to stop_timeout after it
+    stopped answering; with the endpoint known, inject() polls it meanwhile and returns
+    the instant it went silent.
+    """
+
+    def __init__(self, container, mode="kill", stop_timeout=DEFAULT_STOP_TIMEOUT, endpoint=None):
+        if mode not in ("kill", "stop", "pause", "partition"):
+            raise ValueError(f"Unknown container fault {mode!r}")
+        self.container = container
+        self.mode = mode
+        self.stop_timeout = stop_timeout
+        self.endpoint = endpoint
+        self._networks = []
+
+    def describe(self):
+        return f"{self.mode} {self.container}"
+
+    def inject(self):
+        if self.mode == "kill":
+            docker("kill", self.container)
+        elif self.mode == "stop":
+            return self._stop()
+        elif self.mode == "pause":
+            docker("pause", self.container)
+        else:
+            networks = json.loads(docker("inspect", "-f", "{{json .NetworkSettings.Networks}}", self.container))
+            self._networks = sorted(networks)
+            for network in self._networks:
+                docker("network", "disconnect", network, self.container)
+
+    def _stop(self):
+        if self.endpoint is None:
+            docker("stop", "-t", str(self.stop_timeout), self.container)
+            return None
+        silent_at = None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            stopping = pool.submit(docker, "stop", "-t", str(self.stop_timeout), self.container)
+            while not stopping.done():
+                probed_at = time.monotonic()
+                if not endpoint_answers(self.endpoint):
+                    silent_at = probed_at
+                    break
+                time.sleep(PROBE_INTERVAL)
+            stopping.result()
+        return silent_at
+
+    def recover(self):
+        if self.mode in ("kill", "stop"):
+            docker("start", self.container)
+        elif self.mode == "pause":
+            docker("unpause", self.container)
+        else:
+            for network in self._networks:
+                docker("network", "connect", network, self.container)
+
+class DriveFault:
+    """Remove or corrupt one drive of an erasure-coded deployment.
+
+    Removal moves the drive's contents aside inside the same mount (a rename, so it is
+    instant), which the server sees as a missing/unformatted drive. Recovery moves
+    them back, or with replace=True discards them so the drive comes back empty and
+    must be healed. corrupt=True instead overwrites the first 4 KiB of every object
+    file on the drive (bitrot); only healing repairs that, so recovery is a no-op.
+    """
+
+    def __init__(self, container, drive, replace=False, corrupt=False):
+        self.container = container
+        self.drive = drive.rstrip("/")
+        self.replace = replace
+        self.corrupt = corrupt
+
+    def describe(self):
+        if self.corrupt:
+            return f"corrupt drive {self.drive} of {self.container}"
+        return f"remove drive {self.drive} of {self.container}" + (" (replace)" if self.replace else "")
+
+    def _aside(self):
+        return f"{self.drive}/.removed"
+
+    def inject(self):
+        if self.corrupt:
+            docker("exec", self.container, "sh", "-c",
+                   f"find {self.drive} -path {self.drive}/.minio.sys -prune -o -type f "
+                   f"-exec dd if=/dev/urandom of={{}} bs=4096 count=1 conv=notrunc status=none \\;")
+            return
+        aside = self._aside()
+        docker("exec", self.container, "sh", "-c",
+               f"mkdir -p {aside} && find {self.drive} -mindepth 1 -maxdepth 1 ! -name .removed "
+               f"-exec mv {{}} {aside}/ \\;")
+
+    def recover(self):
+        if self.corrupt:
+            return
+        aside = self._aside()
+        if self.replace:
+            docker("exec", self.container, "rm", "-rf", aside)
+        else:
+            docker("exec", self.container, "sh", "-c",
+                   f"find {aside} -mindepth 1 -maxdepth 1 -exec mv {{}} {self.drive}/ \\; && rmdir {aside}")
+
+class MemoryFault:
+    """The same faults against an InMemoryBackend: kill/stop/partition take it offline,
+    pause makes requests hang until it is resumed."""
+
+    def __init__(self, backend, mode="kill"):
+        if mode == "drive":
+            raise ValueError("The in-memory backend has no drives to remove")
+        if mode not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault {mode!r}, expected one of {FAULT_KINDS}")
+        self.backend = backend
+        self.mode = mode
+
+    def describe(self):
+        return f"{self.mode} {self.backend.name}"
+
+    def inject(self):
+        if self.mode == "pause":
+            self.backend.pause()
+        else:
+            self.backend.online = False
+
+    def recover(self):
+        if self.mode == "pause":
+            self.backend.resume()
+        else:
+            self.backend.online = True
+
+def make_fault(kind, region_client=None, container=None, endpoint=None, **options):
+    """Build a fault for a region client (in-memory) or a container/endpoint (docker)."""
+    if isinstance(region_client, InMemoryBackend):
+        return MemoryFault(region_client, kind)
+    container = container or REGION_CONTAINERS.get(endpoint)
+    if container is None:
+        raise ValueError("A container name or a known endpoint is required for docker faults")
+    if kind == "drive":
+        return DriveFault(container, options["drive"], replace=options.get("replace", False),
+                          corrupt=options.get("corrupt", False))
+    endpoint = endpoint or {c: e for e, c in REGION_CONTAINERS.items()}.get(container)
+    return ContainerFault(container, kind, stop_timeout=options.get("stop_timeout", DEFAULT_STOP_TIMEOUT),
+                          endpoint=endpoint)
+
+class FaultInjector:
+    """Inject and recover faults, keeping a timestamped log; faults can be scheduled
+    to run on background threads while a workload is active."""
+
+    def __init__(self):
+        self.events = []
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def inject(self, fault):
+        """Inject fault and return its event; raises FaultInjectionError if the fault did not take
+        effect, so callers abort the run instead of measuring an outage that never happened.
+
+        A fault's inject() may return the time.monotonic() instant it took effect; None
+        means when inject() returned.
+        """
+        event = FaultEvent(fault)
+        event.started_at = time.monotonic()
+        try:
+            took_effect_at = fault.inject()
+        except Exception as e:
+            event.error = str(e)
+            event.effective_at = time.monotonic()
+            event.wall_at = time.time()
+            with self._lock:
+                self.events.append(event)
+            print(f"Fault injection failed ({fault.describe()}): {e}")
+            # Undo whatever part of the fault did take effect before giving up
+            try:
+                fault.recover()
+            except Exception:
+                pass
+            raise FaultInjectionError(event) from e
+        now = time.monotonic()
+        event.effective_at = now if took_effect_at is None else took_effect_at
+        event.wall_at = time.time() - (now - event.effective_at)
+        with self._lock:
+            self.events.append(event)
+        print(f"Injected {fault.describe()} (took {event.inject_seconds() * 1000:.0f}ms)")
+        return event
+
+    def recover(self, event):
+        event.recover_started_at = time.monotonic()
+        try:
+            event.fault.recover()
+        except Exception as e:
+            event.error = str(e)
+            print(f"Fault recovery failed ({event.fault.describe()}): {e}")
+        event.recovered_at = time.monotonic()
+        print(f"Recovered from {event.fault.describe()} after {event.duration():.2f}s")
+        return event
+
+    def schedule(self, fault, delay, duration=None):
+        """Inject fault after delay seconds and, if duration is given, recover it duration seconds later."""
+        def run():
+            time.sleep(delay)
+            try:
+                event = self.inject(fault)
+            except FaultInjectionError:
+                # Already logged in self.events with its error
+                return
+            if duration is not None:
+                time.sleep(duration)
+                self.recover(event)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def run_schedule(self, schedule):
+        """Start every (delay, fault, duration) entry; all delays are relative to now."""
+        for delay, fault, duration in schedule:
+            self.schedule(fault, delay, duration)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Inject a fault into a MinIO container and recover it.")
+    parser.add_argument("kind", choices=FAULT_KINDS)
+    parser.add_argument("container", help="container name, e.g. minio-region1")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds before recovery")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before injection")
+    parser.add_argument("--drive", help="drive path inside the container, for kind=drive")
+    parser.add_argument("--replace", action="store_true", help="bring the drive back empty")
+    parser.add_argument("--stop-timeout", type=int, default=DEFAULT_STOP_TIMEOUT)
+    args = parser.parse_args()
+
+    injector = FaultInjector()
+    fault = make_fault(args.kind, container=args.container, drive=args.drive, replace=args.replace,
+                       stop_timeout=args.stop_timeout)
+    injector.schedule(fault, args.delay, args.duration)
+    injector.join()
+    for event in injector.events:
+        print(json.dumps(event.to_dict()))
+
+if __name__ == "__main__":
+    main()
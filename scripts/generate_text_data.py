@@ -1,4 +1,5 @@
 import os
+from dataset_generator import write_file
 
 # Directory to store sample data
 output_dir = "./sample_data"
@@ -11,12 +12,10 @@ This is a sample file for testing disaster recovery in MinIO.
 The file contains repetitive data to fill the required size.
 """ + ("Sample Data\n" * 100)
 
-# Function to create a file with specified size
+# Function to create a file with specified size, streamed in blocks by the shared generator
 def create_sample_file(filename, size_kb):
-    content = content_template.format(filename=filename, filesize=size_kb)
-    content *= (size_kb * 1024) // len(content)  # Repeat to match size
-    with open(os.path.join(output_dir, filename), "w") as file:
-        file.write(content)
+    header = content_template.format(filename=filename, filesize=size_kb).encode()
+    write_file(os.path.join(output_dir, filename), size_kb * 1024, profile="text", header=header)
 
 # Generate files
 def generate_files():
@@ -0,0 +1,196 @@
+import json
+import os
+import random
+import threading
+import time
+from access_verifier import LatencyHistogram
+
+# Per-bucket read counts recorded before a failure (run from the repository root)
+DEFAULT_ACCESS_DIR = "./access_stats"
+RESTORE_PRIORITIES = ("access", "size")
+# "Served from primary" milestone: share of the recovered read traffic
+PRIMARY_SHARE = 0.99
+
+def access_stats_path(bucket_name, access_dir=DEFAULT_ACCESS_DIR):
+    return os.path.join(access_dir, f"{bucket_name}.json")
+
+class AccessCounter:
+    """Read counts per object, used to restore the most-read objects first."""
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self._lock = threading.Lock()
+
+    def record(self, object_name):
+        with self._lock:
+            self.counts[object_name] = self.counts.get(object_name, 0) + 1
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.counts, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+def load_priority_list(priority):
+    """An explicit priority list: a list of names, or a file with one name per line."""
+    if isinstance(priority, str):
+        with open(priority) as f:
+            return [line.strip() for line in f if line.strip()]
+    return list(priority)
+
+def restore_order(object_names, sizes, counts=None, priority="access"):
+    """Order objects for a background restore.
+
+    priority "access" restores the most-read objects first (by counts), "size" the
+    smallest first; anything else is an explicit priority
+    list (see load_priority_list) restored first, with the rest following by access.
+    """
+    counts = counts or {}
+    if priority == "size":
+        return sorted(object_names, key=lambda name: (sizes[name], name))
+    by_access = sorted(object_names, key=lambda name: (-counts.get(name, 0), name))
+    if priority == "access":
+        return by_access
+    names = set(object_names)
+    first = [name for name in dict.fromkeys(load_priority_list(priority)) if name in names]
+    chosen = set(first)
+    return first + [name for name in by_access if name not in chosen]
+
+class RecoveryReader:
+    """Read path while a bucket is being restored.
+
+    Reads go to the region first; an object it does not have yet is answered from
+    the backup store instead (and on_miss is told, so the restore can fetch it
+    next). Without a store, misses simply fail as they would without instant recovery.
+    """
+
+    def __init__(self, region_client, bucket_name, store=None, on_miss=None, counter=None):
+        self.region_client = region_client
+        self.bucket_name = bucket_name
+        self.store = store
+        self.backup_names = set(store.object_names()) if store is not None else set()
+        self.on_miss = on_miss
+        self.counter = counter
+        self.primary_reads = 0
+        self.backup_reads = 0
+        self.failed_reads = 0
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def _read_primary(self, object_name):
+        response = self.region_client.get_object(self.bucket_name, object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _read_backup(self, object_name):
+        if self.on_miss is not None:
+            self.on_miss(object_name)
+        with self.store.open_object(object_name) as reader:
+            return reader.read()
+
+    def read(self, object_name):
+        """Return (source, data) where source is "primary" or "backup"; raise if neither has it."""
+        start = time.monotonic()
+        if self.counter is not None:
+            self.counter.record(object_name)
+        try:
+            try:
+                data, source = self._read_primary(object_name), "primary"
+            except Exception as e:
+                if getattr(e, "code", None) != "NoSuchKey" or object_name not in self.backup_names:
+                    raise
+                data, source = self._read_backup(object_name), "backup"
+        except Exception:
+            with self._lock:
+                self.failed_reads += 1
+            raise
+        with self._lock:
+            if source == "primary":
+                self.primary_reads += 1
+            else:
+                self.backup_reads += 1
+            self.latency.record(time.monotonic() - start)
+        return source, data
+
+class SkewedReadLoad:
+    """Closed-loop readers requesting objects with Zipf-distributed popularity.
+
+    Which objects are popular is a seeded shuffle of the names, so it is the same
+    before and after a failure. Each read is logged as (time.monotonic(), name, source),
+    with source None for a failed read.
+    """
+
+    def __init__(self, reader, object_names, concurrency=4, skew=1.0, seed=0):
+        self.reader = reader
+        self.object_names = sorted(object_names)
+        random.Random(seed).shuffle(self.object_names)
+        self.cum_weights = []
+        total = 0.0
+        for rank in range(len(self.object_names)):
+            total += 1.0 / (rank + 1) ** skew
+            self.cum_weights.append(total)
+        self.concurrency = concurrency
+        self.seed = seed
+        self.reads = []
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def _run(self, index):
+        rng = random.Random(self.seed + index)
+        while not self._stopped.is_set():
+            name = rng.choices(self.object_names, cum_weights=self.cum_weights)[0]
+            try:
+                source, _ = self.reader.read(name)
+            except Exception:
+                source = None
+                # Back off briefly so reading a lost object is not a busy loop
+                self._stopped.wait(0.01)
+            self.reads.append((time.monotonic(), name, source))
+
+    def start(self):
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._run, args=(index,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def first_read_of(self, object_names, since):
+        """Seconds from since to the first successful read of any of object_names (None if none)."""
+        object_names = set(object_names)
+        times = [at for at, name, source in self.reads if source is not None and name in object_names and at >= since]
+        return min(times) - since if times else None
+
+def primary_share_seconds(object_names, lost, completed_at, counts, since, share=PRIMARY_SHARE):
+    """Seconds from since until objects drawing share of the recorded reads are back on the primary.
+
+    Objects that were lost and never restored (not in the backup) are left out, so
+    the share is of the read traffic recovery can serve at all. Returns None if the
+    restore never got there.
+    """
+    lost = set(lost)
+    weights = {name: counts.get(name, 0) + 1 for name in object_names if name not in lost or name in completed_at}
+    total = sum(weights.values())
+    available = sum(weight for name, weight in weights.items() if name not in lost)
+    if available >= share * total:
+        return 0.0
+    for name in sorted((name for name in lost if name in completed_at), key=completed_at.get):
+        available += weights[name]
+        if available >= share * total:
+            return max(0.0, completed_at[name] - since)
+    return None
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from access_verifier import DEFAULT_WORKERS, READ_BUFFER_SIZE
+from bulk_ops import list_bucket
+
+# Per-bucket manifests of what was uploaded (run from the repository root)
+DEFAULT_INTEGRITY_DIR = "./integrity"
+VERIFY_MODES = ("full", "etag")
+
+class HashingReader:
+    """File-like wrapper that hashes (SHA-256) and counts bytes as they are read."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.sha256.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+class IntegrityManifest:
+    """Size, SHA-256 and ETag of every object as uploaded.
+
+    Re-recording an object keeps the previous versions' hashes, so a copy that
+    matches one of them can be told apart (stale) from one that matches nothing
+    (corrupt).
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+
+    def record(self, object_name, size, sha256, etag=None):
+        with self._lock:
+            previous = self.entries.get(object_name)
+            history = []
+            if previous is not None:
+                history = previous.get("previous", []) + [{"sha256": previous["sha256"], "etag": previous["etag"]}]
+            self.entries[object_name] = {"size": size, "sha256": sha256, "etag": etag, "previous": history}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"objects": self.entries}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f)["objects"])
+
+def manifest_path(bucket_name, integrity_dir=DEFAULT_INTEGRITY_DIR):
+    return os.path.join(integrity_dir, f"{bucket_name}.json")
+
+def upload_file(region_client, bucket_name, object_name, file_path, manifest):
+    """Upload a file, hashing it while it streams, and record it in the manifest."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        reader = HashingReader(f)
+        result = region_client.put_object(bucket_name, object_name, reader, length=size)
+    manifest.record(object_name, reader.size, reader.hexdigest(), getattr(result, "etag", None))
+    return result
+
+def hash_stream(stream, buffer_size=READ_BUFFER_SIZE):
+    """Return (size, sha256 hexdigest) of a file-like stream read in fixed-size pieces."""
+    sha256 = hashlib.sha256()
+    size = 0
+    while True:
+        data = stream.read(buffer_size)
+        if not data:
+            break
+        sha256.update(data)
+        size += len(data)
+    return size, sha256.hexdigest()
+
+class IntegrityReport:
+    """Objects of a manifest classified as intact, corrupt, stale or missing in one copy.
+
+    Objects that could not be checked (a read failed for another reason than a missing
+    key) are kept apart in errors as (name, message) pairs: they are not counted as lost.
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.intact = 0
+        self.corrupt = []
+        self.stale = []
+        self.missing = []
+        self.errors = []
+        self.hashed_bytes = 0
+        self.etag_checked = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def classify(self, object_name, entry, size=None, sha256=None, etag=None):
+        """Record one copy; with sha256 the bytes are compared, otherwise only size and ETag."""
+        with self._lock:
+            if sha256 is not None:
+                self.hashed_bytes += size or 0
+                current = sha256 == entry["sha256"] and size == entry["size"]
+                older = any(v["sha256"] == sha256 for v in entry.get("previous", []))
+            else:
+                self.etag_checked += 1
+                current = etag == entry["etag"] and size == entry["size"]
+                older = any(v["etag"] == etag for v in entry.get("previous", []))
+            if current:
+                self.intact += 1
+            elif older:
+                self.stale.append(object_name)
+            else:
+                self.corrupt.append(object_name)
+
+    def add_missing(self, object_name):
+        with self._lock:
+            self.missing.append(object_name)
+
+    def add_error(self, object_name, error):
+        print(f"Could not verify {object_name}: {error}")
+        with self._lock:
+            self.errors.append((object_name, str(error)))
+
+    def intact_percentage(self):
+        return self.intact / self.expected * 100 if self.expected else 100.0
+
+    def metrics(self, prefix=""):
+        return {f"{prefix}intact_objects": self.intact, f"{prefix}corrupt_objects": len(self.corrupt),
+                f"{prefix}stale_objects": len(self.stale), f"{prefix}missing_objects": len(self.missing),
+                f"{prefix}error_objects": len(self.errors),
+                f"{prefix}integrity_seconds": self.elapsed}
+
+    def describe(self):
+        return (f"{self.intact}/{self.expected} intact, {len(self.corrupt)} corrupt, {len(self.stale)} stale, "
+                f"{len(self.missing)} missing, {len(self.errors)} errors ({self.etag_checked} by ETag, "
+                f"{self.hashed_bytes / (1024 * 1024):.2f} MB hashed in {self.elapsed:.2f}s)")
+
+def _etag_conclusive(etag, entry):
+    # Multipart ETags depend on the part size, so a mismatch between them proves nothing
+    return etag == entry["etag"] or not (etag and "-" in etag) and not (entry["etag"] and "-" in entry["etag"])
+
+def _is_missing(error, code):
+    return getattr(error, "code", None) == code
+
+def verify_region(region_client, bucket_name, manifest, mode="full", workers=DEFAULT_WORKERS,
+                  buffer_size=READ_BUFFER_SIZE):
+    """Check a region's copy of every manifest object and return an IntegrityReport.
+
+    mode="full" streams and hashes every object in parallel; mode="etag" only compares
+    the listing's size and ETag and hashes just the objects whose ETag is inconclusive.
+    """
+    if mode not in VERIFY_MODES:
+        raise ValueError(f"Unknown verification mode {mode!r}, expected one of {VERIFY_MODES}")
+    report = IntegrityReport(len(manifest.entries))
+    start = time.perf_counter()
+    try:
+        listing = {obj.object_name: obj for obj in list_bucket(region_client, bucket_name)}
+    except Exception as e:
+        if not _is_missing(e, "NoSuchBucket"):
+            # Nothing can be checked; the objects are unverified, not lost
+            print(f"Could not list {bucket_name}: {e}")
+            for object_name in manifest.entries:
+                report.add_error(object_name, e)
+            report.elapsed = time.perf_counter() - start
+            return report
+        listing = {}
+
+    def task(object_name, entry):
+        try:
+            response = region_client.get_object(bucket_name, object_name)
+            try:
+                size, sha256 = hash_stream(response, buffer_size)
+            finally:
+                response.close()
+                response.release_conn()
+        except Exception as e:
+            # Deleted between the listing and the read; any other failure is an error, not a loss
+            if _is_missing(e, "NoSuchKey"):
+                report.add_missing(object_name)
+            else:
+                report.add_error(object_name, e)
+            return
+        report.classify(object_name, entry, size, sha256)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for object_name, entry in manifest.entries.items():
+            obj = listing.get(object_name)
+            if obj is None:
+                report.add_missing(object_name)
+            elif mode == "etag" and _etag_conclusive(obj.etag, entry):
+                report.classify(object_name, entry, obj.size, etag=obj.etag)
+            else:
+                pool.submit(task, object_name, entry)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def verify_store(store, manifest, object_names=None, workers=DEFAULT_WORKERS, buffer_size=READ_BUFFER_SIZE):
+    """Hash the backup store's copies (of object_names, default all manifest objects) in parallel."""
+    names = list(object_names) if object_names is not None else list(manifest.entries)
+    report = IntegrityReport(len(names))
+    start = time.perf_counter()
+    available = set(store.object_names())
+
+    def task(object_name):
+        try:
+            with store.open_object(object_name) as reader:
+                size, sha256 = hash_stream(reader, buffer_size)
+        except Exception as e:
+            # The store listed the object, so a failed read is an error rather than a missing copy
+            report.add_error(object_name, e)
+            return
+        report.classify(object_name, manifest.entries[object_name], size, sha256)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for object_name in names:
+            if object_name in available and object_name in manifest.entries:
+                pool.submit(task, object_name)
+            else:
+                report.add_missing(object_name)
+    report.elapsed = time.perf_counter() - start
+    return report
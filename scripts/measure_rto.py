@@ -1,8 +1,8 @@
 import time
-from minio import Minio
+from storage_backend import make_region_client
 
 # Configure MinIO client for Region 2
-region2 = Minio("localhost:9002", access_key="minioadmin", secret_key="minioadmin", secure=False)
+region2 = make_region_client("localhost:9002")
 
 # Measure RTO
 def measure_rto(bucket_name, object_name):
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from storage_backend import Part
+
+# Objects at least this large are moved as parallel ranged GETs / multipart parts
+LARGE_OBJECT_THRESHOLD = 64 * 1024 * 1024
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 512 * 1024 * 1024
+MAX_PARTS = 10000
+PARTS_PER_WORKER = 4
+TARGET_PART_SECONDS = 2.0
+DEFAULT_PART_WORKERS = 8
+DEFAULT_PART_RETRIES = 3
+PART_RETRY_BACKOFF_SECONDS = 0.5
+# Checkpoints (and partially downloaded spool files) of interrupted transfers
+DEFAULT_CHECKPOINT_DIR = "./checkpoints"
+# Region MinIO reports for its buckets unless configured otherwise (the stand-in has no regions)
+DEFAULT_REGION = "us-east-1"
+
+class ThroughputEstimator:
+    """Moving average of single-part transfer speed (bytes/sec), shared by all transfers."""
+
+    def __init__(self, weight=0.2):
+        self.weight = weight
+        self.bytes_per_second = None
+        self._lock = threading.Lock()
+
+    def record(self, size, seconds):
+        if seconds <= 0:
+            return
+        with self._lock:
+            rate = size / seconds
+            self.bytes_per_second = rate if self.bytes_per_second is None else \
+                (1 - self.weight) * self.bytes_per_second + self.weight * rate
+
+part_throughput = ThroughputEstimator()
+
+def choose_part_size(size, workers=DEFAULT_PART_WORKERS, bytes_per_second=None):
+    """Part size for an object of size bytes moved by workers parallel streams.
+
+    Enough parts to keep every worker busy (PARTS_PER_WORKER each) and, once the
+    per-stream speed is known, no part longer than TARGET_PART_SECONDS, so a retry or
+    a resume repeats little work. Clamped to S3's limits and rounded up to whole MiB.
+    """
+    part_size = size / max(1, workers * PARTS_PER_WORKER)
+    if bytes_per_second:
+        part_size = min(part_size, bytes_per_second * TARGET_PART_SECONDS)
+    part_size = max(MIN_PART_SIZE, min(MAX_PART_SIZE, part_size), math.ceil(size / MAX_PARTS))
+    mib = 1024 * 1024
+    return int(math.ceil(part_size / mib) * mib)
+
+def _part_range(part_number, part_size, size):
+    offset = (part_number - 1) * part_size
+    return offset, min(part_size, size - offset)
+
+class Checkpoint:
+    """Progress of one multipart transfer, saved after every completed part.
+
+    It is only reused for the same source version (size and ETag); the part size
+    chosen when the transfer started is kept so completed parts stay valid.
+    """
+
+    def __init__(self, path, key, size, etag, part_size, upload_id=None, parts=None):
+        self.path = path
+        self.key = key
+        self.size = size
+        self.etag = etag
+        self.part_size = part_size
+        self.upload_id = upload_id
+        self.parts = parts or {}
+        self._lock = threading.Lock()
+
+    def part_count(self):
+        return max(1, math.ceil(self.size / self.part_size))
+
+    def pending(self):
+        return [n for n in range(1, self.part_count() + 1) if n not in self.parts]
+
+    def complete(self, part_number, etag):
+        with self._lock:
+            self.parts[part_number] = etag
+            self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": self.key, "size": self.size, "etag": self.etag, "part_size": self.part_size,
+                       "upload_id": self.upload_id, "parts": {str(n): e for n, e in self.parts.items()}}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @classmethod
+    def open(cls, checkpoint_dir, key, size, etag, part_size):
+        """Resume the checkpoint for key if it matches this source version, else start a new one.
+
+        Returns (checkpoint, stale) where stale is the discarded checkpoint, if any.
+        """
+        path = os.path.join(checkpoint_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+        stale = None
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            previous = cls(path, data["key"], data["size"], data["etag"], data["part_size"], data["upload_id"],
+                           {int(n): e for n, e in data["parts"].items()})
+            if previous.key == key and previous.size == size and previous.etag == etag:
+                return previous, None
+            stale = previous
+        return cls(path, key, size, etag, part_size), stale
+
+def _run_parts(checkpoint, transfer_part, workers, retries):
+    """Transfer every pending part on a pool, retrying each; raises the first part that fails for good."""
+    def task(part_number):
+        offset, length = _part_range(part_number, checkpoint.part_size, checkpoint.size)
+        for attempt in range(1, retries + 2):
+            start = time.monotonic()
+            try:
+                etag = transfer_part(part_number, offset, length)
+            except Exception:
+                if attempt > retries:
+                    raise
+                time.sleep(PART_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+                continue
+            part_throughput.record(length, time.monotonic() - start)
+            checkpoint.complete(part_number, etag)
+            return length
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task, n) for n in checkpoint.pending()]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
+
+def _read_range(client, bucket_name, object_name, offset, length):
+    response = client.get_object(bucket_name, object_name, offset=offset, length=length)
+    try:
+        data = response.read()
+    finally:
+        response.close()
+        response.release_conn()
+    if len(data) != length:
+        raise IOError(f"short read of {object_name} at {offset}: {len(data)} of {length} bytes")
+    return data
+
+def _location(client, bucket_name):
+    """endpoint/region a region client reaches bucket_name at, so transfers of the same
+    object between different regions keep separate checkpoints."""
+    base_url = getattr(client, "_base_url", None)
+    if base_url is None:
+        return f"{client.name}/{DEFAULT_REGION}"
+    return f"{base_url.host}/{client._get_region(bucket_name)}"
+
+def multipart_copy(source_client, target_client, bucket_name, object_name, size, etag=None,
+                   workers=DEFAULT_PART_WORKERS, retries=DEFAULT_PART_RETRIES, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """Copy one large object between regions as parallel ranged GETs and multipart-upload parts.
+
+    Completed parts are checkpointed, so a copy that fails (or a process that dies)
+    resumes the same multipart upload from the last completed part on the next call.
+    """
+    key = f"copy:{_location(source_client, bucket_name)}->{_location(target_client, bucket_name)}:" \
+          f"{bucket_name}/{object_name}"
+    checkpoint, stale = Checkpoint.open(checkpoint_dir, key, size, etag,
+                                        choose_part_size(size, workers, part_throughput.bytes_per_second))
+    if stale is not None and stale.upload_id:
+        try:
+            target_client._abort_multipart_upload(bucket_name, object_name, stale.upload_id)
+        except Exception:
+            pass
+    if checkpoint.parts:
+        print(f"Resuming {object_name}: {len(checkpoint.parts)}/{checkpoint.part_count()} parts already copied")
+    if checkpoint.upload_id is None:
+        checkpoint.upload_id = target_client._create_multipart_upload(
+            bucket_name, object_name, {"Content-Type": "application/octet-stream"})
+        checkpoint.save()
+
+    def transfer_part(part_number, offset, length):
+        data = _read_range(source_client, bucket_name, object_name, offset, length)
+        return target_client._upload_part(bucket_name, object_name, data, None, checkpoint.upload_id, part_number)
+
+    try:
+        _run_parts(checkpoint, transfer_part, workers, retries)
+    except Exception as e:
+        # S3Error and the stand-in's StorageError both carry the S3 error code
+        if getattr(e, "code", None) != "NoSuchUpload":
+            raise
+        # The upload expired or was aborted: its parts are gone, so start over
+        checkpoint.remove()
+        return multipart_copy(source_client, target_client, bucket_name, object_name, size, etag, workers, retries,
+                              checkpoint_dir)
+    result = target_client._complete_multipart_upload(
+        bucket_name, object_name, checkpoint.upload_id,
+        [Part(n, checkpoint.parts[n]) for n in sorted(checkpoint.parts)])
+    checkpoint.remove()
+    return result
+
+def multipart_download(client, bucket_name, object_name, size, etag=None, workers=DEFAULT_PART_WORKERS,
+                       retries=DEFAULT_PART_RETRIES, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """Download one large object with parallel ranged GETs into a spool file; return its path.
+
+    Parts are written in place and checkpointed, so an interrupted download resumes
+    from the parts already on disk. The caller removes the spool file (and the
+    checkpoint, with finish_download) once it has consumed it.
+    """
+    key = f"download:{_location(client, bucket_name)}:{bucket_name}/{object_name}"
+    checkpoint, stale = Checkpoint.open(checkpoint_dir, key, size, etag,
+                                        choose_part_size(size, workers, part_throughput.bytes_per_second))
+    spool_path = checkpoint.path[:-len(".json")] + ".part"
+    if stale is not None or not os.path.exists(spool_path):
+        checkpoint.parts = {}
+    if checkpoint.parts:
+        print(f"Resuming {object_name}: {len(checkpoint.parts)}/{checkpoint.part_count()} parts already downloaded")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(spool_path, "ab"):
+        pass
+    fd = os.open(spool_path, os.O_RDWR)
+    try:
+        os.ftruncate(fd, size)
+
+        def transfer_part(part_number, offset, length):
+            data = _read_range(client, bucket_name, object_name, offset, length)
+            os.pwrite(fd, data, offset)
+            return hashlib.md5(data).hexdigest()
+
+        _run_parts(checkpoint, transfer_part, workers, retries)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return spool_path
+
+def finish_download(spool_path):
+    """Remove a consumed spool file and its checkpoint."""
+    for path in (spool_path, spool_path[:-len(".part")] + ".json"):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,98 @@
+import hashlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Objects smaller than the threshold travel in bundles of about DEFAULT_BUNDLE_SIZE bytes
+DEFAULT_BUNDLE_THRESHOLD = 256 * 1024
+DEFAULT_BUNDLE_SIZE = 8 * 1024 * 1024
+MAX_BUNDLE_OBJECTS = 1000
+# Concurrent GETs used to gather one bundle from the source
+DEFAULT_FETCH_WORKERS = 8
+
+def iter_bundles(objects, threshold=DEFAULT_BUNDLE_THRESHOLD, bundle_size=DEFAULT_BUNDLE_SIZE,
+                 max_objects=MAX_BUNDLE_OBJECTS, size=lambda obj: obj.size or 0):
+    """Group objects as they arrive, yielding ("bundle", [objects]) and ("single", object).
+
+    Objects under threshold bytes are grouped, in the order given, into bundles of at
+    most bundle_size bytes and max_objects objects; the rest are yielded as singles
+    to transfer one by one. A bundle is yielded as soon as it is full, so objects can
+    come from a stream.
+    """
+    current = []
+    current_bytes = 0
+    for obj in objects:
+        obj_size = size(obj)
+        if obj_size >= threshold:
+            yield "single", obj
+            continue
+        if current and (current_bytes + obj_size > bundle_size or len(current) >= max_objects):
+            yield "bundle", current
+            current = []
+            current_bytes = 0
+        current.append(obj)
+        current_bytes += obj_size
+    if current:
+        yield "bundle", current
+
+def plan_bundles(objects, threshold=DEFAULT_BUNDLE_THRESHOLD, bundle_size=DEFAULT_BUNDLE_SIZE,
+                 max_objects=MAX_BUNDLE_OBJECTS, size=lambda obj: obj.size or 0):
+    """Split objects into (bundles, singles) as iter_bundles groups them."""
+    bundles = []
+    singles = []
+    for kind, item in iter_bundles(objects, threshold, bundle_size, max_objects, size):
+        (bundles if kind == "bundle" else singles).append(item)
+    return bundles, singles
+
+def _read_object(client, bucket_name, object_name):
+    response = client.get_object(bucket_name, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+def fetch_bundle(client, bucket_name, object_names, workers=DEFAULT_FETCH_WORKERS):
+    """Read the objects of one bundle with overlapping GETs; return [(name, data)] in order."""
+    object_names = list(object_names)
+    if len(object_names) <= 1 or workers <= 1:
+        return [(name, _read_object(client, bucket_name, name)) for name in object_names]
+    with ThreadPoolExecutor(max_workers=min(workers, len(object_names))) as pool:
+        data = list(pool.map(lambda name: _read_object(client, bucket_name, name), object_names))
+    return list(zip(object_names, data))
+
+def _snowball_entries(entries):
+    from minio.commonconfig import SnowballObject
+    return [SnowballObject(name, data=io.BytesIO(data), length=len(data)) for name, data in entries]
+
+def put_bundle(client, bucket_name, entries):
+    """Write [(name, data)] with a single PUT; return {name: etag}.
+
+    The bundle is a TAR whose member headers are the index; MinIO unpacks it into
+    the individual objects on arrival (snowball auto-extract). The returned ETags
+    are the MD5s of the objects, which is what the unpacked objects carry.
+    """
+    entries = list(entries)
+    client.upload_snowball_objects(bucket_name, _snowball_entries(entries))
+    return {name: hashlib.md5(data).hexdigest() for name, data in entries}
+
+def transfer_bundle(write, entries_for, objects, retries, stats, backoff, size=lambda obj: obj.size or 0,
+                    name=lambda obj: obj.object_name):
+    """Gather and write one bundle with retries, recording every object in stats.
+
+    entries_for(objects) returns the bundle's [(name, data)] and write(entries) stores
+    it and returns {name: etag}. A failed attempt retries the whole bundle.
+    """
+    for attempt in range(1, retries + 2):
+        try:
+            etags = write(entries_for(objects))
+            for obj in objects:
+                stats.record_success(name(obj), size(obj), etags.get(name(obj)), attempt)
+            return True
+        except Exception as e:
+            if attempt > retries:
+                print(f"Failed to transfer a bundle of {len(objects)} objects after {attempt} attempts: {e}")
+                for obj in objects:
+                    stats.record_failure(name(obj), e, attempt)
+                return False
+            time.sleep(backoff * (2 ** (attempt - 1)))
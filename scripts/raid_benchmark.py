@@ -0,0 +1,148 @@
+import time
+from access_verifier import verify_bucket
+from bulk_ops import clear_bucket, list_bucket, upload_directory
+from dataset_generator import generate_dataset, DEFAULT_SEED
+from fault_injection import FaultInjector, FaultInjectionError, make_fault, docker, REGION_CONTAINERS
+from readiness_tracker import ReadinessTracker
+from results_store import record_results
+from storage_backend import make_region_client, InMemoryBackend
+from tracing import Tracer
+
+# Erasure set served by the minio-raid service (4 drives, EC:2 by default)
+RAID_ENDPOINT = "localhost:9003"
+RAID_CONTAINER = REGION_CONTAINERS[RAID_ENDPOINT]
+DRIVES = ("/data1", "/data2", "/data3", "/data4")
+MC_ALIAS = "raid"
+HEAL_MARKER = "/tmp/raid-heal-started"
+FAILURE_MODES = ("remove", "corrupt")
+
+raid = make_region_client(RAID_ENDPOINT)
+bucket_name = "raid-bucket"
+injector = FaultInjector()
+
+def rewritten_bytes(drive, container=RAID_CONTAINER):
+    """Bytes of the files on one drive written since the last heal_bucket started, excluding
+    MinIO's own metadata; a replaced drive counts in full, a corrupted one only for the repaired shards."""
+    out = docker("exec", container, "sh", "-c",
+                 f"find {drive} \\( -path {drive}/.minio.sys -o -path {drive}/.removed \\) -prune -o "
+                 f"-type f -newer {HEAL_MARKER} -printf '%s\\n'")
+    return sum(int(size) for size in out.split())
+
+def heal_bucket(bucket_name, container=RAID_CONTAINER):
+    """Run a recursive heal of the bucket with mc inside the container; return its duration."""
+    docker("exec", container, "mc", "alias", "set", MC_ALIAS, "http://localhost:9000", "minioadmin", "minioadmin")
+    # Files modified after the marker are the ones the heal rewrote (see rewritten_bytes)
+    docker("exec", container, "touch", HEAL_MARKER)
+    start = time.monotonic()
+    docker("exec", container, "mc", "admin", "heal", "--recursive", "--json", f"{MC_ALIAS}/{bucket_name}")
+    return time.monotonic() - start
+
+def measure_reads(tracer, label, bucket_name):
+    with tracer.span(f"{label.lower()}_read") as span:
+        report = verify_bucket(raid, bucket_name)
+        span.add(bytes=report.bytes, objects=report.accessible, errors=len(report.failed),
+                 listing_seconds=report.listing_seconds)
+    for object_name, error in report.failed:
+        print(f"Failed to read {object_name}: {error}")
+    print(f"{label} reads: {report.describe()}")
+    return report
+
+def run_raid_benchmark(num_files=200, min_kb=10, max_kb=1024, failed_drives=1, failure="remove", seed=DEFAULT_SEED,
+                       distribution="uniform", profile="random", bucket_name=bucket_name, cprofile_phase=None,
+                       matrix_name=None):
+    """Measure healthy reads, degraded reads with failed_drives drives removed or corrupted,
+    and the heal that brings the erasure set back; return the headline metrics.
+
+    RTO is the time from the drive fault until every object was readable again and
+    RPO the percentage of objects readable in degraded mode, as in the geo test.
+    Every phase is traced (see tracing.py); cprofile_phase names one to run under cProfile.
+    """
+    if failure not in FAILURE_MODES:
+        raise ValueError(f"Unknown failure mode {failure!r}, expected one of {FAILURE_MODES}")
+    scenario_name = f"Erasure Set Drive Failure ({failed_drives} drive(s), {failure})"
+    tracer = Tracer(bucket_name, cprofile_phase=cprofile_phase)
+
+    with tracer.span("cleanup"):
+        clear_bucket(raid, bucket_name)
+    with tracer.span("generate"):
+        data_dir = generate_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution, profile=profile)
+    with tracer.span("upload") as span:
+        _, uploaded_bytes = upload_directory(raid, bucket_name, data_dir)
+        names = [obj.object_name for obj in list_bucket(raid, bucket_name)]
+        span.add(bytes=uploaded_bytes, objects=len(names))
+
+    # Step 1: Healthy reads
+    healthy = measure_reads(tracer, "Healthy", bucket_name)
+    metrics = {"baseline_access_time_seconds": healthy.elapsed, "healthy_mb_per_second": healthy.mb_per_second()}
+    latencies = {"healthy_ttfb": healthy.ttfb.summary(), "healthy_read": healthy.full_read.summary()}
+    params = {"num_files": num_files, "min_kb": min_kb, "max_kb": max_kb, "failed_drives": failed_drives,
+              "failure": failure, "seed": seed, "distribution": distribution, "profile": profile,
+              "bucket_name": bucket_name}
+
+    if isinstance(raid, InMemoryBackend):
+        # The stand-in has no drives; only the healthy baseline is meaningful
+        print("Drive faults need the minio-raid container; recording healthy reads only.")
+        tracer.save(params)
+        record_results("raid", scenario_name, params, metrics, tracer.phases(), latencies, matrix_name=matrix_name)
+        return metrics
+
+    # Step 2: Fail drives and measure degraded reads from the fault instant
+    drives = DRIVES[:failed_drives]
+    with tracer.span("fault"):
+        events = []
+        try:
+            for drive in drives:
+                events.append(injector.inject(make_fault("drive", container=RAID_CONTAINER, drive=drive,
+                                                         replace=True, corrupt=failure == "corrupt")))
+        except FaultInjectionError:
+            # Fewer drives failed than asked for: put the others back and fail the run
+            for event in events:
+                injector.recover(event)
+            raise
+    with tracer.span("failover_read") as span:
+        tracker = ReadinessTracker(raid, bucket_name, expected_names=names)
+        rto = tracker.wait_until_ready(timeout=60, since=events[-1].effective_at)
+        span.add(bytes=tracker.report.bytes, objects=len(tracker.available_at), errors=len(tracker.pending))
+    degraded = measure_reads(tracer, "Degraded", bucket_name)
+    rpo_percentage = degraded.accessible / len(names) * 100 if names else 100.0
+    metrics.update({
+        "RTO_seconds": -1 if rto is None else rto,
+        "RPO_data_restored_percentage": rpo_percentage,
+        "degraded_mb_per_second": degraded.mb_per_second(),
+        "degraded_slowdown": healthy.mb_per_second() / degraded.mb_per_second() if degraded.mb_per_second() else None,
+    })
+    latencies.update({"degraded_ttfb": degraded.ttfb.summary(), "degraded_read": degraded.full_read.summary()})
+
+    # Step 3: Bring the drives back empty (or leave the corrupted data in place) and heal
+    with tracer.span("recover"):
+        for event in events:
+            injector.recover(event)
+    with tracer.span("heal") as span:
+        heal_seconds = heal_bucket(bucket_name)
+        healed_bytes = sum(rewritten_bytes(drive) for drive in drives)
+        span.add(bytes=healed_bytes, objects=len(names))
+    metrics.update({"heal_seconds": heal_seconds, "healed_bytes": healed_bytes,
+                    "heal_mb_per_second": healed_bytes / (1024 * 1024) / heal_seconds if heal_seconds else None})
+    print(f"Healed {healed_bytes / (1024 * 1024):.2f} MB on {len(drives)} drive(s) in {heal_seconds:.2f}s "
+          f"({metrics['heal_mb_per_second'] or 0:.2f} MB/s)")
+
+    # Step 4: Reads after healing
+    healed = measure_reads(tracer, "Healed", bucket_name)
+    metrics["healed_mb_per_second"] = healed.mb_per_second()
+    latencies.update({"healed_ttfb": healed.ttfb.summary(), "healed_read": healed.full_read.summary()})
+
+    tracer.save(params)
+    record_results("raid", scenario_name, params, metrics, tracer.phases(), latencies, matrix_name=matrix_name)
+    print(f"Benchmark completed. Degraded RTO: {metrics['RTO_seconds']:.2f}s, readable: {rpo_percentage:.2f}%, "
+          f"heal {heal_seconds:.2f}s.\n\n")
+    return metrics
+
+def main():
+    # The raid scenarios are declared in the scenario matrix; they share one container, so they run one at a time
+    from scenario_runner import load_matrix, run_matrix, DEFAULT_MATRIX_PATH
+    run_matrix(load_matrix(DEFAULT_MATRIX_PATH), scenario_type="raid", runners={"raid": run_raid_benchmark})
+
+    print("All raid scenarios have been executed. Compare them with: python scripts/results_store.py summary --type raid")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from access_verifier import read_object, AccessReport, DEFAULT_WORKERS
+from bulk_ops import list_bucket
+
+# Adaptive polling bounds (seconds)
+MIN_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+POLL_BACKOFF = 1.5
+# How long a failover read waits for objects that may never arrive before the run counts as failed
+DEFAULT_READY_TIMEOUT = 120.0
+
+class ReadinessTracker:
+    """Track when each expected object becomes readable in a region.
+
+    Objects that have been read successfully are never probed again; each pass
+    re-probes only the missing or failed ones. Polling starts at MIN_POLL_INTERVAL,
+    backs off while nothing changes and snaps back as soon as progress is made.
+    """
+
+    def __init__(self, region_client, bucket_name, expected_names=None, expected_count=None,
+                 workers=DEFAULT_WORKERS, min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL):
+        self.region_client = region_client
+        self.bucket_name = bucket_name
+        self.pending = set(expected_names or [])
+        self.expected_count = len(self.pending) if expected_names is not None else expected_count
+        self._discover = expected_names is None
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.available_at = {}
+        self.report = AccessReport()
+        self.passes = 0
+        self.started = None
+
+    def _refresh_pending(self):
+        # Without an expected name list, the listing is the only way to learn names;
+        # it is skipped once every expected object has been seen.
+        if not self._discover or len(self.available_at) + len(self.pending) >= (self.expected_count or 0):
+            return
+        try:
+            for obj in list_bucket(self.region_client, self.bucket_name):
+                if obj.object_name not in self.available_at:
+                    self.pending.add(obj.object_name)
+        except Exception:
+            pass
+
+    def _probe(self, object_name):
+        try:
+            size, ttfb, duration = read_object(self.region_client, self.bucket_name, object_name)
+        except Exception:
+            return object_name, None
+        self.report.record_success(size, ttfb, duration)
+        return object_name, time.monotonic() - self.started
+
+    def poll_once(self, pool):
+        """Probe every pending object once; return how many became available."""
+        self.passes += 1
+        self._refresh_pending()
+        newly_available = 0
+        for object_name, available_at in pool.map(self._probe, list(self.pending)):
+            if available_at is not None:
+                self.available_at[object_name] = available_at
+                self.pending.discard(object_name)
+                newly_available += 1
+        return newly_available
+
+    def is_ready(self):
+        return self.expected_count is not None and len(self.available_at) >= self.expected_count
+
+    def wait_until_ready(self, timeout=None, since=None):
+        """Poll until all expected objects are readable; return elapsed seconds (None on timeout).
+
+        since is a time.monotonic() instant (e.g. when a fault took effect) to measure from
+        instead of the start of polling.
+        """
+        self.started = since if since is not None else time.monotonic()
+        interval = self.min_interval
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                progress = self.poll_once(pool)
+                elapsed = time.monotonic() - self.started
+                if self.is_ready():
+                    self.report.elapsed = elapsed
+                    return elapsed
+                if timeout is not None and elapsed >= timeout:
+                    self.report.elapsed = elapsed
+                    return None
+                interval = self.min_interval if progress else min(interval * POLL_BACKOFF, self.max_interval)
+                print(f"Accessible Files: {len(self.available_at)}/{self.expected_count}, "
+                      f"waiting {interval:.2f}s...")
+                time.sleep(interval)
+
+    def availability_curve(self):
+        """Return [(seconds_since_start, objects_available)] in the order objects came up."""
+        return [(t, i + 1) for i, t in enumerate(sorted(self.available_at.values()))]
+
+    def describe_curve(self, fractions=(0.5, 0.9, 0.99, 1.0)):
+        curve = self.availability_curve()
+        if not curve or not self.expected_count:
+            return "no objects available"
+        parts = []
+        for fraction in fractions:
+            needed = max(1, int(round(self.expected_count * fraction)))
+            if needed <= len(curve):
+                parts.append(f"{fraction * 100:g}% at {curve[needed - 1][0]:.2f}s")
+        return ", ".join(parts)
@@ -1,8 +1,10 @@
-from minio import Minio
+from replication_engine import replicate_bucket, DEFAULT_WORKERS
+from replication_manifest import replicate_incremental, DEFAULT_MANIFEST_PATH
+from storage_backend import make_region_client
 
 # Configure MinIO clients
-region1 = Minio("localhost:9001", access_key="minioadmin", secret_key="minioadmin", secure=False)
-region2 = Minio("localhost:9002", access_key="minioadmin", secret_key="minioadmin", secure=False)
+region1 = make_region_client("localhost:9001")
+region2 = make_region_client("localhost:9002")
 
 # Function to replicate data
 def replicate_data(bucket_name, object_name):
@@ -12,20 +14,14 @@ def replicate_data(bucket_name, object_name):
     region2.put_object(bucket_name, object_name, obj, length=-1, part_size=10*1024*1024)
     print(f"Replicated {object_name} from Region 1 to Region 2")
 
-def replicate_files(bucket_name):
-    # Ensure the bucket exists in Region 2
-    if not region2.bucket_exists(bucket_name):
-        region2.make_bucket(bucket_name)
-
-    # List objects in Region 1
-    objects = region1.list_objects(bucket_name, recursive=True)
-
-    # Replicate each object
-    for obj in objects:
-        print(f"Replicating {obj.object_name}...")
-        data = region1.get_object(bucket_name, obj.object_name)
-        region2.put_object(bucket_name, obj.object_name, data, length=-1, part_size=10*1024*1024)
-        print(f"Replicated {obj.object_name} to Region 2")
+def replicate_files(bucket_name, workers=DEFAULT_WORKERS, incremental=False, manifest_path=DEFAULT_MANIFEST_PATH,
+                    propagate_deletes=False):
+    # Copy only new or changed objects when a replication manifest is kept
+    if incremental:
+        return replicate_incremental(region1, region2, bucket_name, manifest_path=manifest_path,
+                                     propagate_deletes=propagate_deletes, workers=workers)
+    # Replicate every object of the bucket on a worker pool
+    return replicate_bucket(region1, region2, bucket_name, workers=workers)
 
 # Main script
 if __name__ == "__main__":
@@ -39,4 +35,4 @@ if __name__ == "__main__":
     # Replicate the data
     #replicate_data(bucket_name, object_name)
 
-    replicate_files(bucket_name)
\ No newline at end of file
+    replicate_files(bucket_name, incremental=True)
\ No newline at end of file
@@ -0,0 +1,376 @@
+import datetime
+import json
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from access_verifier import LatencyHistogram
+from bulk_ops import list_bucket
+from replication_engine import copy_object, DEFAULT_WORKERS, DEFAULT_RETRIES, RETRY_BACKOFF_SECONDS
+
+# Listing-diff poller interval and lag export interval (seconds)
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_EXPORT_INTERVAL = 1.0
+# Pause before a write that used up its retries is tried again
+DEFAULT_REDISPATCH_DELAY = 1.0
+NOTIFICATION_EVENTS = ("s3:ObjectCreated:*", "s3:ObjectRemoved:*")
+EVENT_SOURCES = ("auto", "notify", "poll")
+
+class ChangeEvent:
+    """One write or delete seen on the source; written_at is a wall-clock timestamp."""
+
+    def __init__(self, kind, object_name, size=0, etag=None, written_at=None):
+        self.kind = kind
+        self.object_name = object_name
+        self.size = size or 0
+        self.etag = etag
+        self.written_at = written_at if written_at is not None else time.time()
+
+def _timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp()
+
+def parse_notification(record):
+    """Turn one S3 notification record into a ChangeEvent."""
+    obj = record["s3"]["object"]
+    kind = "delete" if record["eventName"].startswith("s3:ObjectRemoved") else "put"
+    return ChangeEvent(kind, urllib.parse.unquote_plus(obj["key"]), obj.get("size", 0), obj.get("eTag"),
+                       _timestamp(record.get("eventTime")))
+
+class NotificationSource:
+    """Feed the daemon from the source region's bucket notifications."""
+
+    def __init__(self, client, bucket_name):
+        self.client = client
+        self.bucket_name = bucket_name
+        self._events = None
+
+    @property
+    def observed_at(self):
+        # Notifications are pushed as writes happen
+        return time.time()
+
+    def run(self, emit, stopped):
+        self._events = self.client.listen_bucket_notification(self.bucket_name, events=NOTIFICATION_EVENTS)
+        with self._events:
+            for event in self._events:
+                if stopped.is_set():
+                    break
+                for record in event.get("Records") or []:
+                    emit(parse_notification(record))
+
+    def close(self):
+        if self._events is not None:
+            self._events.__exit__(None, None, None)
+
+class ListingPoller:
+    """Fallback event source: diff consecutive listings of the source bucket.
+
+    Writes are stamped with the object's last-modified time, so the poll interval
+    shows up in the measured lag exactly as it would in production. observed_at is
+    when the last completed listing started: later writes are not known yet.
+    """
+
+    def __init__(self, client, bucket_name, interval=DEFAULT_POLL_INTERVAL, snapshot=None, observed_at=None):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.interval = interval
+        self.snapshot = dict(snapshot or {})
+        self.observed_at = observed_at if observed_at is not None else time.time()
+
+    def poll_once(self, emit):
+        started = time.time()
+        current = {}
+        for obj in list_bucket(self.client, self.bucket_name):
+            current[obj.object_name] = (obj.size, obj.etag)
+            if self.snapshot.get(obj.object_name) != (obj.size, obj.etag):
+                emit(ChangeEvent("put", obj.object_name, obj.size, obj.etag, _timestamp(obj.last_modified)))
+        for name in self.snapshot.keys() - current.keys():
+            emit(ChangeEvent("delete", name))
+        self.snapshot = current
+        self.observed_at = started
+
+    def run(self, emit, stopped):
+        while not stopped.is_set():
+            try:
+                self.poll_once(emit)
+            except Exception as e:
+                print(f"Listing poll of {self.bucket_name} failed: {e}")
+            stopped.wait(self.interval)
+
+    def close(self):
+        pass
+
+class ReplicationDaemon:
+    """Replicate source writes to the target continuously and measure replication lag.
+
+    Events for the same object are coalesced: while an object waits, only its latest
+    state is copied, but the lag clock keeps running from its oldest unreplicated
+    write. Lag is the age of that oldest write across the whole backlog. A write that
+    fails all its retries stays in the backlog and is tried again after
+    redispatch_delay seconds (or at once when a newer write to it is waiting).
+    """
+
+    def __init__(self, source_client, target_client, bucket_name, workers=DEFAULT_WORKERS, source="auto",
+                 poll_interval=DEFAULT_POLL_INTERVAL, retries=DEFAULT_RETRIES,
+                 export_interval=DEFAULT_EXPORT_INTERVAL, export_path=None,
+                 redispatch_delay=DEFAULT_REDISPATCH_DELAY):
+        if source not in EVENT_SOURCES:
+            raise ValueError(f"Unknown event source {source!r}, expected one of {EVENT_SOURCES}")
+        self.source_client = source_client
+        self.target_client = target_client
+        self.bucket_name = bucket_name
+        self.workers = workers
+        self.source = source
+        self.poll_interval = poll_interval
+        self.retries = retries
+        self.export_interval = export_interval
+        self.export_path = export_path
+        self.redispatch_delay = redispatch_delay
+        self.pending = {}
+        self.in_flight = {}
+        # Objects in in_flight that used up their retries and wait for a redispatch
+        self.parked = set()
+        self.replicated = 0
+        self.replicated_bytes = 0
+        self.failed = []
+        self.delay = LatencyHistogram()
+        self.samples = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads = []
+        self._pool = None
+        self._event_source = None
+        self._listed_at = None
+
+    def _initial_events(self):
+        # Catch up with anything written before the daemon started
+        self._listed_at = time.time()
+        target = {obj.object_name: (obj.size, obj.etag)
+                  for obj in list_bucket(self.target_client, self.bucket_name)}
+        snapshot = {}
+        for obj in list_bucket(self.source_client, self.bucket_name):
+            snapshot[obj.object_name] = (obj.size, obj.etag)
+            if target.get(obj.object_name) != (obj.size, obj.etag):
+                self.submit(ChangeEvent("put", obj.object_name, obj.size, obj.etag, _timestamp(obj.last_modified)))
+        return snapshot
+
+    def _make_event_source(self, snapshot):
+        notify = self.source != "poll" and hasattr(self.source_client, "listen_bucket_notification")
+        if self.source == "notify" and not notify:
+            raise ValueError("The source client does not support bucket notifications")
+        if notify:
+            return NotificationSource(self.source_client, self.bucket_name)
+        return ListingPoller(self.source_client, self.bucket_name, self.poll_interval, snapshot, self._listed_at)
+
+    def _run_event_source(self):
+        try:
+            self._event_source.run(self.submit, self._stopped)
+        except Exception as e:
+            if self._stopped.is_set():
+                return
+            if self.source != "auto" or isinstance(self._event_source, ListingPoller):
+                print(f"Replication event source stopped: {e}")
+                return
+            print(f"Bucket notifications unavailable ({e}), falling back to listing poller")
+            snapshot = self._initial_events()
+            self._event_source = ListingPoller(self.source_client, self.bucket_name, self.poll_interval, snapshot,
+                                               self._listed_at)
+            self._event_source.run(self.submit, self._stopped)
+
+    def start(self):
+        if not self.target_client.bucket_exists(self.bucket_name):
+            self.target_client.make_bucket(self.bucket_name)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._event_source = self._make_event_source(self._initial_events())
+        for target in (self._run_event_source, self._run_exporter):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Replication daemon started for {self.bucket_name} ({type(self._event_source).__name__}, "
+              f"{self.workers} workers)")
+        return self
+
+    def submit(self, event):
+        """Queue a change event; coalesces with a pending event for the same object."""
+        with self._lock:
+            queued = self.pending.get(event.object_name)
+            if queued is not None:
+                event.written_at = min(event.written_at, queued.written_at)
+            self.pending[event.object_name] = event
+            parked = self.in_flight.get(event.object_name) if event.object_name in self.parked else None
+            if parked is not None:
+                # The failed write is superseded; copy the newer state now
+                event.written_at = min(event.written_at, parked.written_at)
+                self.parked.discard(event.object_name)
+                del self.in_flight[event.object_name]
+            dispatch = event.object_name not in self.in_flight
+            if dispatch:
+                self.in_flight[event.object_name] = self.pending.pop(event.object_name)
+        if dispatch:
+            self._dispatch(event.object_name)
+
+    def _dispatch(self, object_name):
+        if self._stopped.is_set():
+            return
+        try:
+            self._pool.submit(self._replicate, object_name)
+        except RuntimeError:
+            # The pool was shut down by stop() in the meantime
+            pass
+
+    def _apply(self, event):
+        if event.kind == "delete":
+            self.target_client.remove_object(self.bucket_name, event.object_name)
+            return
+        try:
+            copy_object(self.source_client, self.target_client, self.bucket_name, event.object_name, event.size,
+                        event.etag)
+        except Exception as e:
+            # Deleted again before we got to it; the delete event replaces this one
+            if getattr(e, "code", None) != "NoSuchKey":
+                raise
+
+    def _redispatch(self, object_name):
+        with self._lock:
+            if object_name not in self.parked:
+                # A newer write has already been dispatched
+                return
+            self.parked.discard(object_name)
+        self._dispatch(object_name)
+
+    def _replicate(self, object_name):
+        with self._lock:
+            event = self.in_flight[object_name]
+        for attempt in range(1, self.retries + 2):
+            if self._stopped.is_set():
+                return
+            try:
+                self._apply(event)
+                break
+            except Exception as e:
+                if attempt > self.retries:
+                    print(f"Failed to replicate {object_name} after {attempt} attempts: {e}")
+                    with self._lock:
+                        self.failed.append((object_name, str(e)))
+                        # Keep the write in the backlog so the lag stays honest; a newer
+                        # write to the object replaces it, otherwise it is retried later
+                        newer = self.pending.pop(object_name, None)
+                        if newer is not None:
+                            newer.written_at = min(newer.written_at, event.written_at)
+                        self.in_flight[object_name] = newer or event
+                        if newer is None:
+                            self.parked.add(object_name)
+                    if newer is not None:
+                        self._dispatch(object_name)
+                    else:
+                        timer = threading.Timer(self.redispatch_delay, self._redispatch, args=(object_name,))
+                        timer.daemon = True
+                        timer.start()
+                    return
+                time.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+        with self._lock:
+            self.replicated += 1
+            self.replicated_bytes += event.size
+            del self.in_flight[object_name]
+            newer = self.pending.pop(object_name, None)
+            if newer is not None:
+                self.in_flight[object_name] = newer
+        self.delay.record(max(0.0, time.time() - event.written_at))
+        if newer is not None:
+            self._dispatch(object_name)
+
+    def lag(self):
+        """Return the current replication lag and backlog.
+
+        unobserved_seconds is how far back the event source has not looked yet (the
+        time since the last listing started when polling): writes in that window are
+        at risk too, although they are not in the backlog.
+        """
+        with self._lock:
+            backlog = list(self.pending.values()) + list(self.in_flight.values())
+        oldest = min((event.written_at for event in backlog), default=None)
+        now = time.time()
+        observed_at = getattr(self._event_source, "observed_at", None)
+        return {
+            "timestamp": now,
+            "lag_seconds": 0.0 if oldest is None else max(0.0, now - oldest),
+            "unobserved_seconds": 0.0 if observed_at is None else max(0.0, now - observed_at),
+            "backlog_objects": len(backlog),
+            "backlog_bytes": sum(event.size for event in backlog if event.kind == "put"),
+            "replicated": self.replicated,
+        }
+
+    def _run_exporter(self):
+        export = open(self.export_path, "a") if self.export_path else None
+        try:
+            while not self._stopped.wait(self.export_interval):
+                sample = self.lag()
+                self.samples.append(sample)
+                if export:
+                    export.write(json.dumps(sample) + "\n")
+                    export.flush()
+        finally:
+            if export:
+                export.close()
+
+    def wait_until_caught_up(self, timeout=None):
+        """Block until the backlog is empty; return False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.lag()["backlog_objects"]:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self, drain=False, timeout=None, wait=True):
+        """Stop consuming events; optionally wait for the backlog to drain first.
+
+        With wait=False in-flight copies are abandoned (e.g. when the source is paused).
+        """
+        if drain:
+            self.wait_until_caught_up(timeout)
+        self._stopped.set()
+        if self._event_source is not None:
+            self._event_source.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        return self.lag()
+
+    def describe(self):
+        lag = self.lag()
+        return (f"{self.replicated} writes replicated ({self.replicated_bytes / (1024 * 1024):.2f} MB), "
+                f"lag {lag['lag_seconds']:.2f}s, backlog {lag['backlog_objects']} objects / "
+                f"{lag['backlog_bytes'] / (1024 * 1024):.2f} MB, {len(self.failed)} failed; "
+                f"write-to-replica delay {self.delay.describe()}")
+
+def main():
+    import argparse
+    from storage_backend import make_region_client
+    parser = argparse.ArgumentParser(description="Continuously replicate a bucket from region 1 to region 2.")
+    parser.add_argument("bucket")
+    parser.add_argument("--source", default="localhost:9001")
+    parser.add_argument("--target", default="localhost:9002")
+    parser.add_argument("--events", choices=EVENT_SOURCES, default="auto")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--export", help="append lag samples to this JSON-lines file")
+    args = parser.parse_args()
+
+    daemon = ReplicationDaemon(make_region_client(args.source), make_region_client(args.target), args.bucket,
+                               workers=args.workers, source=args.events, poll_interval=args.poll_interval,
+                               export_path=args.export).start()
+    try:
+        while True:
+            time.sleep(DEFAULT_EXPORT_INTERVAL)
+            print(daemon.describe())
+    except KeyboardInterrupt:
+        daemon.stop()
+
+if __name__ == "__main__":
+    main()
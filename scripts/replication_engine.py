@@ -0,0 +1,211 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bulk_ops import list_bucket
+from object_bundler import plan_bundles, fetch_bundle, put_bundle, transfer_bundle, DEFAULT_BUNDLE_SIZE
+from multipart_transfer import multipart_copy, LARGE_OBJECT_THRESHOLD
+
+# Defaults for the replication worker pool
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_BYTES_IN_FLIGHT = 256 * 1024 * 1024
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+PART_SIZE = 10 * 1024 * 1024
+
+class ByteBudget:
+    """Block producers while too many bytes are being transferred at once."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size):
+        with self._cond:
+            # An object larger than the whole budget is let through on its own.
+            while self.in_flight > 0 and self.in_flight + size > self.max_bytes:
+                self._cond.wait()
+            self.in_flight += size
+
+    def release(self, size):
+        with self._cond:
+            self.in_flight -= size
+            self._cond.notify_all()
+
+class TransferStats:
+    """Counters collected while a batch of objects is transferred.
+
+    completed maps each object to the ETag written, completed_at to the
+    time.monotonic() at which it finished.
+    """
+
+    def __init__(self):
+        self.objects = 0
+        self.bytes = 0
+        self.retries = 0
+        self.failed = []
+        self.completed = {}
+        self.completed_at = {}
+        self.started = time.time()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, object_name, size, etag, attempts):
+        with self._lock:
+            self.completed[object_name] = etag
+            self.completed_at[object_name] = time.monotonic()
+            self.objects += 1
+            self.bytes += size
+            self.retries += attempts - 1
+
+    def record_failure(self, object_name, error, attempts):
+        with self._lock:
+            self.failed.append((object_name, str(error)))
+            self.retries += attempts - 1
+
+    def finish(self):
+        self.elapsed = time.time() - self.started
+
+    def objects_per_second(self):
+        return self.objects / self.elapsed if self.elapsed > 0 else 0.0
+
+    def mb_per_second(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.objects} objects, {self.bytes / (1024 * 1024):.2f} MB in {self.elapsed:.2f}s "
+                f"({self.objects_per_second():.1f} objects/s, {self.mb_per_second():.2f} MB/s), "
+                f"{len(self.failed)} failed, {self.retries} retries")
+
+def copy_object(source_client, target_client, bucket_name, object_name, size=None, etag=None):
+    """Stream a single object from the source region into the target region.
+
+    Objects of LARGE_OBJECT_THRESHOLD bytes or more are copied as parallel ranged
+    GETs and multipart parts, checkpointed so a retry resumes from the last part.
+    """
+    if size is not None and size >= LARGE_OBJECT_THRESHOLD:
+        return multipart_copy(source_client, target_client, bucket_name, object_name, size, etag)
+    response = source_client.get_object(bucket_name, object_name)
+    try:
+        length = size if size is not None else -1
+        return target_client.put_object(bucket_name, object_name, response, length=length, part_size=PART_SIZE)
+    finally:
+        response.close()
+        response.release_conn()
+
+def _copy_with_retries(source_client, target_client, bucket_name, obj, retries, stats):
+    size = obj.size or 0
+    for attempt in range(1, retries + 2):
+        try:
+            result = copy_object(source_client, target_client, bucket_name, obj.object_name, obj.size, obj.etag)
+            stats.record_success(obj.object_name, size, getattr(result, "etag", None), attempt)
+            return True
+        except Exception as e:
+            if attempt > retries:
+                print(f"Failed to replicate {obj.object_name} after {attempt} attempts: {e}")
+                stats.record_failure(obj.object_name, e, attempt)
+                return False
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+def replicate_objects(source_client, target_client, bucket_name, objects, workers=DEFAULT_WORKERS,
+                      max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT, retries=DEFAULT_RETRIES, bundle_threshold=0,
+                      bundle_size=DEFAULT_BUNDLE_SIZE):
+    """Copy the given listed objects on a worker pool and return TransferStats.
+
+    With bundle_threshold > 0, objects smaller than it are copied in bundles of about
+    bundle_size bytes: their GETs overlap and the target receives one PUT per bundle.
+    """
+    stats = TransferStats()
+    budget = ByteBudget(max_bytes_in_flight)
+    objects = list(objects)
+    bundles, singles = plan_bundles(objects, bundle_threshold, bundle_size) if bundle_threshold else ([], objects)
+
+    def task(obj):
+        try:
+            return _copy_with_retries(source_client, target_client, bucket_name, obj, retries, stats)
+        finally:
+            budget.release(obj.size or 0)
+
+    def bundle_task(bundle, size):
+        try:
+            return transfer_bundle(lambda entries: put_bundle(target_client, bucket_name, entries),
+                                   lambda objs: fetch_bundle(source_client, bucket_name,
+                                                             [obj.object_name for obj in objs]),
+                                   bundle, retries, stats, RETRY_BACKOFF_SECONDS)
+        finally:
+            budget.release(size)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for bundle in bundles:
+            size = sum(obj.size or 0 for obj in bundle)
+            budget.acquire(size)
+            pool.submit(bundle_task, bundle, size)
+        for obj in singles:
+            # Backpressure: wait for in-flight bytes to drain before queueing more work.
+            budget.acquire(obj.size or 0)
+            pool.submit(task, obj)
+    stats.finish()
+    return stats
+
+def replicate_bucket(source_client, target_client, bucket_name, workers=DEFAULT_WORKERS,
+                     max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT, retries=DEFAULT_RETRIES, bundle_threshold=0,
+                     bundle_size=DEFAULT_BUNDLE_SIZE):
+    """Replicate every object of a bucket from the source to the target region."""
+    if not target_client.bucket_exists(bucket_name):
+        target_client.make_bucket(bucket_name)
+    objects = list_bucket(source_client, bucket_name)
+    stats = replicate_objects(source_client, target_client, bucket_name, objects, workers=workers,
+                              max_bytes_in_flight=max_bytes_in_flight, retries=retries,
+                              bundle_threshold=bundle_threshold, bundle_size=bundle_size)
+    print(f"Replicated {stats.summary()}")
+    return stats
+
+def replicate_graph(clients, edges, bucket_name, objects, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES):
+    """Replicate listed objects along (source, target) edges between named region clients.
+
+    Regions without an incoming edge already hold the objects. Each target has its own
+    worker pool, and an object is queued on an edge as soon as the edge's source holds
+    it, so a chain pipelines its hops instead of waiting for each to finish. Returns
+    {target: TransferStats}; a target's elapsed time is when its last copy landed.
+    """
+    objects = list(objects)
+    targets = {target for _, target in edges}
+    downstream = {}
+    for source, target in edges:
+        downstream.setdefault(source, []).append(target)
+    for target in targets:
+        if not clients[target].bucket_exists(bucket_name):
+            clients[target].make_bucket(bucket_name)
+    stats = {target: TransferStats() for target in targets}
+    pools = {target: ThreadPoolExecutor(max_workers=workers) for target in targets}
+    outstanding = [0]
+    done = threading.Condition()
+    start = time.monotonic()
+
+    def submit(source, obj):
+        for target in downstream.get(source, []):
+            with done:
+                outstanding[0] += 1
+            pools[target].submit(task, source, target, obj)
+
+    def task(source, target, obj):
+        try:
+            if _copy_with_retries(clients[source], clients[target], bucket_name, obj, retries, stats[target]):
+                submit(target, obj)
+        finally:
+            with done:
+                outstanding[0] -= 1
+                done.notify_all()
+
+    for root in {source for source, _ in edges} - targets:
+        for obj in objects:
+            submit(root, obj)
+    with done:
+        done.wait_for(lambda: outstanding[0] == 0)
+    for pool in pools.values():
+        pool.shutdown()
+    for target_stats in stats.values():
+        target_stats.finish()
+        if target_stats.completed_at:
+            target_stats.elapsed = max(target_stats.completed_at.values()) - start
+    return stats
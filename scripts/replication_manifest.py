@@ -0,0 +1,104 @@
+import json
+import os
+from bulk_ops import list_bucket, delete_objects
+from object_bundler import DEFAULT_BUNDLE_SIZE
+from replication_engine import replicate_objects, DEFAULT_WORKERS, DEFAULT_MAX_BYTES_IN_FLIGHT, DEFAULT_RETRIES
+
+# Persistent record of what has already been replicated, keyed by bucket name
+DEFAULT_MANIFEST_PATH = "./replication_manifest.json"
+MANIFEST_VERSION = 1
+
+def _signature(obj):
+    last_modified = obj.last_modified.isoformat() if obj.last_modified else None
+    return {"size": obj.size, "etag": obj.etag, "last_modified": last_modified}
+
+def load_manifest(manifest_path, bucket_name):
+    """Return the manifest entries recorded for a bucket ({} if none yet)."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        print(f"Ignoring replication manifest {manifest_path} with unknown version {data.get('version')}")
+        return {}
+    return data.get("buckets", {}).get(bucket_name, {})
+
+def save_manifest(manifest_path, bucket_name, entries):
+    """Write the entries for a bucket, keeping other buckets in the same file."""
+    data = {"version": MANIFEST_VERSION, "buckets": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            existing = json.load(f)
+        if existing.get("version") == MANIFEST_VERSION:
+            data = existing
+    data["buckets"][bucket_name] = entries
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, manifest_path)
+
+def plan_incremental(source_objects, target_objects, manifest):
+    """Diff the two listings against the manifest.
+
+    Returns (objects_to_copy, names_to_delete, unchanged_entries). An object is
+    unchanged when the source still matches what the manifest recorded and the
+    target still holds the copy we wrote; when there is no manifest entry, a
+    target object with the same size and ETag is adopted as identical.
+    """
+    source = {obj.object_name: obj for obj in source_objects}
+    target = {obj.object_name: obj for obj in target_objects}
+    to_copy = []
+    unchanged = {}
+    for name, obj in source.items():
+        signature = _signature(obj)
+        target_obj = target.get(name)
+        entry = manifest.get(name)
+        if target_obj is None:
+            to_copy.append(obj)
+        elif entry is not None:
+            source_same = all(entry[key] == signature[key] for key in ("size", "etag", "last_modified"))
+            target_same = entry.get("target_etag") == target_obj.etag and target_obj.size == obj.size
+            if source_same and target_same:
+                unchanged[name] = entry
+            else:
+                to_copy.append(obj)
+        elif target_obj.size == obj.size and target_obj.etag == obj.etag:
+            unchanged[name] = dict(signature, target_etag=target_obj.etag)
+        else:
+            to_copy.append(obj)
+    # Only objects we replicated ourselves are candidates for delete propagation.
+    to_delete = [name for name in manifest if name not in source and name in target]
+    return to_copy, to_delete, unchanged
+
+def replicate_incremental(source_client, target_client, bucket_name, manifest_path=DEFAULT_MANIFEST_PATH,
+                          propagate_deletes=False, workers=DEFAULT_WORKERS,
+                          max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT, retries=DEFAULT_RETRIES,
+                          bundle_threshold=0, bundle_size=DEFAULT_BUNDLE_SIZE):
+    """Copy only new or changed objects and update the replication manifest."""
+    if not target_client.bucket_exists(bucket_name):
+        target_client.make_bucket(bucket_name)
+    manifest = load_manifest(manifest_path, bucket_name)
+    source_objects = list_bucket(source_client, bucket_name)
+    target_objects = list_bucket(target_client, bucket_name)
+    to_copy, to_delete, entries = plan_incremental(source_objects, target_objects, manifest)
+    print(f"Incremental replication: {len(to_copy)} to copy, {len(entries)} unchanged, "
+          f"{len(to_delete)} deleted at source")
+
+    stats = replicate_objects(source_client, target_client, bucket_name, to_copy, workers=workers,
+                              max_bytes_in_flight=max_bytes_in_flight, retries=retries,
+                              bundle_threshold=bundle_threshold, bundle_size=bundle_size)
+    for obj in to_copy:
+        if obj.object_name in stats.completed:
+            entries[obj.object_name] = dict(_signature(obj), target_etag=stats.completed[obj.object_name])
+
+    if propagate_deletes:
+        delete_objects(target_client, bucket_name, to_delete)
+        print(f"Propagated {len(to_delete)} deletes to the target region")
+    else:
+        # Keep tracking source-deleted objects so a later run can still propagate them.
+        for name in to_delete:
+            entries[name] = manifest[name]
+
+    save_manifest(manifest_path, bucket_name, entries)
+    print(f"Replicated {stats.summary()}")
+    return stats
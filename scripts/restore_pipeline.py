@@ -0,0 +1,168 @@
+import heapq
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from object_bundler import iter_bundles, put_bundle, transfer_bundle, DEFAULT_BUNDLE_SIZE
+from replication_engine import ByteBudget, TransferStats, DEFAULT_RETRIES, RETRY_BACKOFF_SECONDS
+
+# Defaults for the restore worker pools
+DEFAULT_WORKERS = 8
+DEFAULT_LARGE_WORKERS = 2
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+PARALLEL_PARTS = 4
+SMALL_PART_SIZE = 10 * 1024 * 1024
+# Small objects read ahead of the upload pool (streamed in store order, waiting for a worker)
+DEFAULT_MAX_BYTES_BUFFERED = 256 * 1024 * 1024
+
+def _put_with_retries(region_client, bucket_name, object_name, size, open_reader, retries, stats, multipart):
+    for attempt in range(1, retries + 2):
+        try:
+            with open_reader() as reader:
+                if multipart:
+                    result = region_client.put_object(bucket_name, object_name, reader, length=size,
+                                                      part_size=MULTIPART_PART_SIZE,
+                                                      num_parallel_uploads=PARALLEL_PARTS)
+                else:
+                    result = region_client.put_object(bucket_name, object_name, reader, length=size,
+                                                      part_size=SMALL_PART_SIZE)
+            stats.record_success(object_name, size, getattr(result, "etag", None), attempt)
+            return True
+        except Exception as e:
+            if attempt > retries:
+                print(f"Failed to restore {object_name} after {attempt} attempts: {e}")
+                stats.record_failure(object_name, e, attempt)
+                return False
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+def _restore_one(region_client, bucket_name, store, object_name, size, retries, stats, multipart):
+    return _put_with_retries(region_client, bucket_name, object_name, size,
+                             lambda: store.open_object(object_name), retries, stats, multipart)
+
+def _stream_objects(store, object_names, stats):
+    """Yield (name, size, data) in the store's own order (sequentially through each pack).
+
+    An object that cannot be read from the store is recorded as failed and skipped.
+    """
+    for name, size, reader in store.iter_objects(object_names):
+        try:
+            with reader:
+                data = reader.read()
+        except Exception as e:
+            print(f"Failed to read {name} from the backup: {e}")
+            stats.record_failure(name, e, 1)
+            continue
+        yield name, size, data
+
+def parallel_restore(region_client, bucket_name, store, object_names=None, workers=DEFAULT_WORKERS,
+                     large_workers=DEFAULT_LARGE_WORKERS, multipart_threshold=MULTIPART_THRESHOLD,
+                     retries=DEFAULT_RETRIES, bundle_threshold=0, bundle_size=DEFAULT_BUNDLE_SIZE,
+                     max_bytes_buffered=DEFAULT_MAX_BYTES_BUFFERED):
+    """Upload objects from a backup store on worker pools and return TransferStats.
+
+    Large objects get their own pool and upload PARALLEL_PARTS multipart parts at
+    a time, largest first, so they start early. Small objects are read in one pass
+    in the store's order (each pack front to back, see iter_objects) and uploaded
+    from memory on the main pool, with at most max_bytes_buffered read ahead (plus
+    the bundle being filled). With bundle_threshold > 0, objects below it are
+    uploaded in bundles of about bundle_size bytes, one PUT per bundle.
+    """
+    names = store.object_names() if object_names is None else list(object_names)
+    sizes = {name: store.object_size(name) for name in names}
+    large = sorted((n for n in names if sizes[n] >= multipart_threshold), key=lambda n: -sizes[n])
+    small = [n for n in names if sizes[n] < multipart_threshold]
+
+    stats = TransferStats()
+    budget = ByteBudget(max_bytes_buffered)
+
+    def single_task(entry):
+        name, size, data = entry
+        try:
+            return _put_with_retries(region_client, bucket_name, name, size, lambda: io.BytesIO(data), retries, stats,
+                                     False)
+        finally:
+            budget.release(size)
+
+    def bundle_task(bundle):
+        try:
+            return transfer_bundle(lambda entries: put_bundle(region_client, bucket_name, entries),
+                                   lambda entries: [(name, data) for name, _, data in entries], bundle, retries,
+                                   stats, RETRY_BACKOFF_SECONDS, size=lambda entry: entry[1],
+                                   name=lambda entry: entry[0])
+        finally:
+            budget.release(sum(size for _, size, _ in bundle))
+
+    with ThreadPoolExecutor(max_workers=max(1, large_workers)) as large_pool, \
+            ThreadPoolExecutor(max_workers=workers) as small_pool:
+        for name in large:
+            large_pool.submit(_restore_one, region_client, bucket_name, store, name, sizes[name], retries, stats, True)
+        if small:
+            entries = _stream_objects(store, small, stats)
+            for kind, item in iter_bundles(entries, bundle_threshold, bundle_size, size=lambda entry: entry[1]):
+                # Taken when the work is queued, not as each object is read: a bundle still
+                # being filled holding budget could otherwise block the read that completes it
+                budget.acquire(item[1] if kind == "single" else sum(size for _, size, _ in item))
+                small_pool.submit(bundle_task if kind == "bundle" else single_task, item)
+    stats.finish()
+    return stats
+
+class BackgroundRestore:
+    """Restore objects from a backup store in a given priority order, in the background.
+
+    Workers take the highest-priority object still queued; promote() moves an object
+    to the front, e.g. when a read has just missed it.
+    """
+
+    def __init__(self, region_client, bucket_name, store, order, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES,
+                 multipart_threshold=MULTIPART_THRESHOLD):
+        self.region_client = region_client
+        self.bucket_name = bucket_name
+        self.store = store
+        self.workers = workers
+        self.retries = retries
+        self.multipart_threshold = multipart_threshold
+        self.stats = TransferStats()
+        self.promoted = 0
+        self._queue = [(rank, name) for rank, name in enumerate(order)]
+        self._queued = set(order)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def promote(self, object_name):
+        with self._lock:
+            if object_name in self._queued:
+                self.promoted += 1
+                heapq.heappush(self._queue, (-self.promoted, object_name))
+
+    def _next(self):
+        with self._lock:
+            while self._queue:
+                _, name = heapq.heappop(self._queue)
+                if name in self._queued:
+                    self._queued.discard(name)
+                    return name
+            return None
+
+    def _run(self):
+        while True:
+            name = self._next()
+            if name is None:
+                return
+            size = self.store.object_size(name)
+            _restore_one(self.region_client, self.bucket_name, self.store, name, size, self.retries, self.stats,
+                         size >= self.multipart_threshold)
+
+    def start(self):
+        for _ in range(max(1, self.workers)):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def wait(self):
+        """Block until every queued object has been restored (or failed); return TransferStats."""
+        for thread in self._threads:
+            thread.join()
+        self.stats.finish()
+        return self.stats
@@ -0,0 +1,314 @@
+import argparse
+import csv
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Embedded results database (run from the repository root)
+DEFAULT_RESULTS_DB = "./results.db"
+
+# Columns promoted out of the metrics table because every scenario reports them
+SCALAR_COLUMNS = {
+    "RTO_seconds": "rto_seconds",
+    "RPO_data_restored_percentage": "rpo_percentage",
+    "baseline_access_time_seconds": "baseline_seconds",
+}
+PARAM_COLUMNS = ("num_files", "min_kb", "max_kb")
+# RTO recorded by a run that never recovered; such runs are counted but left out of the means
+FAILED_RTO = -1
+
+# Each entry upgrades the schema by one version; never edit an applied migration, append a new one
+MIGRATIONS = [
+    """
+    CREATE TABLE runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at REAL NOT NULL,
+        scenario_type TEXT NOT NULL,
+        scenario_name TEXT NOT NULL,
+        num_files INTEGER,
+        min_kb INTEGER,
+        max_kb INTEGER,
+        rto_seconds REAL,
+        rpo_percentage REAL,
+        baseline_seconds REAL,
+        git_revision TEXT,
+        host TEXT,
+        seed INTEGER,
+        params TEXT,
+        source TEXT NOT NULL DEFAULT 'live'
+    );
+    CREATE TABLE metrics (
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        name TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (run_id, name)
+    );
+    CREATE TABLE phases (
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        phase TEXT NOT NULL,
+        wall_seconds REAL,
+        cpu_seconds REAL,
+        bytes INTEGER,
+        objects INTEGER,
+        errors INTEGER
+    );
+    CREATE TABLE latencies (
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        measurement TEXT NOT NULL,
+        count INTEGER,
+        mean REAL,
+        p50 REAL,
+        p95 REAL,
+        p99 REAL,
+        max REAL
+    );
+    CREATE INDEX runs_by_scenario ON runs(scenario_type, scenario_name);
+    """,
+    """
+    ALTER TABLE runs ADD COLUMN matrix_name TEXT;
+    CREATE INDEX runs_by_matrix_name ON runs(scenario_type, matrix_name);
+    """,
+]
+
+# A run's scenario configuration: its name in the scenario matrix, or for runs recorded
+# outside it (imported CSVs) the scenario's own title
+SCENARIO_KEY = "COALESCE(matrix_name, scenario_name)"
+SUCCEEDED = f"rto_seconds IS NOT {FAILED_RTO}"
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+class ResultsStore:
+    """SQLite-backed store of scenario runs with a versioned schema."""
+
+    def __init__(self, path=DEFAULT_RESULTS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._revision = None
+        with self._connect() as conn:
+            self._migrate(conn)
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits (or rolls back) its transaction and is closed on exit."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate(self, conn):
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        version = row[0] or 0
+        for target, sql in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.executescript(sql)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (target,))
+        conn.commit()
+
+    def schema_version(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+
+    def record_run(self, scenario_type, scenario_name, params, metrics, phases=None, latencies=None,
+                   source="live", created_at=None, matrix_name=None):
+        """Store one run and return its run_id.
+
+        params are the scenario parameters, metrics a {name: number} dict, phases a
+        list of {phase, wall_seconds, cpu_seconds, bytes, objects, errors} dicts and
+        latencies a {measurement: LatencyHistogram.summary()} dict. matrix_name is the
+        scenario's name in the scenario matrix, which summaries and comparisons group by.
+        """
+        if self._revision is None:
+            self._revision = git_revision() if source == "live" else None
+        scalars = {column: metrics.get(name) for name, column in SCALAR_COLUMNS.items()}
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO runs (created_at, scenario_type, scenario_name, num_files, min_kb, max_kb, rto_seconds, "
+                "rpo_percentage, baseline_seconds, git_revision, host, seed, params, source, matrix_name) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (created_at or time.time(), scenario_type, scenario_name,
+                 *(params.get(p) for p in PARAM_COLUMNS),
+                 scalars["rto_seconds"], scalars["rpo_percentage"], scalars["baseline_seconds"],
+                 self._revision if source == "live" else None,
+                 socket.gethostname() if source == "live" else None,
+                 params.get("seed"), json.dumps(params, sort_keys=True, default=str), source, matrix_name))
+            run_id = cur.lastrowid
+            conn.executemany("INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                             [(run_id, k, v) for k, v in metrics.items() if k not in SCALAR_COLUMNS and v is not None])
+            conn.executemany(
+                "INSERT INTO phases (run_id, phase, wall_seconds, cpu_seconds, bytes, objects, errors) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, p["phase"], p.get("wall_seconds"), p.get("cpu_seconds"), p.get("bytes"), p.get("objects"),
+                  p.get("errors")) for p in phases or []])
+            conn.executemany(
+                "INSERT INTO latencies (run_id, measurement, count, mean, p50, p95, p99, max) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, name, s["count"], s["mean"], s["p50"], s["p95"], s["p99"], s["max"])
+                 for name, s in (latencies or {}).items()])
+            conn.commit()
+        return run_id
+
+    def tag_runs(self, run_ids, source):
+        """Change the source of already recorded runs (e.g. to mark benchmark warmups)."""
+        with self._lock, self._connect() as conn:
+            conn.executemany("UPDATE runs SET source = ? WHERE run_id = ?", [(source, run_id) for run_id in run_ids])
+            conn.commit()
+
+    def query(self, sql, args=()):
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, args)]
+
+    def import_csv(self, csv_path):
+        """Import one of the legacy results CSVs; returns the number of rows imported."""
+        with open(csv_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            return 0
+        scenario_type = "backup" if "backup_fraction" in rows[0] else "geo"
+        created_at = os.path.getmtime(csv_path)
+        for row in rows:
+            params = {"num_files": int(row["num_files"]), "min_kb": int(row["min_file_kb"]),
+                      "max_kb": int(row["max_file_kb"])}
+            if scenario_type == "backup":
+                params["backup_fraction"] = float(row["backup_fraction"])
+                params["deletion_fraction"] = float(row["deletion_fraction"])
+            else:
+                params["use_replication"] = row["replication_used"] == "True"
+            metrics = {}
+            for name, value in row.items():
+                if name in ("scenario_name", "num_files", "min_file_kb", "max_file_kb", "backup_fraction",
+                            "deletion_fraction", "replication_used") or value in (None, ""):
+                    continue
+                metrics[name] = float(value)
+            self.record_run(scenario_type, row["scenario_name"], params, metrics,
+                            source=f"import:{os.path.basename(csv_path)}", created_at=created_at)
+        return len(rows)
+
+def record_results(scenario_type, scenario_name, params, metrics, phases=None, latencies=None, path=DEFAULT_RESULTS_DB,
+                   matrix_name=None):
+    """Record one scenario run in the default results store."""
+    if os.environ.get("WAN_PROFILE") and "wan_profile" not in params:
+        params = dict(params, wan_profile=os.environ["WAN_PROFILE"])
+    run_id = ResultsStore(path).record_run(scenario_type, scenario_name, params, metrics, phases, latencies,
+                                           matrix_name=matrix_name)
+    print(f"Recorded run {run_id} in {path}")
+    return run_id
+
+def summarize(store, scenario_type=None):
+    """Aggregate runs per scenario configuration; failed runs are counted but not averaged."""
+    where, args = ("WHERE scenario_type = ?", (scenario_type,)) if scenario_type else ("", ())
+    return store.query(
+        f"SELECT scenario_type, {SCENARIO_KEY} AS scenario_name, num_files, min_kb, max_kb, COUNT(*) AS runs, "
+        f"SUM(rto_seconds IS {FAILED_RTO}) AS failed, "
+        f"AVG(CASE WHEN {SUCCEEDED} THEN rto_seconds END) AS mean_rto, "
+        f"MIN(CASE WHEN {SUCCEEDED} THEN rto_seconds END) AS min_rto, "
+        f"MAX(CASE WHEN {SUCCEEDED} THEN rto_seconds END) AS max_rto, "
+        f"AVG(CASE WHEN {SUCCEEDED} THEN rpo_percentage END) AS mean_rpo, "
+        f"AVG(CASE WHEN {SUCCEEDED} THEN baseline_seconds END) AS mean_baseline "
+        f"FROM runs {where} GROUP BY scenario_type, {SCENARIO_KEY}, num_files, min_kb, max_kb "
+        f"ORDER BY scenario_type, {SCENARIO_KEY}, num_files", args)
+
+def compare(store, column, baseline, candidate):
+    """Compare mean RTO/RPO per scenario configuration between two values of a run column,
+    leaving failed runs out of the means."""
+    if column not in ("git_revision", "source", "host", "seed"):
+        raise ValueError("Runs can be compared by git_revision, source, host or seed")
+    rows = store.query(
+        f"SELECT {SCENARIO_KEY} AS scenario_name, num_files, min_kb, max_kb, {column} AS side, COUNT(*) AS runs, "
+        f"AVG(CASE WHEN {SUCCEEDED} THEN rto_seconds END) AS mean_rto, "
+        f"AVG(CASE WHEN {SUCCEEDED} THEN rpo_percentage END) AS mean_rpo FROM runs "
+        f"WHERE {column} IN (?, ?) GROUP BY {SCENARIO_KEY}, num_files, min_kb, max_kb, {column}",
+        (baseline, candidate))
+    grouped = {}
+    for row in rows:
+        key = (row["scenario_name"], row["num_files"], row["min_kb"], row["max_kb"])
+        grouped.setdefault(key, {})["baseline" if row["side"] == baseline else "candidate"] = row
+    result = []
+    for key, sides in sorted(grouped.items(), key=lambda item: str(item[0])):
+        a, b = sides.get("baseline"), sides.get("candidate")
+        delta = None
+        if a and b and a["mean_rto"] and b["mean_rto"] is not None:
+            delta = (b["mean_rto"] - a["mean_rto"]) / a["mean_rto"] * 100
+        result.append({"scenario_name": key[0], "num_files": key[1], "min_kb": key[2], "max_kb": key[3],
+                       "baseline_rto": a and a["mean_rto"], "candidate_rto": b and b["mean_rto"],
+                       "rto_change_percent": delta, "baseline_rpo": a and a["mean_rpo"],
+                       "candidate_rpo": b and b["mean_rpo"]})
+    return result
+
+def export_runs(store, out, scenario_type=None):
+    """Write runs with their extra metrics pivoted into columns as CSV."""
+    where, args = ("WHERE scenario_type = ?", (scenario_type,)) if scenario_type else ("", ())
+    runs = store.query(f"SELECT * FROM runs {where} ORDER BY run_id", args)
+    metrics = {}
+    for row in store.query("SELECT run_id, name, value FROM metrics"):
+        metrics.setdefault(row["run_id"], {})[row["name"]] = row["value"]
+    metric_names = sorted({name for run in runs for name in metrics.get(run["run_id"], {})})
+    columns = [c for c in runs[0].keys() if c != "params"] if runs else []
+    writer = csv.writer(out)
+    writer.writerow(columns + metric_names)
+    for run in runs:
+        extra = metrics.get(run["run_id"], {})
+        writer.writerow([run[c] for c in columns] + [extra.get(name, "") for name in metric_names])
+    return len(runs)
+
+def _print_table(rows):
+    if not rows:
+        print("(no rows)")
+        return
+    columns = list(rows[0].keys())
+    def fmt(value):
+        return f"{value:.3f}" if isinstance(value, float) else "" if value is None else str(value)
+    widths = [max(len(c), *(len(fmt(r[c])) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(fmt(row[c]).ljust(w) for c, w in zip(columns, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the experiment results store.")
+    parser.add_argument("--db", default=DEFAULT_RESULTS_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="import legacy results CSVs")
+    p.add_argument("csv_files", nargs="+")
+    p = sub.add_parser("summary", help="aggregate runs per scenario configuration")
+    p.add_argument("--type", choices=("backup", "geo", "raid", "topology"))
+    p = sub.add_parser("compare", help="compare two git revisions (or sources, hosts, seeds)")
+    p.add_argument("baseline")
+    p.add_argument("candidate")
+    p.add_argument("--by", default="git_revision")
+    p = sub.add_parser("export", help="export runs as CSV")
+    p.add_argument("--type", choices=("backup", "geo", "raid", "topology"))
+    p.add_argument("--output", help="CSV file to write (default: stdout)")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.command == "import":
+        for path in args.csv_files:
+            print(f"Imported {store.import_csv(path)} rows from {path}")
+    elif args.command == "summary":
+        _print_table(summarize(store, args.type))
+    elif args.command == "compare":
+        _print_table(compare(store, args.by, args.baseline, args.candidate))
+    elif args.command == "export":
+        if args.output:
+            with open(args.output, "w", newline="") as f:
+                count = export_runs(store, f, args.type)
+            print(f"Exported {count} runs to {args.output}")
+        else:
+            export_runs(store, sys.stdout, args.type)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import importlib
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Scenario matrix shipped with the repository (run from the repository root)
+DEFAULT_MATRIX_PATH = "./scenarios.json"
+DEFAULT_MAX_PARALLEL = 4
+BUCKET_PREFIX = "rpo"
+
+# Scenario type -> (module, function); imported lazily so each script can run on its own
+SCENARIO_TYPES = {
+    "backup": ("Automated_backup_advanced", "run_automated_backup_test"),
+    "geo": ("Geo_Redundancy_advanced", "run_geo_failover_test"),
+    "raid": ("raid_benchmark", "run_raid_benchmark"),
+    "topology": ("topology_benchmark", "run_topology_test"),
+}
+# Outage and drive-failure scenarios break a shared container, so by default they never overlap with anything else
+EXCLUSIVE_BY_DEFAULT = {"geo", "raid", "topology"}
+RUNNER_KEYS = ("name", "type", "matrix", "exclusive")
+
+def load_matrix(path):
+    """Load a scenario matrix from JSON (or TOML on Python 3.11+)."""
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+def bucket_for(name):
+    """Derive a valid, scenario-private S3 bucket name."""
+    slug = re.sub(r"[^a-z0-9-]+", "-", name.lower()).strip("-")
+    return f"{BUCKET_PREFIX}-{slug}"[:63].rstrip("-")
+
+def expand_scenarios(matrix):
+    """Expand every entry's optional "matrix" block into concrete scenarios.
+
+    Each scenario is entry defaults + defaults[type] + one combination of the matrix
+    values; its name may use {placeholders} for any parameter.
+    """
+    defaults = matrix.get("defaults", {})
+    scenarios = []
+    for entry in matrix.get("scenarios", []):
+        axes = entry.get("matrix", {})
+        keys = sorted(axes)
+        for values in itertools.product(*(axes[k] for k in keys)) if keys else [()]:
+            params = dict(defaults.get(entry["type"], {}))
+            params.update({k: v for k, v in entry.items() if k not in RUNNER_KEYS})
+            params.update(dict(zip(keys, values)))
+            scenarios.append({
+                "name": entry["name"].format(**params),
+                "type": entry["type"],
+                "exclusive": entry.get("exclusive", entry["type"] in EXCLUSIVE_BY_DEFAULT),
+                "params": params,
+            })
+    names = [s["name"] for s in scenarios]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate scenario names in matrix: {duplicates}")
+    return scenarios
+
+def _resolve(scenario_type, runners):
+    if runners and scenario_type in runners:
+        return runners[scenario_type]
+    if scenario_type not in SCENARIO_TYPES:
+        raise ValueError(f"Unknown scenario type {scenario_type!r}, expected one of {sorted(SCENARIO_TYPES)}")
+    module_name, function_name = SCENARIO_TYPES[scenario_type]
+    return getattr(importlib.import_module(module_name), function_name)
+
+def run_scenario(scenario, runners=None, overrides=None):
+    """Run one expanded scenario in its own bucket (and backup directory); overrides replace its parameters.
+
+    The runner also gets the scenario's matrix_name to record its results under.
+    """
+    run = _resolve(scenario["type"], runners)
+    kwargs = dict(scenario["params"], bucket_name=bucket_for(scenario["name"]), matrix_name=scenario["name"],
+                  **(overrides or {}))
+    if scenario["type"] == "backup":
+        kwargs["backup_dir"] = os.path.join("./backups", bucket_for(scenario["name"]))
+    start = time.perf_counter()
+    try:
+        metrics = run(**kwargs) or {}
+        status = "ok"
+    except Exception as e:
+        print(f"Scenario {scenario['name']} failed: {e}")
+        metrics, status = {}, f"failed: {e}"
+    return {"name": scenario["name"], "status": status, "wall_seconds": time.perf_counter() - start,
+            "metrics": metrics}
+
+def run_matrix(matrix, scenario_type=None, only=None, max_parallel=None, runners=None, overrides=None):
+    """Run the selected scenarios: independent ones in parallel, exclusive ones one by one."""
+    scenarios = expand_scenarios(matrix)
+    if scenario_type:
+        scenarios = [s for s in scenarios if s["type"] == scenario_type]
+    if only:
+        unknown = set(only) - {s["name"] for s in scenarios}
+        if unknown:
+            raise ValueError(f"Unknown scenario names: {sorted(unknown)}")
+        scenarios = [s for s in scenarios if s["name"] in only]
+    max_parallel = max_parallel or matrix.get("max_parallel", DEFAULT_MAX_PARALLEL)
+
+    start = time.perf_counter()
+    parallel = [s for s in scenarios if not s["exclusive"]]
+    exclusive = [s for s in scenarios if s["exclusive"]]
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        results = list(pool.map(lambda s: run_scenario(s, runners, overrides), parallel))
+    results += [run_scenario(s, runners, overrides) for s in exclusive]
+    total = time.perf_counter() - start
+
+    print(f"{'scenario':40} {'status':8} {'wall_s':>8} {'RTO_s':>8} {'RPO_%':>7}")
+    for r in results:
+        m = r["metrics"]
+        rto = m.get("RTO_seconds")
+        rpo = m.get("RPO_data_restored_percentage")
+        print(f"{r['name'][:40]:40} {r['status'][:8]:8} {r['wall_seconds']:8.2f} "
+              f"{'-' if rto is None else f'{rto:.2f}':>8} {'-' if rpo is None else f'{rpo:.1f}':>7}")
+    print(f"Sweep of {len(results)} scenarios finished in {total:.2f}s (max_parallel={max_parallel}).")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scenario matrix.")
+    parser.add_argument("matrix", nargs="?", default=DEFAULT_MATRIX_PATH, help="JSON or TOML scenario matrix")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only these scenarios")
+    parser.add_argument("--type", choices=sorted(SCENARIO_TYPES), help="run only scenarios of this type")
+    parser.add_argument("--max-parallel", type=int, help="override max_parallel from the matrix")
+    parser.add_argument("--list", action="store_true", help="list scenario names and exit")
+    parser.add_argument("--cprofile", metavar="PHASE", help="run this traced phase (e.g. restore) under cProfile")
+    parser.add_argument("--wan-profile", metavar="PROFILE",
+                        help="run every region client over this WAN link profile (see wan_proxy.py)")
+    args = parser.parse_args()
+    if args.wan_profile:
+        os.environ["WAN_PROFILE"] = args.wan_profile
+
+    matrix = load_matrix(args.matrix)
+    if args.list:
+        for s in expand_scenarios(matrix):
+            if not args.type or s["type"] == args.type:
+                print(f"{s['name']:40} {s['type']:7} {'exclusive' if s['exclusive'] else 'parallel'}")
+        return
+    run_matrix(matrix, scenario_type=args.type, only=args.only, max_parallel=args.max_parallel,
+               overrides={"cprofile_phase": args.cprofile} if args.cprofile else None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+import datetime
+import hashlib
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Backend selection: "minio" talks to the docker-compose stack, "memory" uses the
+# in-process stand-in below so experiments can run on one machine without containers.
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "minio")
+DEFAULT_MAX_CONNECTIONS = 16
+STREAM_CHUNK_SIZE = 64 * 1024
+# Keys per ListObjects page (and per DeleteObjects request), as in S3
+LIST_PAGE_SIZE = 1000
+
+class StorageError(Exception):
+    """Error raised by the stand-in backend, mirroring S3Error's code and message."""
+
+    def __init__(self, code, message, bucket_name=None, object_name=None):
+        super().__init__(f"{code}: {message} (bucket={bucket_name}, object={object_name})")
+        self.code = code
+        self.message = message
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+
+class StorageBackend(ABC):
+    """The subset of the MinIO client API the experiments rely on.
+
+    InMemoryBackend implements it in-process; Minio clients implement it natively
+    and are registered as virtual subclasses by make_minio_client. Methods follow
+    the Minio signatures so either can be passed wherever a region client is expected.
+    """
+
+    @abstractmethod
+    def bucket_exists(self, bucket_name):
+        pass
+
+    @abstractmethod
+    def make_bucket(self, bucket_name):
+        pass
+
+    @abstractmethod
+    def remove_bucket(self, bucket_name):
+        pass
+
+    @abstractmethod
+    def list_objects(self, bucket_name, prefix=None, recursive=False, start_after=None):
+        pass
+
+    @abstractmethod
+    def stat_object(self, bucket_name, object_name):
+        pass
+
+    @abstractmethod
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        pass
+
+    @abstractmethod
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        pass
+
+    @abstractmethod
+    def fput_object(self, bucket_name, object_name, file_path, **kwargs):
+        pass
+
+    @abstractmethod
+    def remove_object(self, bucket_name, object_name):
+        pass
+
+    @abstractmethod
+    def upload_snowball_objects(self, bucket_name, object_list, **kwargs):
+        pass
+
+    @abstractmethod
+    def remove_objects(self, bucket_name, delete_object_list):
+        pass
+
+    # Minio's low-level multipart calls, used by multipart_transfer for resumable parts
+
+    @abstractmethod
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        pass
+
+    @abstractmethod
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        pass
+
+    @abstractmethod
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        pass
+
+    @abstractmethod
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        pass
+
+class StoredObject:
+    """Listing/stat entry with the same attributes as minio.datatypes.Object."""
+
+    def __init__(self, bucket_name, object_name, size=None, etag=None, last_modified=None, is_dir=False,
+                 metadata=None):
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.is_dir = is_dir
+        self.metadata = metadata or {}
+
+class WriteResult:
+    """Mirror of minio.helpers.ObjectWriteResult."""
+
+    def __init__(self, bucket_name, object_name, etag):
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.etag = etag
+        self.version_id = None
+
+class DeleteError:
+    """Mirror of minio.deleteobjects.DeleteError."""
+
+    def __init__(self, code, message, name):
+        self.code = code
+        self.message = message
+        self.name = name
+        self.version_id = None
+
+class Part:
+    """Mirror of minio.datatypes.Part, as passed to _complete_multipart_upload."""
+
+    def __init__(self, part_number, etag, last_modified=None, size=None):
+        self.part_number = part_number
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+
+class SharedLink:
+    """Serialises transfers over one bandwidth-capped link shared by all requests."""
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self._next_free = 0.0
+        self._lock = threading.Lock()
+
+    def transfer(self, size):
+        if not self.bytes_per_second or size <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._next_free = max(now, self._next_free) + size / self.bytes_per_second
+            wait = self._next_free - now
+        time.sleep(wait)
+
+class StandInResponse:
+    """get_object response that streams bytes through the backend's link."""
+
+    def __init__(self, data, link):
+        self._data = memoryview(data)
+        self._pos = 0
+        self._link = link
+        self.headers = {"Content-Length": str(len(data))}
+
+    def read(self, amt=None):
+        end = len(self._data) if amt is None or amt < 0 else min(len(self._data), self._pos + amt)
+        chunk = bytes(self._data[self._pos:end])
+        self._pos = end
+        self._link.transfer(len(chunk))
+        return chunk
+
+    def stream(self, amt=STREAM_CHUNK_SIZE):
+        while True:
+            chunk = self.read(amt)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+class InMemoryBackend(StorageBackend):
+    """In-process S3 stand-in with configurable latency, bandwidth and error injection.
+
+    latency is added to every request (seconds; a listing makes one request per
+    page of LIST_PAGE_SIZE keys), varied by up to +/- jitter, and with probability
+    stall_rate a request stalls for another stall seconds. bandwidth caps the bytes/sec
+    of a single link shared by all requests, error_rate is the probability that a request
+    fails with InternalError. Setting online to False makes every request fail the way
+    a stopped container does; pause() makes requests hang until resume(), like a
+    frozen container.
+    """
+
+    def __init__(self, name="memory", latency=0.0, bandwidth=None, error_rate=0.0, seed=0, jitter=0.0,
+                 stall_rate=0.0, stall=0.0):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.link = SharedLink(bandwidth)
+        self.error_rate = error_rate
+        self.online = True
+        self._running = threading.Event()
+        self._running.set()
+        self._rng = random.Random(seed)
+        self._buckets = {}
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def _request(self, bucket_name=None, object_name=None, check_bucket=True):
+        self._running.wait()
+        if not self.online:
+            raise ConnectionError(f"{self.name} is offline")
+        with self._lock:
+            self.requests += 1
+            fail = self.error_rate and self._rng.random() < self.error_rate
+            delay = self.latency
+            if self.jitter:
+                delay = max(0.0, delay + self._rng.uniform(-self.jitter, self.jitter))
+            if self.stall_rate and self._rng.random() < self.stall_rate:
+                delay += self.stall
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise StorageError("InternalError", "injected error", bucket_name, object_name)
+        if check_bucket and bucket_name is not None and bucket_name not in self._buckets:
+            raise StorageError("NoSuchBucket", "The specified bucket does not exist", bucket_name, object_name)
+
+    def _entry(self, bucket_name, object_name):
+        entry = self._buckets[bucket_name].get(object_name)
+        if entry is None:
+            raise StorageError("NoSuchKey", "The specified key does not exist", bucket_name, object_name)
+        return entry
+
+    def bucket_exists(self, bucket_name):
+        self._request(bucket_name, check_bucket=False)
+        return bucket_name in self._buckets
+
+    def make_bucket(self, bucket_name):
+        self._request(bucket_name, check_bucket=False)
+        with self._lock:
+            if bucket_name in self._buckets:
+                raise StorageError("BucketAlreadyOwnedByYou", "Bucket already exists", bucket_name)
+            self._buckets[bucket_name] = {}
+
+    def remove_bucket(self, bucket_name):
+        self._request(bucket_name)
+        with self._lock:
+            if self._buckets[bucket_name]:
+                raise StorageError("BucketNotEmpty", "The bucket you tried to delete is not empty", bucket_name)
+            del self._buckets[bucket_name]
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False, start_after=None):
+        self._request(bucket_name)
+        prefix = prefix or ""
+        with self._lock:
+            names = sorted(name for name in self._buckets[bucket_name]
+                           if name.startswith(prefix) and (start_after is None or name > start_after))
+            entries = {name: self._buckets[bucket_name][name] for name in names}
+        seen_dirs = set()
+        for index, name in enumerate(names):
+            if index and index % LIST_PAGE_SIZE == 0:
+                # Each further page of a listing is another request
+                self._request(bucket_name)
+            rest = name[len(prefix):]
+            if not recursive and "/" in rest:
+                directory = prefix + rest.split("/", 1)[0] + "/"
+                if directory not in seen_dirs:
+                    seen_dirs.add(directory)
+                    yield StoredObject(bucket_name, directory, is_dir=True)
+                continue
+            data, etag, last_modified, metadata = entries[name]
+            yield StoredObject(bucket_name, name, len(data), etag, last_modified, metadata=metadata)
+
+    def stat_object(self, bucket_name, object_name):
+        self._request(bucket_name, object_name)
+        data, etag, last_modified, metadata = self._entry(bucket_name, object_name)
+        return StoredObject(bucket_name, object_name, len(data), etag, last_modified, metadata=metadata)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        self._request(bucket_name, object_name)
+        data = self._entry(bucket_name, object_name)[0]
+        end = offset + length if length else len(data)
+        return StandInResponse(data[offset:end], self.link)
+
+    def put_object(self, bucket_name, object_name, data, length, metadata=None, **kwargs):
+        self._request(bucket_name, object_name)
+        body = bytearray()
+        while length < 0 or len(body) < length:
+            chunk = data.read(STREAM_CHUNK_SIZE if length < 0 else min(STREAM_CHUNK_SIZE, length - len(body)))
+            if not chunk:
+                break
+            body += chunk
+        if length >= 0 and len(body) != length:
+            raise IOError(f"stream having not enough data; expected: {length}, got: {len(body)} bytes")
+        self.link.transfer(len(body))
+        body = bytes(body)
+        etag = hashlib.md5(body).hexdigest()
+        with self._lock:
+            self._buckets[bucket_name][object_name] = (
+                body, etag, datetime.datetime.now(datetime.timezone.utc), dict(metadata or {}))
+        return WriteResult(bucket_name, object_name, etag)
+
+    def fput_object(self, bucket_name, object_name, file_path, **kwargs):
+        with open(file_path, "rb") as f:
+            return self.put_object(bucket_name, object_name, f, os.path.getsize(file_path), **kwargs)
+
+    def remove_object(self, bucket_name, object_name):
+        self._request(bucket_name, object_name)
+        with self._lock:
+            self._buckets[bucket_name].pop(object_name, None)
+
+    def upload_snowball_objects(self, bucket_name, object_list, metadata=None, **kwargs):
+        """Write many objects in one request, as MinIO does when it auto-extracts a TAR.
+
+        object_list holds minio SnowballObjects, each with data and length or a filename.
+        """
+        self._request(bucket_name)
+        entries = []
+        for obj in object_list:
+            if obj.filename is not None:
+                with open(obj.filename, "rb") as f:
+                    entries.append((obj.object_name, f.read()))
+            else:
+                entries.append((obj.object_name, obj.data.read(obj.length)))
+        self.link.transfer(sum(len(data) for _, data in entries))
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            bucket = self._buckets[bucket_name]
+            for name, data in entries:
+                bucket[name] = (data, hashlib.md5(data).hexdigest(), now, {})
+        return WriteResult(bucket_name, f"snowball.{time.time_ns()}.tar", None)
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        self._request(bucket_name, object_name)
+        upload_id = hashlib.md5(f"{bucket_name}/{object_name}/{time.time_ns()}".encode()).hexdigest()
+        with self._lock:
+            self._uploads[upload_id] = (bucket_name, object_name, {})
+        return upload_id
+
+    def _upload(self, bucket_name, object_name, upload_id):
+        upload = self._uploads.get(upload_id)
+        if upload is None or upload[:2] != (bucket_name, object_name):
+            raise StorageError("NoSuchUpload", "The specified multipart upload does not exist", bucket_name,
+                               object_name)
+        return upload[2]
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        self._request(bucket_name, object_name)
+        data = bytes(data)
+        self.link.transfer(len(data))
+        etag = hashlib.md5(data).hexdigest()
+        with self._lock:
+            self._upload(bucket_name, object_name, upload_id)[part_number] = (data, etag)
+        return etag
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        """Assemble the listed parts; the ETag is S3's md5-of-part-md5s with a -N suffix."""
+        self._request(bucket_name, object_name)
+        with self._lock:
+            uploaded = self._upload(bucket_name, object_name, upload_id)
+            body = bytearray()
+            digests = b""
+            for part in parts:
+                stored = uploaded.get(part.part_number)
+                if stored is None or stored[1] != part.etag:
+                    raise StorageError("InvalidPart", "One or more of the specified parts could not be found",
+                                       bucket_name, object_name)
+                body += stored[0]
+                digests += bytes.fromhex(stored[1])
+            etag = f"{hashlib.md5(digests).hexdigest()}-{len(parts)}"
+            self._buckets[bucket_name][object_name] = (
+                bytes(body), etag, datetime.datetime.now(datetime.timezone.utc), {})
+            del self._uploads[upload_id]
+        return WriteResult(bucket_name, object_name, etag)
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self._request(bucket_name, object_name)
+        with self._lock:
+            self._upload(bucket_name, object_name, upload_id)
+            del self._uploads[upload_id]
+
+    def remove_objects(self, bucket_name, delete_object_list):
+        """Batched delete of minio DeleteObjects; like Minio, errors are yielded lazily."""
+        self._request(bucket_name)
+        with self._lock:
+            bucket = self._buckets[bucket_name]
+            for delete_object in delete_object_list:
+                bucket.pop(delete_object.name, None)
+        return iter([])
+
+# Stand-ins are shared per endpoint so every script talking to "localhost:9001" sees the same data
+_standins = {}
+_standins_lock = threading.Lock()
+
+def get_standin(endpoint, **settings):
+    """Return the stand-in for an endpoint, creating it (with settings) on first use."""
+    with _standins_lock:
+        backend = _standins.get(endpoint)
+        if backend is None:
+            defaults = {
+                "latency": float(os.environ.get("STANDIN_LATENCY_MS", "0")) / 1000.0,
+                "bandwidth": float(os.environ.get("STANDIN_BANDWIDTH_MBPS", "0")) * 1024 * 1024 or None,
+                "error_rate": float(os.environ.get("STANDIN_ERROR_RATE", "0")),
+                "seed": int(os.environ.get("STANDIN_SEED", "0")),
+            }
+            defaults.update(settings)
+            backend = InMemoryBackend(endpoint, **defaults)
+            _standins[endpoint] = backend
+        return backend
+
+def make_minio_client(endpoint, max_connections=DEFAULT_MAX_CONNECTIONS, access_key="minioadmin",
+                      secret_key="minioadmin"):
+    """Create a MinIO client with one connection pool sized for concurrent workers."""
+    import urllib3
+    from minio import Minio
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=300, read=300),
+        maxsize=max_connections,
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+    StorageBackend.register(Minio)
+    return Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=False, http_client=http_client)
+
+def make_region_client(endpoint, max_connections=DEFAULT_MAX_CONNECTIONS, backend=None):
+    """Return the region client for an endpoint using the configured backend.
+
+    With WAN emulation on (see wan_proxy), MinIO clients connect through a local
+    proxy shaped by the endpoint's link profile and stand-ins take its latency,
+    jitter, stalls and bandwidth instead.
+    """
+    backend = backend or STORAGE_BACKEND
+    link = None
+    if backend in ("minio", "memory"):
+        from wan_proxy import link_for_endpoint
+        link = link_for_endpoint(endpoint)
+    if backend == "minio":
+        if link is not None:
+            from wan_proxy import proxy_endpoint
+            endpoint = proxy_endpoint(endpoint, link)
+        return make_minio_client(endpoint, max_connections)
+    if backend == "memory":
+        return get_standin(endpoint, **(link.standin_settings() if link is not None else {}))
+    raise ValueError(f"Unknown storage backend {backend!r}, expected 'minio' or 'memory'")
@@ -1,7 +1,7 @@
-from minio import Minio
+from storage_backend import make_region_client
 
 # Configure MinIO client for Region 2
-region2 = Minio("localhost:9002", access_key="minioadmin", secret_key="minioadmin", secure=False)
+region2 = make_region_client("localhost:9002")
 
 # Function to test recovery
 def test_recovery(bucket_name, object_name):
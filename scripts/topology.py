@@ -0,0 +1,274 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from storage_backend import make_region_client
+
+# Topology of the docker-compose stack (run from the repository root)
+DEFAULT_TOPOLOGY_PATH = "./topology.json"
+DEFAULT_COMPOSE_PATH = "./docker-compose.yml"
+FANOUTS = ("star", "chain", "quorum")
+BASE_API_PORT = 9000
+CONSOLE_PORT_OFFSET = 100
+# Host ports already used by other services of the stack (minio-raid)
+RESERVED_PORTS = {9003}
+DEFAULT_QUORUM_WORKERS = 8
+
+class Region:
+    """One MinIO region of the stack: its name, host ports, container and data directory."""
+
+    def __init__(self, name, api_port, console_port=None, container=None, data_dir=None):
+        self.name = name
+        self.api_port = api_port
+        self.console_port = console_port or api_port + CONSOLE_PORT_OFFSET
+        self.container = container or f"minio-{name}"
+        self.data_dir = data_dir or f"./data/{name}"
+
+    @property
+    def endpoint(self):
+        return f"localhost:{self.api_port}"
+
+    def to_dict(self):
+        return {"name": self.name, "api_port": self.api_port, "console_port": self.console_port,
+                "container": self.container, "data_dir": self.data_dir}
+
+def allocate_ports(count):
+    """Host API ports for count regions: 9001, 9002, ... skipping RESERVED_PORTS."""
+    ports = []
+    port = BASE_API_PORT
+    while len(ports) < count:
+        port += 1
+        if port not in RESERVED_PORTS:
+            ports.append(port)
+    return ports
+
+class Topology:
+    """Regions and how writes fan out between them; the first region is the primary.
+
+    star: the primary replicates to every other region at once.
+    chain: each region replicates to the next, so region k is k-1 hops from the primary.
+    quorum: every write goes to all regions at once and is acknowledged when
+    write_quorum of them hold it; the rest catch up in the background.
+
+    wan optionally describes the links between the regions for WAN emulation
+    (see wan_proxy.WanLinks).
+    """
+
+    def __init__(self, regions, fanout="star", write_quorum=None, name=None, wan=None):
+        if fanout not in FANOUTS:
+            raise ValueError(f"Unknown fan-out {fanout!r}, expected one of {FANOUTS}")
+        if len(regions) < 1:
+            raise ValueError("A topology needs at least one region")
+        if fanout == "quorum":
+            write_quorum = write_quorum or len(regions) // 2 + 1
+            if not 1 <= write_quorum <= len(regions):
+                raise ValueError(f"write_quorum must be between 1 and {len(regions)}, got {write_quorum}")
+        self.regions = list(regions)
+        self.fanout = fanout
+        self.write_quorum = write_quorum if fanout == "quorum" else None
+        self.name = name or f"{len(self.regions)}-region-{fanout}"
+        self.wan = wan
+
+    @property
+    def primary(self):
+        return self.regions[0]
+
+    def region(self, name):
+        for region in self.regions:
+            if region.name == name:
+                return region
+        raise KeyError(name)
+
+    def edges(self):
+        """Replication edges as (source, target) region names; quorum writes need none."""
+        names = [region.name for region in self.regions]
+        if self.fanout == "star":
+            return [(names[0], name) for name in names[1:]]
+        if self.fanout == "chain":
+            return list(zip(names, names[1:]))
+        return []
+
+    def failover_order(self):
+        """Regions to fail over to when the primary is lost, nearest first."""
+        return self.regions[1:]
+
+    def subset(self, count, fanout=None, write_quorum=None):
+        """The first count regions of this stack, optionally with another fan-out."""
+        if count > len(self.regions):
+            raise ValueError(f"The topology only has {len(self.regions)} regions, {count} requested")
+        fanout = fanout or self.fanout
+        if write_quorum is None and fanout == self.fanout and count == len(self.regions):
+            write_quorum = self.write_quorum
+        return Topology(self.regions[:count], fanout, write_quorum, wan=self.wan)
+
+    def clients(self, backend=None):
+        """One region client per region, by name."""
+        return {region.name: make_region_client(region.endpoint, backend=backend) for region in self.regions}
+
+    def containers(self):
+        """docker-compose container behind each endpoint, as in fault_injection.REGION_CONTAINERS."""
+        return {region.endpoint: region.container for region in self.regions}
+
+    def describe(self):
+        quorum = f", write quorum {self.write_quorum}/{len(self.regions)}" if self.fanout == "quorum" else ""
+        edges = ", ".join(f"{source}->{target}" for source, target in self.edges()) or "writes to every region"
+        return f"{self.name}: {len(self.regions)} regions, {self.fanout}{quorum} ({edges})"
+
+    def to_dict(self):
+        data = {"name": self.name, "fanout": self.fanout, "write_quorum": self.write_quorum,
+                "regions": [region.to_dict() for region in self.regions]}
+        if self.wan:
+            data["wan"] = self.wan
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a topology from its description.
+
+        "regions" is either a count (named region1..regionN on ports from
+        allocate_ports) or a list of region names or {"name", "api_port", ...} objects.
+        """
+        spec = data.get("regions", 2)
+        if isinstance(spec, int):
+            spec = [f"region{index + 1}" for index in range(spec)]
+        ports = iter(allocate_ports(len(spec)))
+        regions = []
+        for entry in spec:
+            if isinstance(entry, str):
+                entry = {"name": entry}
+            port = next(ports)
+            regions.append(Region(entry["name"], entry.get("api_port", port), entry.get("console_port"),
+                                  entry.get("container"), entry.get("data_dir")))
+        return cls(regions, data.get("fanout", "star"), data.get("write_quorum"), data.get("name"), data.get("wan"))
+
+def load_topology(path=DEFAULT_TOPOLOGY_PATH):
+    """Load a topology description from JSON (or TOML on Python 3.11+).
+
+    Without the default file (run from elsewhere than the repository root) the stack is
+    the two regions of the original docker-compose.yml.
+    """
+    if path == DEFAULT_TOPOLOGY_PATH and not os.path.exists(path):
+        return Topology.from_dict({})
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            return Topology.from_dict(tomllib.load(f))
+    with open(path) as f:
+        return Topology.from_dict(json.load(f))
+
+_REGION_SERVICE = """  {container}:
+    build:
+      context: .
+    image: ubuntu-minio
+    container_name: {container}
+    command: minio server --console-address ":{console_port}" /data
+    ports:
+      - "{api_port}:9000"  # API
+      - "{console_port}:{console_port}"  # WebUI
+    volumes:
+      - {data_dir}:/data
+    environment:
+      MINIO_ROOT_USER: "minioadmin"
+      MINIO_ROOT_PASSWORD: "minioadmin"
+    networks:
+      - minio-net
+"""
+
+_RAID_SERVICE = """  minio-raid:
+    image: minio/minio
+    container_name: minio-raid
+    command: minio server --console-address ":9103" /data1 /data2 /data3 /data4
+    ports:
+      - "9003:9000"
+      - "9103:9103"
+    environment:
+      MINIO_ROOT_USER: "minioadmin"
+      MINIO_ROOT_PASSWORD: "minioadmin"
+    volumes:
+      - ./data1:/data1
+      - ./data2:/data2
+      - ./data3:/data3
+      - ./data4:/data4
+    networks:
+      - minio-net
+"""
+
+def render_compose(topology, source=DEFAULT_TOPOLOGY_PATH):
+    """docker-compose.yml for the topology's regions plus the minio-raid service."""
+    header = (f"# Generated by scripts/topology.py from {os.path.normpath(source)}; edit that file and run\n"
+              f"#   python scripts/topology.py compose\n"
+              'version: "3.9"\n\nnetworks:\n  minio-net:\n    driver: bridge\n\nservices:\n')
+    services = [_REGION_SERVICE.format(**region.to_dict()) for region in topology.regions]
+    return header + "\n".join(services + [_RAID_SERVICE])
+
+class QuorumWriter:
+    """Write each object to every region at once, acknowledging it once write_quorum hold it.
+
+    The remaining writes finish in the background; landed_at records, per region, the
+    time.monotonic() at which each object arrived there and acked_at when it was
+    acknowledged, so the lag of the regions outside the quorum can be measured.
+    """
+
+    def __init__(self, clients, write_quorum, workers=DEFAULT_QUORUM_WORKERS):
+        self.clients = clients
+        self.write_quorum = write_quorum
+        self.landed_at = {name: {} for name in clients}
+        self.acked_at = {}
+        self.failed = []
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1) * len(clients))
+        self._lock = threading.Lock()
+
+    def put_file(self, bucket_name, object_name, file_path):
+        """Write one file to every region; return once the quorum holds it (raise if it cannot)."""
+        done = threading.Condition(self._lock)
+        state = {"ok": 0, "failed": 0}
+
+        def write(name):
+            try:
+                self.clients[name].fput_object(bucket_name, object_name, file_path)
+            except Exception as e:
+                with done:
+                    state["failed"] += 1
+                    self.failed.append((name, object_name, str(e)))
+                    done.notify_all()
+                return
+            with done:
+                state["ok"] += 1
+                self.landed_at[name][object_name] = time.monotonic()
+                done.notify_all()
+
+        for name in self.clients:
+            self._pool.submit(write, name)
+        with done:
+            done.wait_for(lambda: state["ok"] >= self.write_quorum
+                          or state["failed"] > len(self.clients) - self.write_quorum)
+            if state["ok"] < self.write_quorum:
+                raise IOError(f"{object_name}: write quorum {self.write_quorum} not reached "
+                              f"({state['ok']} of {len(self.clients)} regions)")
+            self.acked_at[object_name] = time.monotonic()
+
+    def drain(self):
+        """Wait for the background writes to finish."""
+        self._pool.shutdown(wait=True)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Describe a region topology or generate its compose file.")
+    parser.add_argument("command", choices=("describe", "compose"))
+    parser.add_argument("--topology", default=DEFAULT_TOPOLOGY_PATH)
+    parser.add_argument("--output", default=DEFAULT_COMPOSE_PATH, help="compose file to write")
+    args = parser.parse_args()
+    topology = load_topology(args.topology)
+    if args.command == "describe":
+        print(topology.describe())
+        for region in topology.regions:
+            print(f"  {region.name:<10} {region.endpoint:<16} console :{region.console_port:<6} "
+                  f"{region.container:<16} {region.data_dir}")
+        return
+    with open(args.output, "w") as f:
+        f.write(render_compose(topology, args.topology))
+    print(f"Wrote {args.output} for {topology.describe()}")
+
+if __name__ == "__main__":
+    main()
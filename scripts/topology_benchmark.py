@@ -0,0 +1,199 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bulk_ops import clear_bucket, list_bucket
+from dataset_generator import generate_dataset, DEFAULT_SEED
+from fault_injection import FaultInjector, make_fault
+from integrity_manifest import IntegrityManifest, upload_file, verify_region, manifest_path
+from readiness_tracker import ReadinessTracker, DEFAULT_READY_TIMEOUT
+from replication_engine import replicate_graph, DEFAULT_WORKERS
+from results_store import record_results
+from topology import load_topology, QuorumWriter, DEFAULT_TOPOLOGY_PATH
+from tracing import Tracer
+
+bucket_name = "topology-bucket"
+DEFAULT_UPLOAD_WORKERS = 8
+injector = FaultInjector()
+
+def _file_digests(file_path, buffer_size=1024 * 1024):
+    """Return (size, sha256, md5) of a file; the MD5 is the ETag of a single-part upload."""
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    size = 0
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(buffer_size)
+            if not data:
+                break
+            sha256.update(data)
+            md5.update(data)
+            size += len(data)
+    return size, sha256.hexdigest(), md5.hexdigest()
+
+def upload_files(topology, clients, bucket_name, directory, manifest, workers=DEFAULT_UPLOAD_WORKERS):
+    """Upload the generated files the way the topology takes writes.
+
+    Returns (bytes, {name: acked_at}, quorum writer or None).
+    Star and chain topologies write to the primary only; a quorum topology writes
+    every file to all regions and counts it as acknowledged once the write quorum
+    holds it. acked_at values are time.monotonic() instants.
+    """
+    print(f"Uploading files to bucket: {bucket_name} ({topology.describe()})")
+    writer = None
+    if topology.fanout == "quorum":
+        for client in clients.values():
+            if not client.bucket_exists(bucket_name):
+                client.make_bucket(bucket_name)
+        writer = QuorumWriter(clients, topology.write_quorum)
+    else:
+        primary = clients[topology.primary.name]
+        if not primary.bucket_exists(bucket_name):
+            primary.make_bucket(bucket_name)
+    acked_at = {}
+    lock = threading.Lock()
+
+    def upload(filename):
+        file_path = os.path.join(directory, filename)
+        if writer is not None:
+            size, sha256, md5 = _file_digests(file_path)
+            writer.put_file(bucket_name, filename, file_path)
+            manifest.record(filename, size, sha256, md5)
+        else:
+            upload_file(clients[topology.primary.name], bucket_name, filename, file_path, manifest)
+        with lock:
+            acked_at[filename] = time.monotonic()
+        return os.path.getsize(file_path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        uploaded_bytes = sum(pool.map(upload, os.listdir(directory)))
+    print("Upload completed.")
+    return uploaded_bytes, acked_at, writer
+
+def replication_lag(landed_at, acked_at):
+    """Per-object lag (seconds between a write's acknowledgement and its arrival) in one region."""
+    return [max(0.0, at - acked_at[name]) for name, at in landed_at.items() if name in acked_at]
+
+def run_topology_test(num_files=200, min_kb=10, max_kb=512, regions=3, fanout="star", write_quorum=None,
+                      topology_path=DEFAULT_TOPOLOGY_PATH, workers=DEFAULT_WORKERS,
+                      upload_workers=DEFAULT_UPLOAD_WORKERS, outage_mode="stop", seed=DEFAULT_SEED,
+                      distribution="uniform", profile="repetitive", bucket_name=bucket_name, verify="full",
+                      rto_timeout=DEFAULT_READY_TIMEOUT, cprofile_phase=None, matrix_name=None):
+    """Replicate across the first regions of the topology with the given fan-out and fail the primary.
+
+    Reports replication throughput, per-region lag (how long after its acknowledgement
+    each write reached a region) and the failover RTO and RPO of the nearest
+    secondary, so runs with more regions show how each scales. A secondary that does not
+    serve every object within rto_timeout seconds records an RTO of -1.
+    """
+    topology = load_topology(topology_path).subset(regions, fanout, write_quorum)
+    if len(topology.regions) < 2:
+        raise ValueError("A failover test needs at least two regions")
+    scenario_name = f"Topology {topology.describe()}"
+    clients = topology.clients()
+    primary = clients[topology.primary.name]
+    secondary = topology.failover_order()[0]
+    tracer = Tracer(bucket_name, cprofile_phase=cprofile_phase)
+    print(scenario_name)
+
+    with tracer.span("cleanup"):
+        for client in clients.values():
+            clear_bucket(client, bucket_name)
+    with tracer.span("generate"):
+        data_dir = generate_dataset(num_files, min_kb, max_kb, seed=seed, distribution=distribution, profile=profile)
+
+    # Step 1: Take the writes (quorum topologies already fan out here)
+    upload_start = time.monotonic()
+    with tracer.span("upload") as span:
+        manifest = IntegrityManifest()
+        uploaded_bytes, acked_at, writer = upload_files(topology, clients, bucket_name, data_dir, manifest,
+                                                        workers=upload_workers)
+        manifest.save(manifest_path(bucket_name))
+        span.add(bytes=uploaded_bytes, objects=len(acked_at))
+    upload_end = time.monotonic()
+    with tracer.span("list") as span:
+        original_objects = list_bucket(primary, bucket_name)
+        span.add(objects=len(original_objects))
+
+    # Step 2: Replicate along the topology's edges until every region holds every object
+    # Quorum writes replicate while they upload
+    replication_start = upload_start if writer is not None else time.monotonic()
+    with tracer.span("replicate") as span:
+        if writer is not None:
+            writer.drain()
+            landed = dict(writer.landed_at)
+            errors = len(writer.failed)
+        else:
+            stats = replicate_graph(clients, topology.edges(), bucket_name, original_objects, workers=workers)
+            landed = {target: target_stats.completed_at for target, target_stats in stats.items()}
+            errors = sum(len(target_stats.failed) for target_stats in stats.values())
+        replicated_bytes = sum(obj.size or 0 for obj in original_objects) * (len(topology.regions) - 1)
+        span.add(bytes=replicated_bytes, objects=len(original_objects) * (len(topology.regions) - 1), errors=errors)
+    metrics = {"regions": len(topology.regions), "replication_errors": errors}
+    region_lags = {}
+    for region in topology.failover_order():
+        lags = replication_lag(landed.get(region.name, {}), acked_at)
+        caught_up = max(0.0, max(landed.get(region.name, {}).values(), default=upload_end) - upload_end)
+        region_lags[region.name] = lags
+        metrics[f"{region.name}_catch_up_seconds"] = caught_up
+        metrics[f"{region.name}_max_lag_seconds"] = max(lags, default=None)
+        print(f"{region.name}: {len(lags)}/{len(original_objects)} objects, caught up {caught_up:.2f}s after the "
+              f"upload, max lag {max(lags, default=0.0):.2f}s")
+    all_lags = [lag for lags in region_lags.values() for lag in lags]
+    last_landed = max((at for times in landed.values() for at in times.values()), default=replication_start)
+    replicate_seconds = last_landed - replication_start
+    metrics.update({"replicate_seconds": replicate_seconds,
+                    "catch_up_seconds": max(0.0, last_landed - upload_end),
+                    "replication_mb_per_second": replicated_bytes / (1024 * 1024) / replicate_seconds
+                    if replicate_seconds > 0 else 0.0,
+                    "max_lag_seconds": max(all_lags, default=None),
+                    "mean_lag_seconds": sum(all_lags) / len(all_lags) if all_lags else None})
+
+    # Step 3: Fail the primary and measure how long the nearest secondary takes to serve everything
+    # A failed injection raises FaultInjectionError and fails the run rather than measuring a healthy primary
+    with tracer.span("fault"):
+        print(f"Simulating {topology.primary.name} outage ({outage_mode})...")
+        fault_event = injector.inject(make_fault(outage_mode, primary, container=topology.primary.container,
+                                                 endpoint=topology.primary.endpoint))
+    expected_names = [obj.object_name for obj in original_objects]
+    with tracer.span("failover_read") as span:
+        tracker = ReadinessTracker(clients[secondary.name], bucket_name, expected_names=expected_names,
+                                   expected_count=len(expected_names))
+        rto = tracker.wait_until_ready(timeout=rto_timeout, since=fault_event.effective_at)
+        span.add(bytes=tracker.report.bytes, objects=tracker.report.accessible, errors=len(tracker.report.failed))
+    # Objects that never become readable fail the run (RTO -1, as in the raid benchmark) instead of hanging it
+    rto_text = f"{rto:.2f}s" if rto is not None else f"none, not every object readable after {rto_timeout:.0f}s"
+    print(f"Failover to {secondary.name}: {tracker.report.describe()}; RTO: {rto_text}")
+    with tracer.span("integrity") as span:
+        integrity = verify_region(clients[secondary.name], bucket_name, manifest, mode=verify)
+        span.add(bytes=integrity.hashed_bytes, objects=integrity.intact, errors=integrity.expected - integrity.intact)
+    print(f"{secondary.name} integrity: {integrity.describe()}")
+    with tracer.span("recover") as span:
+        injector.recover(fault_event)
+        span.add(errors=fault_event.error is not None)
+
+    rpo_percentage = integrity.intact / len(expected_names) * 100 if expected_names else 100.0
+    metrics.update({"RTO_seconds": -1 if rto is None else rto, "RPO_data_restored_percentage": rpo_percentage,
+                    "fault_inject_seconds": fault_event.inject_seconds()})
+    metrics.update(integrity.metrics())
+    params = {"num_files": num_files, "min_kb": min_kb, "max_kb": max_kb, "regions": len(topology.regions),
+              "fanout": topology.fanout, "write_quorum": topology.write_quorum, "topology_path": topology_path,
+              "workers": workers, "upload_workers": upload_workers, "outage_mode": outage_mode, "seed": seed,
+              "distribution": distribution, "profile": profile, "bucket_name": bucket_name, "verify": verify,
+              "rto_timeout": rto_timeout}
+    latencies = {"failover_ttfb": tracker.report.ttfb.summary(), "failover_read": tracker.report.full_read.summary()}
+    tracer.save(params)
+    record_results("topology", scenario_name, params, metrics, tracer.phases(), latencies, matrix_name=matrix_name)
+    print(f"Test scenario completed. Replicated at {metrics['replication_mb_per_second']:.2f} MB/s, RTO: {rto_text}, "
+          f"RPO: {rpo_percentage:.2f}%. Check results.db for recorded metrics.\n\n")
+    return metrics
+
+def main():
+    # The topology scenarios are declared in the scenario matrix and run one at a time
+    from scenario_runner import load_matrix, run_matrix, DEFAULT_MATRIX_PATH
+    run_matrix(load_matrix(DEFAULT_MATRIX_PATH), scenario_type="topology",
+               runners={"topology": run_topology_test})
+
+if __name__ == "__main__":
+    main()
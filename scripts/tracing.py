@@ -0,0 +1,162 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+
+# One JSON trace per scenario run (run from the repository root)
+DEFAULT_TRACE_DIR = "./traces"
+PROFILE_TOP = 15
+
+class Span:
+    """Wall time, CPU time, bytes, objects and errors of one phase of a run.
+
+    cpu_seconds is process-wide (time.process_time()), so it includes every worker
+    thread of the phase, and any other scenario running in the same process.
+    """
+
+    def __init__(self, name, offset, attrs=None):
+        self.name = name
+        self.offset = offset
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.bytes = 0
+        self.objects = 0
+        self.errors = 0
+        self.attrs = dict(attrs or {})
+
+    def add(self, bytes=0, objects=0, errors=0, **attrs):
+        self.bytes += bytes or 0
+        self.objects += objects or 0
+        self.errors += errors or 0
+        self.attrs.update(attrs)
+
+    def mb_per_second(self):
+        return self.bytes / (1024 * 1024) / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self):
+        return {"phase": self.name, "offset": self.offset, "wall_seconds": self.wall_seconds,
+                "cpu_seconds": self.cpu_seconds, "bytes": self.bytes, "objects": self.objects,
+                "errors": self.errors, "attrs": self.attrs}
+
+class Tracer:
+    """Collects the spans of one scenario run and writes them as a JSON trace.
+
+    With cprofile_phase set, that phase also runs under cProfile; the stats are
+    saved next to the trace and the top functions printed. cProfile only sees the
+    thread that opened the span, not the phase's worker threads.
+    """
+
+    def __init__(self, name, cprofile_phase=None, trace_dir=DEFAULT_TRACE_DIR):
+        self.name = name
+        self.cprofile_phase = cprofile_phase
+        self.trace_dir = trace_dir
+        self.spans = []
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        span = Span(name, time.perf_counter() - self._start, attrs)
+        profiler = cProfile.Profile() if name == self.cprofile_phase else None
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield span
+        except Exception:
+            span.errors += 1
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            span.wall_seconds = time.perf_counter() - wall
+            span.cpu_seconds = time.process_time() - cpu
+            self.spans.append(span)
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+
+    def _dump_profile(self, name, profiler):
+        os.makedirs(self.trace_dir, exist_ok=True)
+        path = os.path.join(self.trace_dir, f"{self._file_stem()}-{name}.prof")
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"Profile of phase {name} (saved to {path}):\n{out.getvalue()}")
+
+    def _file_stem(self):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", self.name).strip("-")
+        return f"{slug}-{time.strftime('%Y%m%dT%H%M%S', time.localtime(self.started_at))}"
+
+    def phases(self):
+        """The spans as rows for the results store's phases table."""
+        return [{key: value for key, value in span.to_dict().items() if key not in ("offset", "attrs")}
+                for span in self.spans]
+
+    def describe(self):
+        total = sum(span.wall_seconds for span in self.spans) or 1e-9
+        lines = [f"{'phase':<20} {'wall_s':>8} {'share':>6} {'cpu_s':>8} {'MB':>9} {'MB/s':>8} {'objects':>8} "
+                 f"{'errors':>6}"]
+        for span in self.spans:
+            lines.append(f"{span.name:<20} {span.wall_seconds:>8.2f} {span.wall_seconds / total:>6.0%} "
+                         f"{span.cpu_seconds:>8.2f} {span.bytes / (1024 * 1024):>9.2f} {span.mb_per_second():>8.2f} "
+                         f"{span.objects:>8} {span.errors:>6}")
+        return "\n".join(lines)
+
+    def save(self, params=None):
+        """Write the trace to trace_dir and return its path."""
+        os.makedirs(self.trace_dir, exist_ok=True)
+        path = os.path.join(self.trace_dir, f"{self._file_stem()}.json")
+        with open(path, "w") as f:
+            json.dump({"name": self.name, "started_at": self.started_at, "params": params or {},
+                       "spans": [span.to_dict() for span in self.spans]}, f, indent=2, default=str)
+        print(f"Trace of {self.name}:\n{self.describe()}\nSaved to {path}")
+        return path
+
+def summarize(paths):
+    """Aggregate phases over trace files: runs, mean wall/CPU time, share of wall time and MB/s."""
+    totals = {}
+    order = []
+    for path in paths:
+        with open(path) as f:
+            trace = json.load(f)
+        for span in trace["spans"]:
+            entry = totals.get(span["phase"])
+            if entry is None:
+                entry = totals[span["phase"]] = {"runs": 0, "wall": 0.0, "cpu": 0.0, "bytes": 0, "objects": 0,
+                                                 "errors": 0}
+                order.append(span["phase"])
+            entry["runs"] += 1
+            entry["wall"] += span["wall_seconds"]
+            entry["cpu"] += span["cpu_seconds"]
+            entry["bytes"] += span["bytes"]
+            entry["objects"] += span["objects"]
+            entry["errors"] += span["errors"]
+    grand_total = sum(entry["wall"] for entry in totals.values()) or 1e-9
+    print(f"{len(paths)} trace(s)")
+    print(f"{'phase':<20} {'runs':>5} {'wall_s':>8} {'share':>6} {'cpu_s':>8} {'MB/s':>8} {'objects':>8} {'errors':>6}")
+    for phase in sorted(order, key=lambda p: -totals[p]["wall"]):
+        entry = totals[phase]
+        mb_per_second = entry["bytes"] / (1024 * 1024) / entry["wall"] if entry["wall"] > 0 else 0.0
+        print(f"{phase:<20} {entry['runs']:>5} {entry['wall'] / entry['runs']:>8.2f} "
+              f"{entry['wall'] / grand_total:>6.0%} {entry['cpu'] / entry['runs']:>8.2f} {mb_per_second:>8.2f} "
+              f"{entry['objects'] // entry['runs']:>8} {entry['errors']:>6}")
+    return totals
+
+def main():
+    import argparse
+    import glob
+    parser = argparse.ArgumentParser(description="Summarize per-phase JSON traces.")
+    parser.add_argument("paths", nargs="*", help=f"trace files (default: every trace in {DEFAULT_TRACE_DIR})")
+    args = parser.parse_args()
+    paths = args.paths or sorted(glob.glob(os.path.join(DEFAULT_TRACE_DIR, "*.json")))
+    if not paths:
+        parser.error("no trace files found")
+    summarize(paths)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from storage_backend import SharedLink
+from topology import load_topology, DEFAULT_TOPOLOGY_PATH
+
+# Named link profiles: one-way latency and jitter (ms), bandwidth per direction
+# (Mbit/s, 0 = unlimited) and stalls, a pause of stall_ms hitting a chunk with
+# probability stall_rate the way a dropped packet waits for its retransmission.
+LINK_PROFILES = {
+    "local": {"latency_ms": 0, "jitter_ms": 0, "bandwidth_mbit": 0, "stall_rate": 0.0, "stall_ms": 0},
+    "metro": {"latency_ms": 1, "jitter_ms": 0.2, "bandwidth_mbit": 1000, "stall_rate": 0.0, "stall_ms": 0},
+    "regional": {"latency_ms": 10, "jitter_ms": 2, "bandwidth_mbit": 500, "stall_rate": 0.0001, "stall_ms": 200},
+    "continental": {"latency_ms": 35, "jitter_ms": 5, "bandwidth_mbit": 200, "stall_rate": 0.0005, "stall_ms": 200},
+    "intercontinental": {"latency_ms": 80, "jitter_ms": 10, "bandwidth_mbit": 100, "stall_rate": 0.001,
+                         "stall_ms": 300},
+    "lossy": {"latency_ms": 50, "jitter_ms": 20, "bandwidth_mbit": 50, "stall_rate": 0.01, "stall_ms": 400},
+}
+# Site of the machine running the experiments, as named in the "links" of topology.json
+CLIENT_SITE = "client"
+# Bytes forwarded per read, and bytes a direction may hold in flight before it
+# stops reading (the emulated TCP window)
+DEFAULT_CHUNK_SIZE = 16 * 1024
+DEFAULT_WINDOW = 4 * 1024 * 1024
+
+class LinkProfile:
+    """Latency, jitter, bandwidth and stalls of one emulated link (times in seconds)."""
+
+    def __init__(self, name, latency_ms=0.0, jitter_ms=0.0, bandwidth_mbit=0.0, stall_rate=0.0, stall_ms=0.0):
+        self.name = name
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.bytes_per_second = bandwidth_mbit * 1000 * 1000 / 8 or None
+        self.stall_rate = stall_rate
+        self.stall = stall_ms / 1000.0
+
+    @property
+    def is_local(self):
+        return not (self.latency or self.jitter or self.bytes_per_second or self.stall_rate)
+
+    def standin_settings(self):
+        """InMemoryBackend settings for the same link: a request pays the round trip."""
+        return {"latency": 2 * self.latency, "jitter": 2 * self.jitter, "bandwidth": self.bytes_per_second,
+                "stall_rate": self.stall_rate, "stall": self.stall}
+
+    def describe(self):
+        bandwidth = f"{self.bytes_per_second * 8 / 1e6:g} Mbit/s" if self.bytes_per_second else "unlimited"
+        stalls = f", {self.stall * 1000:g} ms stalls on {self.stall_rate:.2%} of chunks" if self.stall_rate else ""
+        return (f"{self.name}: {self.latency * 1000:g}±{self.jitter * 1000:g} ms one way, "
+                f"{bandwidth}{stalls}")
+
+def get_profile(profile):
+    """A LinkProfile from a profile name or a dict of settings ("profile" names one to start from)."""
+    if isinstance(profile, LinkProfile):
+        return profile
+    if isinstance(profile, str):
+        if profile not in LINK_PROFILES:
+            raise ValueError(f"Unknown link profile {profile!r}, expected one of {sorted(LINK_PROFILES)}")
+        return LinkProfile(profile, **LINK_PROFILES[profile])
+    settings = dict(profile)
+    base = settings.pop("profile", None)
+    name = settings.pop("name", base or "custom")
+    return LinkProfile(name, **{**(LINK_PROFILES[base] if base else {}), **settings})
+
+class WanLinks:
+    """The link profile between each pair of sites.
+
+    Sites are the region names plus CLIENT_SITE, the machine running the experiments.
+    links maps "siteA-siteB" (either order) to a profile; pairs not listed use default.
+    Every region client talks from client_region, so with client_region set to the
+    primary, replication to each secondary crosses the primary-secondary link.
+    """
+
+    def __init__(self, endpoints, default=None, links=None, client_region=CLIENT_SITE):
+        self.endpoints = dict(endpoints)
+        self.default = get_profile(default) if default else None
+        self.links = {pair: get_profile(profile) for pair, profile in (links or {}).items()}
+        self.client_region = client_region
+
+    def between(self, site, other):
+        """Profile of the link between two sites (None when they are the same site)."""
+        if site == other:
+            return None
+        return self.links.get(f"{site}-{other}") or self.links.get(f"{other}-{site}") or self.default
+
+    def for_endpoint(self, endpoint):
+        """Profile of the link from the client to an endpoint; endpoints outside the topology use default."""
+        region = self.endpoints.get(endpoint)
+        profile = self.between(self.client_region, region) if region else self.default
+        return None if profile is None or profile.is_local else profile
+
+    def describe(self):
+        lines = [f"client at {self.client_region}"]
+        for endpoint, region in self.endpoints.items():
+            profile = self.for_endpoint(endpoint)
+            lines.append(f"  {region:<10} {endpoint:<16} {profile.describe() if profile else 'direct'}")
+        return "\n".join(lines)
+
+def load_links(profile=None, topology_path=None):
+    """WAN links from WAN_PROFILE (the default profile) and the "wan" block of topology.json.
+
+    The block looks like {"client_region": "region1", "default": "continental",
+    "links": {"region1-region2": "metro"}}. Returns None when neither is set, which
+    leaves WAN emulation off.
+    """
+    profile = profile or os.environ.get("WAN_PROFILE")
+    topology_path = topology_path or os.environ.get("WAN_TOPOLOGY", DEFAULT_TOPOLOGY_PATH)
+    wan = {}
+    endpoints = {}
+    if os.path.exists(topology_path):
+        topology = load_topology(topology_path)
+        wan = topology.wan or {}
+        endpoints = {region.endpoint: region.name for region in topology.regions}
+    if not profile and not wan:
+        return None
+    return WanLinks(endpoints, profile or wan.get("default"), wan.get("links"),
+                    wan.get("client_region", CLIENT_SITE))
+
+_links = None
+_links_loaded = False
+_links_lock = threading.Lock()
+
+def configure(profile=None, topology_path=None):
+    """(Re)load the WAN links used by make_region_client; returns them (None when off)."""
+    global _links, _links_loaded
+    with _links_lock:
+        _links = load_links(profile, topology_path)
+        _links_loaded = True
+        return _links
+
+def link_for_endpoint(endpoint):
+    """Link profile for a region client's endpoint, or None when its traffic is not shaped."""
+    with _links_lock:
+        loaded = _links_loaded
+    links = _links if loaded else configure()
+    return links.for_endpoint(endpoint) if links is not None else None
+
+class WanProxy:
+    """Localhost TCP proxy forwarding to target over an emulated link.
+
+    Each direction delays every chunk by the profile's latency plus jitter (never
+    reordering), adds the occasional stall, and serialises chunks over a
+    bandwidth-capped link shared by all connections in that direction. A new
+    connection pays one round trip before it reaches the target.
+    """
+
+    def __init__(self, target, profile, listen_port=0, seed=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 window=DEFAULT_WINDOW):
+        host, port = target.rsplit(":", 1)
+        self.target = (host, int(port))
+        self.profile = get_profile(profile)
+        self.listen_port = listen_port
+        self.chunk_size = chunk_size
+        self.window = window
+        self.links = {"up": SharedLink(self.profile.bytes_per_second),
+                      "down": SharedLink(self.profile.bytes_per_second)}
+        self.bytes = {"up": 0, "down": 0}
+        self.connections = 0
+        self.failed_connections = 0
+        self.stalls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def endpoint(self):
+        return f"localhost:{self.listen_port}"
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", self.listen_port))
+        self._server.listen(128)
+        self.listen_port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _delay(self):
+        with self._lock:
+            delay = self.profile.latency
+            if self.profile.jitter:
+                delay = max(0.0, delay + self._rng.uniform(-self.profile.jitter, self.profile.jitter))
+            if self.profile.stall_rate and self._rng.random() < self.profile.stall_rate:
+                delay += self.profile.stall
+                self.stalls += 1
+        return delay
+
+    def _serve(self, conn):
+        time.sleep(self._delay() + self._delay())
+        try:
+            upstream = socket.create_connection(self.target)
+        except OSError:
+            with self._lock:
+                self.failed_connections += 1
+            conn.close()
+            return
+        with self._lock:
+            self.connections += 1
+        for sock in (conn, upstream):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        down = threading.Thread(target=self._pump, args=(upstream, conn, "down"), daemon=True)
+        down.start()
+        self._pump(conn, upstream, "up")
+        down.join()
+        conn.close()
+        upstream.close()
+
+    def _pump(self, src, dst, direction):
+        """Forward src to dst until src closes, delivering each chunk at its emulated arrival time."""
+        chunks = queue.Queue(maxsize=max(2, self.window // self.chunk_size))
+        link = self.links[direction]
+
+        def deliver():
+            failed = False
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                if failed:
+                    continue
+                deliver_at, data = item
+                try:
+                    wait = deliver_at - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    link.transfer(len(data))
+                    dst.sendall(data)
+                except OSError:
+                    # The far side went away: stop the reader too and drain what it queued
+                    failed = True
+                    try:
+                        src.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+            if not failed:
+                try:
+                    dst.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+
+        sender = threading.Thread(target=deliver, daemon=True)
+        sender.start()
+        last = 0.0
+        try:
+            while True:
+                data = src.recv(self.chunk_size)
+                if not data:
+                    break
+                last = max(time.monotonic() + self._delay(), last)
+                with self._lock:
+                    self.bytes[direction] += len(data)
+                chunks.put((last, data))
+        except OSError:
+            pass
+        finally:
+            chunks.put(None)
+        sender.join()
+
+    def summary(self):
+        with self._lock:
+            return {"target": f"{self.target[0]}:{self.target[1]}", "profile": self.profile.name,
+                    "connections": self.connections, "failed_connections": self.failed_connections,
+                    "bytes_up": self.bytes["up"], "bytes_down": self.bytes["down"], "stalls": self.stalls}
+
+# One proxy per (endpoint, profile), shared by every client of the process
+_proxies = {}
+_proxies_lock = threading.Lock()
+
+def proxy_endpoint(endpoint, profile):
+    """Endpoint of the running proxy to endpoint over profile, starting it on first use."""
+    profile = get_profile(profile)
+    with _proxies_lock:
+        proxy = _proxies.get((endpoint, profile.name))
+        if proxy is None:
+            proxy = WanProxy(endpoint, profile).start()
+            _proxies[(endpoint, profile.name)] = proxy
+            print(f"WAN proxy {proxy.endpoint} -> {endpoint} ({profile.describe()})")
+        return proxy.endpoint
+
+def proxy_summaries():
+    with _proxies_lock:
+        return [proxy.summary() for proxy in _proxies.values()]
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="WAN link profiles and the proxy that emulates them.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("profiles", help="list the named link profiles")
+    links = sub.add_parser("links", help="show the link to each region of the topology")
+    links.add_argument("--profile", help="default profile (overrides WAN_PROFILE)")
+    links.add_argument("--topology", default=DEFAULT_TOPOLOGY_PATH)
+    serve = sub.add_parser("serve", help="run a proxy in the foreground, e.g. for mc")
+    serve.add_argument("target", help="endpoint to forward to, e.g. localhost:9002")
+    serve.add_argument("--profile", required=True)
+    serve.add_argument("--port", type=int, default=0, help="port to listen on (default: any free port)")
+    args = parser.parse_args()
+
+    if args.command == "profiles":
+        for name in LINK_PROFILES:
+            print(get_profile(name).describe())
+    elif args.command == "links":
+        wan = load_links(args.profile, args.topology)
+        print(wan.describe() if wan is not None else "WAN emulation is off (set WAN_PROFILE or a \"wan\" block)")
+    else:
+        proxy = WanProxy(args.target, args.profile, listen_port=args.port).start()
+        print(f"Forwarding {proxy.endpoint} -> {args.target} ({proxy.profile.describe()}); Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            proxy.stop()
+            print(proxy.summary())
+
+if __name__ == "__main__":
+    main()
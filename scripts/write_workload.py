@@ -0,0 +1,186 @@
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bulk_ops import list_bucket
+
+# Live writes go under their own prefix so they never mix with the scenario's dataset
+WORKLOAD_PREFIX = "live/"
+DEFAULT_WRITE_RATE = 50.0
+DEFAULT_SIZE_MIX = ((4, 70), (64, 25), (1024, 5))
+DEFAULT_OVERWRITE_FRACTION = 0.3
+DEFAULT_WORKERS = 8
+HEADER_SIZE = 32
+
+def _header(seq):
+    return f"seq={seq}\n".encode().ljust(HEADER_SIZE, b"#")
+
+def _parse_header(data):
+    try:
+        return int(data.split(b"\n", 1)[0].split(b"=", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+class WriteJournal:
+    """Every acknowledged write, in acknowledgement order.
+
+    Entries are (seq, object_name, size, etag, acked_at) with acked_at a wall-clock
+    timestamp; each object's payload starts with its seq so the surviving version of
+    an overwritten object can be identified even when its ETag is unknown.
+    """
+
+    def __init__(self, path=None):
+        self.entries = []
+        self.failures = 0
+        self._file = open(path, "a") if path else None
+        self._lock = threading.Lock()
+
+    def record(self, seq, object_name, size, etag, acked_at):
+        with self._lock:
+            self.entries.append((seq, object_name, size, etag, acked_at))
+            if self._file:
+                self._file.write(json.dumps({"seq": seq, "object": object_name, "size": size, "etag": etag,
+                                             "acked_at": acked_at}) + "\n")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _surviving_seq(self, client, bucket_name, object_name, etag, seq_by_etag):
+        seq = seq_by_etag.get((object_name, etag))
+        if seq is not None:
+            return seq
+        # Unknown ETag (e.g. rewritten by a restore): read the seq header instead
+        response = client.get_object(bucket_name, object_name, offset=0, length=HEADER_SIZE)
+        try:
+            return _parse_header(response.read())
+        finally:
+            response.close()
+            response.release_conn()
+
+    def analyze_loss(self, client, bucket_name, failure_time, started_at=None):
+        """Compare the journal with what the recovered region holds.
+
+        An acknowledged write is lost when the recovered copy of its object is older
+        than it or missing. The lost window is the time between the oldest lost write
+        and the failure; throughput is measured over the writes acknowledged before it.
+        """
+        with self._lock:
+            entries = [e for e in self.entries if e[4] <= failure_time]
+        seq_by_etag = {(name, etag): seq for seq, name, _, etag, _ in entries}
+        surviving = {}
+        try:
+            for obj in list_bucket(client, bucket_name, prefix=WORKLOAD_PREFIX):
+                try:
+                    surviving[obj.object_name] = self._surviving_seq(client, bucket_name, obj.object_name, obj.etag,
+                                                                     seq_by_etag)
+                except Exception:
+                    surviving[obj.object_name] = None
+        except Exception as e:
+            print(f"Could not list {bucket_name} in the recovered region ({e}); counting every write as lost")
+        lost = [e for e in entries if surviving.get(e[1]) is None or surviving[e[1]] < e[0]]
+        started_at = started_at if started_at is not None else (entries[0][4] if entries else failure_time)
+        duration = max(failure_time - started_at, 1e-9)
+        acked_bytes = sum(e[2] for e in entries)
+        return {
+            "acked_writes": len(entries),
+            "lost_writes": len(lost),
+            "lost_write_bytes": sum(e[2] for e in lost),
+            "lost_write_window_seconds": failure_time - min(e[4] for e in lost) if lost else 0.0,
+            "write_throughput_ops": len(entries) / duration,
+            "write_throughput_mb_per_second": acked_bytes / (1024 * 1024) / duration,
+        }
+
+class WriteWorkload:
+    """Open-loop writer: writes (and overwrites) objects at a fixed rate until stopped.
+
+    size_mix is a list of (size_kb, weight); overwrite_fraction is the share of writes
+    that replace an object this workload already wrote.
+    """
+
+    def __init__(self, region_client, bucket_name, rate=DEFAULT_WRITE_RATE, size_mix=DEFAULT_SIZE_MIX,
+                 overwrite_fraction=DEFAULT_OVERWRITE_FRACTION, workers=DEFAULT_WORKERS, seed=0, journal_path=None):
+        self.region_client = region_client
+        self.bucket_name = bucket_name
+        self.rate = rate
+        self.sizes = [size_kb * 1024 for size_kb, _ in size_mix]
+        self.weights = [weight for _, weight in size_mix]
+        self.overwrite_fraction = overwrite_fraction
+        self.workers = workers
+        self.seed = seed
+        self.journal = WriteJournal(journal_path)
+        self.started_at = None
+        self.behind = 0
+        self._rng = random.Random(seed)
+        self._names = []
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def _write(self, seq, object_name, size):
+        data = _header(seq) + random.Random(self.seed * 1000003 + seq).randbytes(max(0, size - HEADER_SIZE))
+        try:
+            result = self.region_client.put_object(self.bucket_name, object_name, io.BytesIO(data), length=len(data))
+        except Exception:
+            self.journal.record_failure()
+            return
+        self.journal.record(seq, object_name, len(data), getattr(result, "etag", None), time.time())
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        next_at = time.monotonic()
+        seq = 0
+        while not self._stopped.is_set():
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                if self._stopped.wait(delay):
+                    break
+            elif delay < -interval:
+                self.behind += 1
+            seq += 1
+            if self._names and self._rng.random() < self.overwrite_fraction:
+                object_name = self._rng.choice(self._names)
+            else:
+                object_name = f"{WORKLOAD_PREFIX}obj_{seq:08d}"
+                self._names.append(object_name)
+            size = self._rng.choices(self.sizes, weights=self.weights)[0]
+            self._pool.submit(self._write, seq, object_name, size)
+            next_at += interval
+
+    def start(self):
+        if not self.region_client.bucket_exists(self.bucket_name):
+            self.region_client.make_bucket(self.bucket_name)
+        self.started_at = time.time()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"Write workload started on {self.bucket_name}: {self.rate:g} writes/s, "
+              f"{self.overwrite_fraction:.0%} overwrites")
+        return self
+
+    def stop(self, wait=True):
+        """Stop issuing writes; by default wait for the in-flight ones to be acknowledged or fail.
+
+        Use wait=False when the region is paused and in-flight requests may hang.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        self.journal.close()
+
+    def analyze_loss(self, client, bucket_name, failure_time):
+        loss = self.journal.analyze_loss(client, bucket_name, failure_time, self.started_at)
+        print(f"Live writes: {loss['acked_writes']} acknowledged before the failure "
+              f"({loss['write_throughput_ops']:.1f} writes/s, {loss['write_throughput_mb_per_second']:.2f} MB/s); "
+              f"lost {loss['lost_writes']} writes ({loss['lost_write_bytes'] / (1024 * 1024):.2f} MB), "
+              f"window {loss['lost_write_window_seconds']:.2f}s")
+        return loss
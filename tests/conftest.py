@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scripts are flat modules run from the repository root; the tests use the
+# in-process stand-in so they run without the docker-compose stack.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
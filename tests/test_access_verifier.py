@@ -0,0 +1,29 @@
+import io
+from access_verifier import LatencyHistogram, verify_bucket, verify_objects
+from storage_backend import InMemoryBackend
+
+def test_histogram_percentiles_are_within_a_bucket():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000.0)
+    assert histogram.count == 100 and histogram.max == 0.1
+    for p in (50, 95, 99):
+        assert p / 1000.0 <= histogram.percentile(p) <= p / 1000.0 * LatencyHistogram.GROWTH
+    assert histogram.percentile(100) == 0.1
+    assert abs(histogram.mean() - 0.0505) < 1e-9
+    assert LatencyHistogram().percentile(50) == 0.0
+
+def test_verify_reads_every_object_and_reports_failures():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    for i in range(20):
+        client.put_object("b", f"k{i}", io.BytesIO(b"x" * 1000 * (i + 1)), length=1000 * (i + 1))
+    report = verify_bucket(client, "b", workers=4, buffer_size=4096)
+    assert report.accessible == 20 and report.failed == []
+    assert report.bytes == 1000 * sum(range(1, 21))
+    assert report.ttfb.count == report.full_read.count == 20
+    assert report.ttfb.percentile(50) <= report.full_read.percentile(50)
+
+    report = verify_objects(client, "b", ["k0", "missing"])
+    assert report.accessible == 1
+    assert [name for name, _ in report.failed] == ["missing"]
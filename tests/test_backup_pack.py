@@ -0,0 +1,75 @@
+import os
+import random
+import pytest
+from backup_pack import PackStore, PackWriter, PackEntryReader, read_pack_index
+
+def payload(index, size=200 * 1024):
+    # Half random, half repetitive, so both codecs have something to compress and something not to
+    rng = random.Random(index)
+    return rng.randbytes(size // 2) + bytes([index % 256]) * (size - size // 2)
+
+def blocks(data, size=10000):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_entries_round_trip_through_small_reads(tmp_path, codec):
+    path = str(tmp_path / "test.pack")
+    writer = PackWriter(path, codec)
+    for i in range(3):
+        writer.add(f"obj{i}", blocks(payload(i)), etag=f"etag{i}")
+    writer.close()
+    index = read_pack_index(path)
+    assert sorted(index) == ["obj0", "obj1", "obj2"]
+    assert index["obj1"]["etag"] == "etag1" and index["obj1"]["size"] == len(payload(1))
+    # The repetitive half compresses away
+    assert os.path.getsize(path) < 3 * len(payload(0)) * 0.75
+    with open(path, "rb") as f:
+        for name, entry in index.items():
+            reader = PackEntryReader(f, entry, owns_file=False)
+            parts = []
+            while True:
+                part = reader.read(777)
+                if not part:
+                    break
+                assert len(part) <= 777
+                parts.append(part)
+            assert b"".join(parts) == payload(int(name[-1]))
+
+def test_store_rolls_packs_at_the_size_limit_and_restores_a_subset(tmp_path):
+    root = str(tmp_path)
+    store = PackStore(root, pack_size=450 * 1024)
+    for i in range(6):
+        store.add(f"obj{i}", blocks(payload(i)))
+    store.close()
+    packs = sorted(os.listdir(os.path.join(root, "packs")))
+    # A pack takes objects until it holds at least pack_size bytes: three of 200 KB per 450 KB
+    assert len(packs) == 2
+    assert [len(read_pack_index(os.path.join(root, "packs", pack))) for pack in packs] == [3, 3]
+
+    # A fresh store finds every object through the footer indexes alone
+    store = PackStore(root)
+    assert store.object_names() == [f"obj{i}" for i in range(6)]
+    restored = {}
+    for name, size, reader in store.iter_objects(["obj4", "obj0", "obj3"]):
+        restored[name] = reader.read()
+        assert size == len(restored[name])
+    assert list(restored) == ["obj0", "obj3", "obj4"]
+    assert all(data == payload(int(name[-1])) for name, data in restored.items())
+    with store.open_object("obj5") as reader:
+        assert reader.read(10) == payload(5)[:10]
+
+def test_a_later_backup_becomes_the_latest(tmp_path):
+    root = str(tmp_path)
+    store = PackStore(root, codec="lzma")
+    store.add("old", [b"old data"])
+    store.close()
+    store = PackStore(root, codec="lzma")
+    store.add("new", [b"new data"])
+    store.close()
+    assert PackStore(root).object_names() == ["new"]
+
+def test_other_files_are_not_read_as_packs(tmp_path):
+    path = tmp_path / "not.pack"
+    path.write_bytes(b"x" * 100)
+    with pytest.raises(IOError):
+        read_pack_index(str(path))
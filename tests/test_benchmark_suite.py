@@ -0,0 +1,26 @@
+import json
+from benchmark_suite import Sample, compare_samples, load_baseline, save_baseline, summarize_trials, FAILED_RTO
+
+def test_failed_trials_are_dropped_and_counted():
+    trials = [{"RTO_seconds": 1.0, "wall_seconds": 10.0}, {"RTO_seconds": FAILED_RTO, "wall_seconds": 60.0},
+              None, {"RTO_seconds": 1.2, "wall_seconds": 11.0}]
+    samples, dropped = summarize_trials(trials)
+    assert dropped == 2
+    assert samples["RTO_seconds"].values == [1.0, 1.2]
+    assert samples["wall_seconds"].n == 2
+
+def test_too_few_samples_are_not_compared():
+    baseline = {"RTO_seconds": Sample([1.0, 1.1, 0.9]), "wall_seconds": Sample([10.0, 10.5, 9.5])}
+    candidate = {"RTO_seconds": Sample([5.0, 5.1]), "wall_seconds": Sample([20.0, 20.5, 19.5])}
+    rows = compare_samples(baseline, candidate, min_samples=3)
+    assert [row["measurement"] for row in rows] == ["wall_seconds"]
+    assert rows[0]["verdict"] == "regression"
+
+def test_old_baselines_lose_the_rto_sentinel(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    save_baseline(path, {"geo": {"RTO_seconds": Sample([1.0, FAILED_RTO, 1.2])}}, "old", {"geo": 0})
+    label, baseline = load_baseline(path)
+    assert label == "old"
+    assert baseline["geo"]["RTO_seconds"].values == [1.0, 1.2]
+    with open(path) as f:
+        assert json.load(f)["dropped_trials"] == {"geo": 0}
@@ -0,0 +1,67 @@
+import io
+import random
+import bulk_ops
+from bulk_ops import delete_objects, list_bucket, listing_cache, upload_directory
+from integrity_manifest import IntegrityManifest
+from storage_backend import InMemoryBackend
+
+def test_upload_directory_records_manifest_and_refreshes_listing(tmp_path):
+    for i, size in enumerate((10, 200, 3000)):
+        (tmp_path / f"file_{i}.txt").write_bytes(b"x" * size)
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    assert listing_cache.get(client, "b") == []
+    manifest = IntegrityManifest()
+    files, size = upload_directory(client, "b", str(tmp_path), manifest)
+    assert (files, size) == (3, 3210)
+    assert sorted(manifest.entries) == ["file_0.txt", "file_1.txt", "file_2.txt"]
+    assert len(listing_cache.get(client, "b")) == 3
+    assert len(list_bucket(client, "b")) == 3
+
+def make_bucket(names):
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    for name in names:
+        client.put_object("b", name, io.BytesIO(b""), length=0)
+    return client
+
+def list_with_shards(monkeypatch, client, **kwargs):
+    shards = []
+    list_shard = bulk_ops._list_shard
+
+    def recording(*args):
+        objects, children = list_shard(*args)
+        shards.append(len(objects))
+        return objects, children
+
+    monkeypatch.setattr(bulk_ops, "_list_shard", recording)
+    return list_bucket(client, "b", **kwargs), shards
+
+def test_sequential_names_split_into_balanced_shards(monkeypatch):
+    names = [f"file_{i}.txt" for i in range(1, 5001)]
+    objects, shards = list_with_shards(monkeypatch, make_bucket(names), split_after=1000)
+    assert [obj.object_name for obj in objects] == sorted(names)
+    # Every shard that filled up split, and each split left at most one empty range (the
+    # gap right after the last key it saw) instead of one per letter of the alphabet
+    assert max(shards) <= 1000
+    assert sum(count == 0 for count in shards) <= sum(count == 1000 for count in shards)
+    assert sum(0 < count < 1000 for count in shards) >= 8
+
+def test_random_names_split_into_balanced_shards(monkeypatch):
+    rng = random.Random(7)
+    names = ["%032x" % rng.getrandbits(128) for _ in range(5000)]
+    objects, shards = list_with_shards(monkeypatch, make_bucket(names), split_after=500)
+    assert [obj.object_name for obj in objects] == sorted(names)
+    assert max(shards) <= 500
+    assert sum(count == 0 for count in shards) <= len(shards) // 4
+
+def test_split_stays_under_the_listing_prefix(monkeypatch):
+    names = [f"a/{i:04d}" for i in range(300)] + [f"b/{i:04d}" for i in range(300)]
+    objects, shards = list_with_shards(monkeypatch, make_bucket(names), prefix="a/", split_after=100)
+    assert [obj.object_name for obj in objects] == names[:300]
+    assert max(shards) <= 100
+
+def test_delete_objects_removes_in_batches():
+    client = make_bucket([f"k{i:03d}" for i in range(250)])
+    assert delete_objects(client, "b", [f"k{i:03d}" for i in range(200)], batch_size=64) == 200
+    assert [obj.object_name for obj in list_bucket(client, "b")] == [f"k{i:03d}" for i in range(200, 250)]
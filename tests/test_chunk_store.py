@@ -0,0 +1,43 @@
+import random
+from chunk_store import ChunkStore, iter_chunks, MIN_CHUNK_SIZE, MAX_CHUNK_SIZE
+
+def random_bytes(size, seed):
+    return random.Random(seed).randbytes(size)
+
+def blocks(data, size=10000):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_chunks_respect_bounds_and_survive_an_insertion():
+    data = random_bytes(2 * 1024 * 1024, 1)
+    chunks = list(iter_chunks(blocks(data)))
+    assert b"".join(chunks) == data
+    assert all(MIN_CHUNK_SIZE <= len(chunk) <= MAX_CHUNK_SIZE for chunk in chunks[:-1])
+    # A few inserted bytes only change the chunks around them, not every later boundary
+    shifted = list(iter_chunks(blocks(data[:100000] + b"inserted" + data[100000:])))
+    assert len(set(chunks) & set(shifted)) >= len(chunks) - 3
+
+def test_second_backup_stores_only_new_chunks_and_reads_back(tmp_path):
+    root = str(tmp_path)
+    original = random_bytes(1024 * 1024, 2)
+    store = ChunkStore(root)
+    store.add("a", blocks(original), etag="etag-a")
+    store.add("b", blocks(random_bytes(300000, 3)), etag="etag-b")
+    store.close()
+    first_bytes = store.new_bytes
+
+    store = ChunkStore(root)
+    edited = original[:500000] + b"edit" + original[500000:]
+    store.add("a", blocks(edited), etag="etag-a2")
+    # Unchanged objects are carried over by ETag without reading them
+    assert store.reuse("b", "etag-b", 300000)
+    assert not store.reuse("b", "other-etag", 300000)
+    store.close()
+    assert store.new_bytes < first_bytes / 4
+    assert store.dedup_bytes > len(edited) / 2
+
+    store = ChunkStore(root)
+    assert store.object_names() == ["a", "b"]
+    with store.open_object("a") as reader:
+        assert reader.read(100) == edited[:100]
+        assert reader.read() == edited[100:]
+    assert store.object_size("b") == 300000
@@ -0,0 +1,79 @@
+import os
+import random
+import threading
+import pytest
+import dataset_generator
+from dataset_generator import generate_dataset, sample_size_kb
+
+def dataset_files(directory):
+    return {name: open(os.path.join(directory, name), "rb").read() for name in sorted(os.listdir(directory))}
+
+def test_same_seed_gives_the_same_dataset_and_reuses_the_cache(tmp_path):
+    kwargs = dict(num_files=5, min_kb=1, max_kb=64, seed=7, profile="mixed")
+    first = generate_dataset(cache_dir=str(tmp_path / "a"), **kwargs)
+    again = generate_dataset(cache_dir=str(tmp_path / "b"), **kwargs)
+    assert dataset_files(first) == dataset_files(again)
+    assert sorted(dataset_files(first)) == [f"file_{i}.txt" for i in range(1, 6)]
+    assert all(1024 <= len(data) <= 64 * 1024 and len(data) % 1024 == 0 for data in dataset_files(first).values())
+
+    os.remove(os.path.join(first, "file_1.txt"))
+    # A cache hit does not regenerate anything
+    assert generate_dataset(cache_dir=str(tmp_path / "a"), **kwargs) == first
+    assert not os.path.exists(os.path.join(first, "file_1.txt"))
+    assert generate_dataset(cache_dir=str(tmp_path / "a"), use_cache=False, **kwargs) == first
+    assert os.path.exists(os.path.join(first, "file_1.txt"))
+
+def test_other_parameters_get_their_own_cache_entry(tmp_path):
+    cache_dir = str(tmp_path)
+    a = generate_dataset(num_files=3, min_kb=1, max_kb=4, seed=1, cache_dir=cache_dir)
+    b = generate_dataset(num_files=3, min_kb=1, max_kb=4, seed=2, cache_dir=cache_dir)
+    c = generate_dataset(num_files=3, min_kb=1, max_kb=4, seed=1, profile="random", cache_dir=cache_dir)
+    assert len({a, b, c}) == 3
+    assert all(os.path.exists(f"{path}.json") for path in (a, b, c))
+
+def test_concurrent_calls_for_one_dataset_share_the_cache_entry(tmp_path, capsys):
+    kwargs = dict(num_files=20, min_kb=1, max_kb=256, seed=3, profile="random", cache_dir=str(tmp_path))
+    results, errors = [], []
+
+    def generate():
+        try:
+            results.append(generate_dataset(**kwargs))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=generate) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and len(set(results)) == 1
+    assert len(dataset_files(results[0])) == 20
+    assert capsys.readouterr().out.count("Generating") == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(results[0]), os.path.basename(results[0]) + ".json"])
+
+def test_an_entry_published_meanwhile_is_kept(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    key = dataset_generator.dataset_key(num_files=3, min_kb=1, max_kb=4, seed=1, distribution="uniform",
+                                        profile="repetitive", size_buckets=None)
+    published = os.path.join(cache_dir, key)
+    write_file = dataset_generator.write_file
+
+    def racing_write_file(path, *args, **kwargs):
+        # Another process finishes the same dataset while this one is still writing
+        os.makedirs(published, exist_ok=True)
+        open(os.path.join(published, "in-use"), "w").close()
+        write_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(dataset_generator, "write_file", racing_write_file)
+    assert generate_dataset(num_files=3, min_kb=1, max_kb=4, seed=1, cache_dir=cache_dir) == published
+    assert os.listdir(published) == ["in-use"]
+    assert os.listdir(cache_dir) == [key]
+
+def test_size_distributions_stay_in_range():
+    rng = random.Random(0)
+    for distribution in ("uniform", "lognormal", "buckets"):
+        sizes = [sample_size_kb(rng, 10, 1000, distribution) for _ in range(500)]
+        assert min(sizes) >= 10 and max(sizes) <= 1000
+    assert set(sample_size_kb(rng, 10, 1000, "buckets", [(1, 1), (5, 3)]) for _ in range(200)) == {1, 5}
+    with pytest.raises(ValueError):
+        sample_size_kb(rng, 10, 1000, "pareto")
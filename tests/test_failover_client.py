@@ -0,0 +1,91 @@
+import io
+import time
+import pytest
+from failover_client import CircuitBreaker, FailoverClient
+from storage_backend import InMemoryBackend
+
+def make_regions():
+    regions = []
+    for name in ("primary", "secondary"):
+        client = InMemoryBackend(name)
+        client.make_bucket("b")
+        client.put_object("b", "k", io.BytesIO(name.encode()), length=len(name))
+        regions.append((name, client))
+    return regions
+
+def test_breaker_opens_then_closes_after_a_successful_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    # Only one probe at a time once half-open
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert [state for _, state in breaker.transitions] == ["open", "half-open", "open", "half-open", "closed"]
+
+def test_reads_fail_over_and_back_when_the_primary_returns():
+    regions = make_regions()
+    client = FailoverClient(regions, failure_threshold=2, reset_timeout=0.05)
+    try:
+        assert client.get_object_bytes("b", "k") == b"primary"
+        regions[0][1].online = False
+        outage = time.monotonic()
+        assert [client.get_object_bytes("b", "k") for _ in range(5)] == [b"secondary"] * 5
+        # Once the breaker opens the primary is no longer tried at all
+        assert client.regions[0].errors == 2
+        assert client.observed_rto(outage) is not None and client.errors_since(outage) == 0
+        regions[0][1].online = True
+        time.sleep(0.06)
+        assert client.get_object_bytes("b", "k") == b"primary"
+        assert client.served_by() == {"primary": 2, "secondary": 5}
+    finally:
+        client.close()
+
+def test_a_region_ready_to_probe_is_not_shut_out_by_reads_it_never_served():
+    regions = make_regions()
+    client = FailoverClient(regions, failure_threshold=1, reset_timeout=0.05)
+    try:
+        client.regions[1].breaker.record_failure()
+        time.sleep(0.06)
+        # The primary answers every read, so the secondary's probe is never sent
+        assert [client.get_object_bytes("b", "k") for _ in range(3)] == [b"primary"] * 3
+        assert client.regions[1].breaker.state == "open"
+        regions[0][1].online = False
+        assert client.get_object_bytes("b", "k") == b"secondary"
+        assert client.regions[1].breaker.state == "closed"
+    finally:
+        client.close()
+
+def test_hung_primary_is_hedged_to_the_secondary():
+    regions = make_regions()
+    client = FailoverClient(regions, failure_threshold=1)
+    regions[0][1].pause()
+    try:
+        started = time.monotonic()
+        assert client.get_object_bytes("b", "k") == b"secondary"
+        assert time.monotonic() - started < 1
+        assert client.hedged == 1 and client.hedge_wins == 1
+        # The read still hanging on the primary trips its breaker
+        assert client.regions[0].breaker.state == "open"
+    finally:
+        regions[0][1].resume()
+        client.close()
+
+def test_read_fails_when_every_region_is_down():
+    regions = make_regions()
+    client = FailoverClient(regions)
+    for _, region_client in regions:
+        region_client.online = False
+    try:
+        with pytest.raises(ConnectionError):
+            client.get_object_bytes("b", "k")
+        assert client.failed == 1 and client.served_by() == {"failed": 1}
+    finally:
+        client.close()
@@ -0,0 +1,87 @@
+import http.server
+import threading
+import time
+import pytest
+import fault_injection
+from fault_injection import ContainerFault, FaultInjector, FaultInjectionError, MemoryFault, make_fault
+from storage_backend import InMemoryBackend
+
+class BrokenFault:
+    def __init__(self):
+        self.recovered = False
+
+    def describe(self):
+        return "broken"
+
+    def inject(self):
+        raise RuntimeError("docker daemon not reachable")
+
+    def recover(self):
+        self.recovered = True
+
+def test_memory_fault_takes_the_backend_offline_and_back():
+    backend = InMemoryBackend()
+    injector = FaultInjector()
+    event = injector.inject(MemoryFault(backend, "stop"))
+    assert not backend.online
+    assert event.error is None and event.effective_at >= event.started_at
+    injector.recover(event)
+    assert backend.online
+    assert injector.events == [event]
+
+def test_failed_injection_raises_and_is_logged():
+    injector = FaultInjector()
+    fault = BrokenFault()
+    with pytest.raises(FaultInjectionError) as error:
+        injector.inject(fault)
+    assert error.value.event.error == "docker daemon not reachable"
+    assert injector.events == [error.value.event]
+    # A partially applied fault is undone before the error surfaces
+    assert fault.recovered
+
+def test_scheduled_failure_does_not_recover_or_crash_the_thread():
+    injector = FaultInjector()
+    injector.schedule(BrokenFault(), delay=0, duration=0)
+    injector.join(timeout=5)
+    assert len(injector.events) == 1
+    assert injector.events[0].error is not None
+    assert injector.events[0].recovered_at is None
+
+class LivenessHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/minio/health/live" else 404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_graceful_stop_takes_effect_when_the_endpoint_goes_silent(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), LivenessHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"127.0.0.1:{server.server_address[1]}"
+    commands = []
+
+    def docker(*args):
+        # The server stops answering soon after SIGTERM; docker stop returns once it has exited
+        commands.append(args)
+        time.sleep(0.1)
+        server.shutdown()
+        server.server_close()
+        time.sleep(0.5)
+        return ""
+
+    monkeypatch.setattr(fault_injection, "docker", docker)
+    event = FaultInjector().inject(ContainerFault("minio-region1", "stop", endpoint=endpoint))
+    assert commands == [("stop", "-t", "10", "minio-region1")]
+    assert 0.05 <= event.effective_at - event.started_at < 0.4
+    assert abs((time.time() - event.wall_at) - (time.monotonic() - event.effective_at)) < 0.05
+    assert make_fault("stop", container="minio-region1").endpoint == "localhost:9001"
+
+def test_a_failed_graceful_stop_still_raises(monkeypatch):
+    def docker(*args):
+        raise RuntimeError("No such container")
+
+    monkeypatch.setattr(fault_injection, "docker", docker)
+    monkeypatch.setattr(fault_injection, "endpoint_answers", lambda endpoint: True)
+    with pytest.raises(FaultInjectionError):
+        FaultInjector().inject(ContainerFault("minio-region1", "stop", endpoint="localhost:9001"))
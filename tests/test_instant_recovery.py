@@ -0,0 +1,61 @@
+import io
+import pytest
+from chunk_store import ChunkStore
+from instant_recovery import AccessCounter, RecoveryReader, primary_share_seconds, restore_order
+from storage_backend import InMemoryBackend
+
+def test_restore_order_by_access_size_or_explicit_list(tmp_path):
+    names = ["a", "b", "c", "d"]
+    sizes = {"a": 40, "b": 10, "c": 30, "d": 20}
+    counts = {"c": 5, "a": 2}
+    assert restore_order(names, sizes, counts) == ["c", "a", "b", "d"]
+    assert restore_order(names, sizes, counts, priority="size") == ["b", "d", "c", "a"]
+    # Listed names first (unknown ones ignored), the rest by access
+    assert restore_order(names, sizes, counts, priority=["d", "zz", "b"]) == ["d", "b", "c", "a"]
+    priority_file = tmp_path / "priority.txt"
+    priority_file.write_text("b\n\na\n")
+    assert restore_order(names, sizes, counts, priority=str(priority_file)) == ["b", "a", "c", "d"]
+
+def test_access_counts_survive_a_save_and_load(tmp_path):
+    path = str(tmp_path / "stats" / "bucket.json")
+    counter = AccessCounter()
+    for name in ("a", "b", "a"):
+        counter.record(name)
+    counter.save(path)
+    assert AccessCounter.load(path).counts == {"a": 2, "b": 1}
+    assert AccessCounter.load(str(tmp_path / "missing.json")).counts == {}
+
+def test_lost_objects_are_served_from_the_backup_until_restored(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    store.add("lost", [b"from backup"])
+    store.close()
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    client.put_object("b", "kept", io.BytesIO(b"from primary"), length=12)
+    misses = []
+    counter = AccessCounter()
+    reader = RecoveryReader(client, "b", store, on_miss=misses.append, counter=counter)
+    assert reader.read("kept") == ("primary", b"from primary")
+    assert reader.read("lost") == ("backup", b"from backup")
+    assert misses == ["lost"]
+    with pytest.raises(Exception):
+        reader.read("in neither")
+    client.put_object("b", "lost", io.BytesIO(b"restored"), length=8)
+    assert reader.read("lost") == ("primary", b"restored")
+    assert (reader.primary_reads, reader.backup_reads, reader.failed_reads) == (2, 1, 1)
+    assert counter.counts == {"kept": 1, "lost": 2, "in neither": 1}
+
+    # Only a missing key falls back; an unreachable primary is a real failure
+    client.online = False
+    with pytest.raises(ConnectionError):
+        reader.read("lost")
+
+def test_primary_share_counts_only_recoverable_traffic():
+    names = ["hot", "warm", "cold", "gone"]
+    counts = {"hot": 300, "warm": 1, "cold": 0, "gone": 50}
+    completed_at = {"warm": 12.0, "hot": 11.0}
+    # "gone" was never restored so it does not count; 99% is reached once "hot" is back
+    assert primary_share_seconds(names, ["hot", "warm", "gone"], completed_at, counts, since=10.0) == 1.0
+    assert primary_share_seconds(names, [], {}, counts, since=10.0) == 0.0
+    # A hot object the backup never had does not hold the milestone back
+    assert primary_share_seconds(names, ["hot"], {}, counts, since=10.0) == 0.0
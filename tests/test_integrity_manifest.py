@@ -0,0 +1,57 @@
+import io
+from integrity_manifest import IntegrityManifest, verify_region, verify_store, hash_stream
+from storage_backend import InMemoryBackend, StorageError
+
+def make_region(objects):
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    manifest = IntegrityManifest()
+    for name, data in objects.items():
+        result = client.put_object("b", name, io.BytesIO(data), length=len(data))
+        manifest.record(name, len(data), hash_stream(io.BytesIO(data))[1], result.etag)
+    return client, manifest
+
+def test_full_verification_classifies_each_copy():
+    client, manifest = make_region({"a": b"alpha", "b": b"beta", "c": b"gamma"})
+    client.put_object("b", "b", io.BytesIO(b"BETA"), length=4)
+    client.remove_object("b", "c")
+    report = verify_region(client, "b", manifest)
+    assert report.intact == 1
+    assert report.corrupt == ["b"]
+    assert report.missing == ["c"]
+    assert report.errors == []
+
+def test_read_errors_are_not_counted_as_missing():
+    client, manifest = make_region({"a": b"alpha", "b": b"beta"})
+    get_object = client.get_object
+
+    def flaky_get(bucket_name, object_name, *args, **kwargs):
+        if object_name == "b":
+            raise StorageError("SlowDown", "Please reduce your request rate", bucket_name, object_name)
+        return get_object(bucket_name, object_name, *args, **kwargs)
+
+    client.get_object = flaky_get
+    report = verify_region(client, "b", manifest)
+    assert report.intact == 1
+    assert report.missing == []
+    assert [name for name, _ in report.errors] == ["b"]
+    assert report.metrics()["error_objects"] == 1
+
+def test_a_missing_bucket_means_every_object_is_missing():
+    _, manifest = make_region({"a": b"alpha"})
+    empty = InMemoryBackend()
+    report = verify_region(empty, "b", manifest)
+    assert report.missing == ["a"] and report.errors == []
+
+def test_store_read_failures_are_errors():
+    _, manifest = make_region({"a": b"alpha"})
+
+    class BrokenStore:
+        def object_names(self):
+            return ["a"]
+
+        def open_object(self, name):
+            raise OSError("checksum mismatch in pack")
+
+    report = verify_store(BrokenStore(), manifest)
+    assert report.missing == [] and len(report.errors) == 1
@@ -0,0 +1,79 @@
+import io
+import os
+import threading
+from multipart_transfer import multipart_copy, multipart_download, finish_download, MIN_PART_SIZE
+from storage_backend import InMemoryBackend
+
+SIZE = 2 * MIN_PART_SIZE + 12345
+
+def make_source():
+    source = InMemoryBackend("source:9000")
+    source.make_bucket("b")
+    data = os.urandom(SIZE)
+    result = source.put_object("b", "big", io.BytesIO(data), length=SIZE)
+    return source, data, result.etag
+
+def read(client):
+    response = client.get_object("b", "big")
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+def test_concurrent_copies_to_two_regions_keep_separate_checkpoints(tmp_path):
+    source, data, etag = make_source()
+    targets = [InMemoryBackend("r2:9000"), InMemoryBackend("r3:9000")]
+    errors = []
+
+    def copy(target):
+        target.make_bucket("b")
+        try:
+            multipart_copy(source, target, "b", "big", SIZE, etag, workers=2, checkpoint_dir=str(tmp_path))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=copy, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert all(read(target) == data for target in targets)
+    assert os.listdir(tmp_path) == []
+
+def test_an_interrupted_copy_resumes_after_a_copy_to_another_region(tmp_path):
+    source, data, etag = make_source()
+    r2, r3 = InMemoryBackend("r2:9000"), InMemoryBackend("r3:9000")
+    for target in (r2, r3):
+        target.make_bucket("b")
+    upload_part = r2._upload_part
+    uploaded = []
+    down = [True]
+
+    def failing_upload_part(bucket_name, object_name, data, headers, upload_id, part_number):
+        if part_number > 1 and down[0]:
+            raise ConnectionError("r2 went away")
+        uploaded.append(part_number)
+        return upload_part(bucket_name, object_name, data, headers, upload_id, part_number)
+
+    r2._upload_part = failing_upload_part
+    try:
+        multipart_copy(source, r2, "b", "big", SIZE, etag, workers=1, retries=0, checkpoint_dir=str(tmp_path))
+    except ConnectionError:
+        pass
+    assert uploaded == [1]
+    down[0] = False
+    multipart_copy(source, r3, "b", "big", SIZE, etag, workers=2, checkpoint_dir=str(tmp_path))
+    # r2's checkpoint survived the copy to r3, so only its missing parts are sent
+    multipart_copy(source, r2, "b", "big", SIZE, etag, workers=1, checkpoint_dir=str(tmp_path))
+    assert uploaded == [1, 2, 3]
+    assert read(r2) == data and read(r3) == data
+
+def test_download_spools_the_object(tmp_path):
+    source, data, etag = make_source()
+    spool_path = multipart_download(source, "b", "big", SIZE, etag, workers=3, checkpoint_dir=str(tmp_path))
+    with open(spool_path, "rb") as f:
+        assert f.read() == data
+    finish_download(spool_path)
+    assert os.listdir(tmp_path) == []
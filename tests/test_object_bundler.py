@@ -0,0 +1,22 @@
+import io
+from object_bundler import fetch_bundle, plan_bundles, put_bundle
+from storage_backend import InMemoryBackend, StoredObject
+
+def test_small_objects_are_bundled_and_large_ones_sent_alone():
+    objects = [StoredObject("b", f"small{i}", size=100) for i in range(5)] + [StoredObject("b", "large", size=10_000)]
+    bundles, singles = plan_bundles(objects, threshold=1000, bundle_size=250)
+    assert [[obj.object_name for obj in bundle] for bundle in bundles] == \
+        [["small0", "small1"], ["small2", "small3"], ["small4"]]
+    assert [obj.object_name for obj in singles] == ["large"]
+
+def test_bundle_round_trip_through_snowball_upload():
+    source, target = InMemoryBackend(), InMemoryBackend()
+    for client in (source, target):
+        client.make_bucket("b")
+    for i in range(3):
+        data = f"object {i}".encode()
+        source.put_object("b", f"o{i}", io.BytesIO(data), length=len(data))
+    entries = fetch_bundle(source, "b", ["o0", "o1", "o2"])
+    etags = put_bundle(target, "b", entries)
+    assert sorted(etags) == ["o0", "o1", "o2"]
+    assert {obj.object_name: obj.etag for obj in target.list_objects("b", recursive=True)} == etags
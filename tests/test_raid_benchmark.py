@@ -0,0 +1,30 @@
+import raid_benchmark
+from raid_benchmark import HEAL_MARKER, heal_bucket, rewritten_bytes, run_raid_benchmark
+from results_store import ResultsStore
+
+def test_stand_in_records_the_healthy_reads_only(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metrics = run_raid_benchmark(num_files=5, min_kb=1, max_kb=4, bucket_name="raid-test")
+    assert metrics["baseline_access_time_seconds"] > 0 and metrics["healthy_mb_per_second"] > 0
+    assert "RTO_seconds" not in metrics and "heal_seconds" not in metrics
+    rows = ResultsStore(str(tmp_path / "results.db")).query("SELECT scenario_type, scenario_name FROM runs")
+    assert rows == [{"scenario_type": "raid", "scenario_name": "Erasure Set Drive Failure (1 drive(s), remove)"}]
+
+def test_rewritten_bytes_sums_the_files_newer_than_the_heal_marker(monkeypatch):
+    calls = []
+
+    def docker(*args):
+        calls.append(args)
+        return "4096\n1024\n\n" if args[-1].startswith("find") else ""
+
+    monkeypatch.setattr(raid_benchmark, "docker", docker)
+    heal_bucket("raid-test")
+    # The marker is touched before the heal starts, so every file the heal writes is newer
+    assert calls[1] == ("exec", raid_benchmark.RAID_CONTAINER, "touch", HEAL_MARKER)
+    assert calls[2][2:4] == ("mc", "admin")
+    assert rewritten_bytes("/data1") == 5120
+    command = calls[-1][-1]
+    assert f"-newer {HEAL_MARKER}" in command
+    assert "-path /data1/.minio.sys" in command and "-path /data1/.removed" in command
+    monkeypatch.setattr(raid_benchmark, "docker", lambda *args: "")
+    assert rewritten_bytes("/data2") == 0
@@ -0,0 +1,59 @@
+import io
+import threading
+import time
+from readiness_tracker import ReadinessTracker
+from storage_backend import InMemoryBackend
+
+def put(client, name):
+    client.put_object("b", name, io.BytesIO(b"data"), length=4)
+
+def test_objects_arriving_late_are_timed_and_probed_until_readable():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    names = [f"file_{i}.txt" for i in range(10)]
+    for name in names[:5]:
+        put(client, name)
+
+    def arrive_late():
+        time.sleep(0.2)
+        for name in names[5:]:
+            put(client, name)
+
+    writer = threading.Thread(target=arrive_late)
+    writer.start()
+    tracker = ReadinessTracker(client, "b", expected_names=names, min_interval=0.01, max_interval=0.05)
+    rto = tracker.wait_until_ready(timeout=5)
+    writer.join()
+    assert rto is not None and rto >= 0.2
+    assert sorted(tracker.available_at) == names
+    assert all(tracker.available_at[name] < 0.2 for name in names[:5])
+    assert all(tracker.available_at[name] >= 0.2 for name in names[5:])
+    # Objects already read are never probed again
+    assert tracker.report.accessible == 10
+    assert tracker.availability_curve()[-1][1] == 10
+
+def test_missing_objects_time_out_instead_of_hanging():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    put(client, "there")
+    tracker = ReadinessTracker(client, "b", expected_names=["there", "never"], min_interval=0.01)
+    started = time.monotonic()
+    assert tracker.wait_until_ready(timeout=0.3) is None
+    assert time.monotonic() - started < 2
+    assert list(tracker.available_at) == ["there"] and tracker.pending == {"never"}
+
+def test_names_are_discovered_from_the_listing_when_only_a_count_is_known():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    for i in range(3):
+        put(client, f"k{i}")
+    tracker = ReadinessTracker(client, "b", expected_count=3)
+    assert tracker.wait_until_ready(timeout=5) is not None
+    assert sorted(tracker.available_at) == ["k0", "k1", "k2"]
+
+def test_rto_is_measured_from_the_fault():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    put(client, "k")
+    tracker = ReadinessTracker(client, "b", expected_names=["k"])
+    assert tracker.wait_until_ready(timeout=5, since=time.monotonic() - 1.0) >= 1.0
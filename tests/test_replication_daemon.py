@@ -0,0 +1,97 @@
+import io
+import time
+import replication_daemon
+from replication_daemon import ReplicationDaemon
+from storage_backend import InMemoryBackend
+
+class FlakyBackend(InMemoryBackend):
+    """Stand-in whose writes fail while broken is set."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.broken = False
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        if self.broken:
+            raise ConnectionError("target unavailable")
+        return super().put_object(bucket_name, object_name, data, length, **kwargs)
+
+def _put(client, bucket_name, object_name, data):
+    return client.put_object(bucket_name, object_name, io.BytesIO(data), length=len(data))
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_write_that_used_up_its_retries_is_retried(monkeypatch):
+    monkeypatch.setattr(replication_daemon, "RETRY_BACKOFF_SECONDS", 0.001)
+    source, target = InMemoryBackend("source"), FlakyBackend("target")
+    source.make_bucket("b")
+    target.make_bucket("b")
+    _put(source, "b", "k", b"v1")
+    target.broken = True
+    daemon = ReplicationDaemon(source, target, "b", source="poll", poll_interval=0.02, retries=1,
+                               redispatch_delay=0.02).start()
+    try:
+        assert _wait_for(lambda: daemon.failed)
+        assert daemon.lag()["backlog_objects"] == 1
+        target.broken = False
+        assert daemon.wait_until_caught_up(timeout=5.0)
+        assert target.get_object("b", "k").read() == b"v1"
+    finally:
+        daemon.stop()
+
+def test_newer_write_after_a_failure_is_dispatched(monkeypatch):
+    monkeypatch.setattr(replication_daemon, "RETRY_BACKOFF_SECONDS", 0.001)
+    source, target = InMemoryBackend("source"), FlakyBackend("target")
+    source.make_bucket("b")
+    target.make_bucket("b")
+    target.broken = True
+    daemon = ReplicationDaemon(source, target, "b", source="poll", poll_interval=0.02, retries=0,
+                               redispatch_delay=60.0).start()
+    try:
+        _put(source, "b", "k", b"v1")
+        assert _wait_for(lambda: daemon.failed)
+        target.broken = False
+        _put(source, "b", "k", b"v2")
+        assert daemon.wait_until_caught_up(timeout=5.0)
+        assert target.get_object("b", "k").read() == b"v2"
+    finally:
+        daemon.stop()
+
+def test_lag_reports_the_unreplicated_backlog():
+    source, target = InMemoryBackend("source"), InMemoryBackend("target")
+    source.make_bucket("b")
+    target.make_bucket("b")
+    daemon = ReplicationDaemon(source, target, "b", source="poll", poll_interval=0.02).start()
+    try:
+        target.pause()
+        for i in range(3):
+            _put(source, "b", f"k{i}", b"x" * 100)
+        assert _wait_for(lambda: daemon.lag()["backlog_objects"] == 3)
+        time.sleep(0.05)
+        lag = daemon.lag()
+        assert lag["lag_seconds"] > 0 and lag["backlog_bytes"] == 300
+        target.resume()
+        assert daemon.wait_until_caught_up(timeout=5.0)
+        assert daemon.lag()["lag_seconds"] == 0.0
+    finally:
+        target.resume()
+        daemon.stop()
+
+def test_writes_since_the_last_poll_count_as_unobserved():
+    source, target = InMemoryBackend("source"), InMemoryBackend("target")
+    source.make_bucket("b")
+    target.make_bucket("b")
+    daemon = ReplicationDaemon(source, target, "b", source="poll", poll_interval=60.0).start()
+    try:
+        time.sleep(0.1)
+        lag = daemon.lag()
+        assert lag["backlog_objects"] == 0 and lag["lag_seconds"] == 0.0
+        assert lag["unobserved_seconds"] >= 0.1
+    finally:
+        daemon.stop()
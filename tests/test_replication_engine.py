@@ -0,0 +1,87 @@
+import io
+import threading
+import replication_engine
+from replication_engine import ByteBudget, replicate_bucket, replicate_graph
+from storage_backend import InMemoryBackend
+
+def make_source(count):
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    for i in range(count):
+        data = f"object {i}".encode() * (i + 1)
+        client.put_object("b", f"file_{i}.txt", io.BytesIO(data), length=len(data))
+    return client
+
+def fail_first_puts(client, failures):
+    """Make each object's first failures PUTs to client raise, as a flaky link would."""
+    attempts = {}
+    put_object = client.put_object
+
+    def flaky(bucket_name, object_name, data, length, **kwargs):
+        attempts[object_name] = attempts.get(object_name, 0) + 1
+        if attempts[object_name] <= failures:
+            raise ConnectionError("connection reset")
+        return put_object(bucket_name, object_name, data, length, **kwargs)
+
+    client.put_object = flaky
+
+def contents(client):
+    return {obj.object_name: client.get_object("b", obj.object_name).read()
+            for obj in client.list_objects("b", recursive=True)}
+
+def test_replicate_bucket_copies_every_object_through_retries(monkeypatch):
+    monkeypatch.setattr(replication_engine, "RETRY_BACKOFF_SECONDS", 0)
+    source = make_source(50)
+    target = InMemoryBackend()
+    fail_first_puts(target, 2)
+    stats = replicate_bucket(source, target, "b", workers=4, retries=2)
+    assert stats.objects == 50 and stats.failed == []
+    assert stats.retries == 100
+    assert stats.bytes == sum(obj.size for obj in source.list_objects("b", recursive=True))
+    assert contents(target) == contents(source)
+
+def test_small_objects_travel_in_bundles():
+    source = make_source(30)
+    target = InMemoryBackend()
+    stats = replicate_bucket(source, target, "b", bundle_threshold=1024, bundle_size=2048)
+    # About 4 KB of objects: creating the bucket plus one PUT per 2 KB bundle, not one per object
+    assert target.requests <= 2 + 4
+    assert stats.objects == 30 and stats.failed == []
+    assert contents(target) == contents(source)
+
+def test_objects_that_keep_failing_are_reported(monkeypatch):
+    monkeypatch.setattr(replication_engine, "RETRY_BACKOFF_SECONDS", 0)
+    source = make_source(10)
+    target = InMemoryBackend()
+    fail_first_puts(target, 2)
+    stats = replicate_bucket(source, target, "b", retries=1)
+    assert stats.objects == 0 and len(stats.failed) == 10
+    assert stats.retries == 10
+
+def test_chain_reaches_every_hop_and_reports_failures_per_target(monkeypatch):
+    monkeypatch.setattr(replication_engine, "RETRY_BACKOFF_SECONDS", 0)
+    clients = {"r1": make_source(20), "r2": InMemoryBackend(), "r3": InMemoryBackend(), "r4": InMemoryBackend()}
+    objects = list(clients["r1"].list_objects("b", recursive=True))
+    fail_first_puts(clients["r4"], 2)
+    stats = replicate_graph(clients, [("r1", "r2"), ("r2", "r3"), ("r1", "r4")], "b", objects, retries=1)
+    for name in ("r2", "r3"):
+        assert stats[name].objects == 20 and stats[name].failed == []
+        assert contents(clients[name]) == contents(clients["r1"])
+    # Each object lands on the second hop only after the first
+    assert all(stats["r3"].completed_at[name] >= stats["r2"].completed_at[name] for name in stats["r3"].completed_at)
+    assert stats["r4"].objects == 0 and len(stats["r4"].failed) == 20
+
+def test_byte_budget_blocks_until_bytes_drain_but_admits_oversized_objects():
+    budget = ByteBudget(100)
+    budget.acquire(80)
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (budget.acquire(50), admitted.set()))
+    waiter.start()
+    assert not admitted.wait(0.1)
+    budget.release(80)
+    assert admitted.wait(1)
+    waiter.join()
+    budget.release(50)
+    # Alone, an object larger than the whole budget still goes through
+    budget.acquire(500)
+    assert budget.in_flight == 500
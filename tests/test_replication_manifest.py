@@ -0,0 +1,59 @@
+import io
+from replication_manifest import load_manifest, replicate_incremental
+from storage_backend import InMemoryBackend
+
+def put(client, name, data):
+    client.put_object("b", name, io.BytesIO(data), length=len(data))
+
+def test_second_run_copies_only_changes_and_propagates_deletes(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    source = InMemoryBackend()
+    target = InMemoryBackend()
+    source.make_bucket("b")
+    for i in range(10):
+        put(source, f"file_{i}.txt", f"version 1 of {i}".encode())
+    assert replicate_incremental(source, target, "b", manifest_path).objects == 10
+    assert sorted(load_manifest(manifest_path, "b")) == [f"file_{i}.txt" for i in range(10)]
+
+    assert replicate_incremental(source, target, "b", manifest_path).objects == 0
+
+    put(source, "file_3.txt", b"version 2 of 3")
+    put(source, "file_new.txt", b"new")
+    source.remove_object("b", "file_7.txt")
+    stats = replicate_incremental(source, target, "b", manifest_path)
+    assert sorted(stats.completed) == ["file_3.txt", "file_new.txt"]
+    assert target.get_object("b", "file_3.txt").read() == b"version 2 of 3"
+    # Without propagation the deleted object stays on the target and in the manifest
+    assert target.stat_object("b", "file_7.txt")
+    assert "file_7.txt" in load_manifest(manifest_path, "b")
+
+    stats = replicate_incremental(source, target, "b", manifest_path, propagate_deletes=True)
+    assert stats.objects == 0
+    assert "file_7.txt" not in {obj.object_name for obj in target.list_objects("b", recursive=True)}
+    assert "file_7.txt" not in load_manifest(manifest_path, "b")
+
+def test_target_side_changes_are_repaired_but_foreign_objects_kept(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    source = InMemoryBackend()
+    target = InMemoryBackend()
+    source.make_bucket("b")
+    put(source, "a.txt", b"original")
+    replicate_incremental(source, target, "b", manifest_path)
+    put(target, "a.txt", b"tampered")
+    put(target, "only-on-target.txt", b"not ours")
+    stats = replicate_incremental(source, target, "b", manifest_path, propagate_deletes=True)
+    assert sorted(stats.completed) == ["a.txt"]
+    assert target.get_object("b", "a.txt").read() == b"original"
+    # Only objects the manifest says we replicated are ever deleted
+    assert target.get_object("b", "only-on-target.txt").read() == b"not ours"
+
+def test_manifests_of_other_buckets_are_kept(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    source = InMemoryBackend()
+    target = InMemoryBackend()
+    for bucket_name in ("b", "c"):
+        source.make_bucket(bucket_name)
+        source.put_object(bucket_name, "x", io.BytesIO(b"x"), length=1)
+        replicate_incremental(source, target, bucket_name, manifest_path)
+    assert list(load_manifest(manifest_path, "b")) == ["x"]
+    assert list(load_manifest(manifest_path, "c")) == ["x"]
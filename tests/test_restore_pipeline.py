@@ -0,0 +1,94 @@
+import os
+import threading
+from backup_pack import PackStore
+from restore_pipeline import BackgroundRestore, parallel_restore
+from storage_backend import InMemoryBackend
+
+def _read(client, bucket_name, object_name):
+    response = client.get_object(bucket_name, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+def _pack_store(root, objects, pack_size=64 * 1024):
+    store = PackStore(str(root), pack_size=pack_size)
+    for name, data in objects.items():
+        store.add(name, [data])
+    store.close()
+    return PackStore(str(root), pack_size=pack_size)
+
+def _objects(count=40):
+    return {f"file_{i}.txt": os.urandom(1024 + 97 * i) for i in range(count)}
+
+def test_full_restore_streams_packs_instead_of_opening_each_object(tmp_path, monkeypatch):
+    objects = _objects()
+    store = _pack_store(tmp_path, objects)
+    opened = []
+    monkeypatch.setattr(store, "open_object", lambda name: opened.append(name))
+    client = InMemoryBackend()
+    client.make_bucket("restore")
+
+    stats = parallel_restore(client, "restore", store, workers=4)
+
+    assert opened == []
+    assert stats.objects == len(objects) and not stats.failed
+    for name, data in objects.items():
+        assert _read(client, "restore", name) == data
+
+def test_bundled_restore_writes_every_object(tmp_path):
+    objects = _objects()
+    store = _pack_store(tmp_path, objects)
+    client = InMemoryBackend()
+    client.make_bucket("restore")
+
+    stats = parallel_restore(client, "restore", store, workers=4, bundle_threshold=8 * 1024, bundle_size=32 * 1024,
+                             max_bytes_buffered=64 * 1024)
+
+    assert stats.objects == len(objects) and not stats.failed
+    for name, data in objects.items():
+        assert _read(client, "restore", name) == data
+
+def test_bundles_larger_than_the_read_ahead_budget_do_not_stall(tmp_path):
+    objects = _objects()
+    store = _pack_store(tmp_path, objects)
+    client = InMemoryBackend()
+    client.make_bucket("restore")
+    result = []
+    restore = threading.Thread(target=lambda: result.append(
+        parallel_restore(client, "restore", store, workers=4, bundle_threshold=10000, bundle_size=10000,
+                         max_bytes_buffered=5000)), daemon=True)
+    restore.start()
+    restore.join(timeout=10)
+
+    assert not restore.is_alive(), "restore waited forever for read-ahead budget"
+    assert result[0].objects == len(objects) and not result[0].failed
+    for name, data in objects.items():
+        assert _read(client, "restore", name) == data
+
+def test_subset_restore_and_large_objects(tmp_path):
+    objects = _objects(10)
+    objects["big.bin"] = os.urandom(300 * 1024)
+    store = _pack_store(tmp_path, objects)
+    client = InMemoryBackend()
+    client.make_bucket("restore")
+
+    stats = parallel_restore(client, "restore", store, object_names=["big.bin", "file_3.txt"],
+                             multipart_threshold=256 * 1024)
+
+    assert sorted(stats.completed) == ["big.bin", "file_3.txt"]
+    assert _read(client, "restore", "big.bin") == objects["big.bin"]
+
+def test_background_restore_runs_promoted_objects_first(tmp_path):
+    objects = _objects(20)
+    store = _pack_store(tmp_path, objects)
+    client = InMemoryBackend()
+    client.make_bucket("restore")
+    restore = BackgroundRestore(client, "restore", store, sorted(objects), workers=1)
+    restore.promote("file_19.txt")
+
+    stats = restore.start().wait()
+
+    assert stats.objects == len(objects)
+    assert min(stats.completed_at, key=stats.completed_at.get) == "file_19.txt"
@@ -0,0 +1,82 @@
+import sqlite3
+import pytest
+import results_store
+from results_store import MIGRATIONS, ResultsStore, compare, summarize
+
+@pytest.fixture
+def opened(monkeypatch):
+    connections = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(results_store.sqlite3, "connect", tracking_connect)
+    return connections
+
+def _closed(conn):
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+def test_every_connection_is_closed(tmp_path, opened):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    run_id = store.record_run("geo", "scenario", {"num_files": 10, "min_kb": 1, "max_kb": 2, "seed": 7},
+                              {"RTO_seconds": 1.5, "RPO_data_restored_percentage": 100.0, "extra": 3.0},
+                              phases=[{"phase": "upload", "wall_seconds": 0.2}])
+    store.tag_runs([run_id], "warmup")
+    rows = store.query("SELECT * FROM runs")
+
+    assert rows[0]["rto_seconds"] == 1.5 and rows[0]["source"] == "warmup"
+    assert store.query("SELECT value FROM metrics WHERE name = 'extra'") == [{"value": 3.0}]
+    assert opened and all(_closed(conn) for conn in opened)
+
+def test_failed_write_rolls_back_and_closes(tmp_path, opened):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    with pytest.raises(sqlite3.Error):
+        store.record_run("geo", "scenario", {}, {"RTO_seconds": 1.0}, phases=[{"phase": None}])
+
+    assert store.query("SELECT COUNT(*) AS runs FROM runs") == [{"runs": 0}]
+    assert all(_closed(conn) for conn in opened)
+
+def test_summary_groups_runs(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    for rto in (1.0, 3.0):
+        store.record_run("geo", "scenario", {"num_files": 10, "min_kb": 1, "max_kb": 2}, {"RTO_seconds": rto})
+    [row] = summarize(store, "geo")
+    assert row["runs"] == 2 and row["mean_rto"] == 2.0
+
+def test_runs_group_by_matrix_name_and_failed_runs_are_not_averaged(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    params = {"num_files": 10, "min_kb": 1, "max_kb": 2}
+    # Live runs share the scenario's fixed title; the matrix entries tell them apart
+    for matrix_name, rtos in (("geo-stop", (1.0, 3.0, -1)), ("geo-pause", (5.0,))):
+        for rto in rtos:
+            metrics = {"RTO_seconds": rto, "RPO_data_restored_percentage": 50.0 if rto == -1 else 100.0}
+            store.record_run("geo", "Geo Failover", params, metrics, matrix_name=matrix_name, source="a")
+    store.record_run("geo", "imported", params, {"RTO_seconds": 2.0}, source="b")
+
+    rows = {row["scenario_name"]: row for row in summarize(store, "geo")}
+    assert sorted(rows) == ["geo-pause", "geo-stop", "imported"]
+    stop = rows["geo-stop"]
+    assert (stop["runs"], stop["failed"], stop["mean_rto"], stop["min_rto"], stop["mean_rpo"]) == (3, 1, 2.0, 1.0, 100.0)
+    assert rows["geo-pause"]["failed"] == 0
+    assert {row["scenario_name"]: row["baseline_rto"] for row in compare(store, "source", "a", "b")} == \
+        {"geo-pause": 5.0, "geo-stop": 2.0, "imported": None}
+
+def test_a_database_from_an_older_schema_is_upgraded(tmp_path):
+    path = str(tmp_path / "results.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("CREATE TABLE schema_version (version INTEGER NOT NULL); INSERT INTO schema_version VALUES (1);"
+                       + MIGRATIONS[0])
+    conn.execute("INSERT INTO runs (created_at, scenario_type, scenario_name, rto_seconds) VALUES (0, 'geo', 'old', 1)")
+    conn.commit()
+    conn.close()
+
+    store = ResultsStore(path)
+    assert store.schema_version() == len(MIGRATIONS)
+    assert store.query("SELECT scenario_name, matrix_name FROM runs") == [{"scenario_name": "old", "matrix_name": None}]
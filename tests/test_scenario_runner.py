@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+import pytest
+from scenario_runner import bucket_for, expand_scenarios, load_matrix, run_matrix
+
+MATRIX = {
+    "defaults": {"geo": {"num_files": 10, "outage_mode": "stop"}},
+    "scenarios": [
+        {"name": "geo-{outage_mode}-{num_files}", "type": "geo", "matrix": {"outage_mode": ["stop", "pause"],
+                                                                           "num_files": [1, 2]}},
+        {"name": "backup small", "type": "backup", "num_files": 3},
+        {"name": "backup large", "type": "backup", "num_files": 300},
+    ],
+}
+
+def test_matrix_expands_over_defaults_and_axes():
+    scenarios = expand_scenarios(MATRIX)
+    # Axes vary in sorted key order, the last one fastest
+    assert [s["name"] for s in scenarios] == ["geo-stop-1", "geo-pause-1", "geo-stop-2", "geo-pause-2",
+                                              "backup small", "backup large"]
+    assert scenarios[1]["params"] == {"num_files": 1, "outage_mode": "pause"}
+    assert [s["exclusive"] for s in scenarios] == [True] * 4 + [False] * 2
+    with pytest.raises(ValueError):
+        expand_scenarios({"scenarios": [{"name": "same", "type": "geo", "matrix": {"num_files": [1, 2]}}]})
+
+def test_shipped_matrix_expands():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios.json")
+    names = [s["name"] for s in expand_scenarios(load_matrix(path))]
+    assert names and len({bucket_for(name) for name in names}) == len(names)
+
+def test_bucket_names_are_valid_s3_names():
+    assert bucket_for("Geo: stop / 10 files") == "rpo-geo-stop-10-files"
+    assert len(bucket_for("x" * 100)) == 63
+
+def test_exclusive_scenarios_never_overlap_and_failures_are_reported():
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def runner(kind):
+        def run(bucket_name, num_files, matrix_name, **params):
+            with lock:
+                if running and (kind == "geo" or "geo" in running):
+                    overlaps.append((kind, list(running)))
+                running.append(kind)
+            time.sleep(0.02)
+            with lock:
+                running.remove(kind)
+            if num_files == 300:
+                raise RuntimeError("disk full")
+            return {"RTO_seconds": 1.0, "RPO_data_restored_percentage": 100.0, "bucket": bucket_name,
+                    "matrix_name": matrix_name}
+        return run
+
+    results = run_matrix(MATRIX, runners={"geo": runner("geo"), "backup": runner("backup")})
+    assert overlaps == []
+    status = {r["name"]: r["status"] for r in results}
+    assert status["backup large"] == "failed: disk full"
+    assert all(s == "ok" for name, s in status.items() if name != "backup large")
+    assert {r["name"]: r["metrics"].get("bucket") for r in results}["geo-pause-2"] == "rpo-geo-pause-2"
+    assert all(r["metrics"]["matrix_name"] == r["name"] for r in results if r["status"] == "ok")
+
+    only = run_matrix(MATRIX, only=["backup small"], runners={"backup": runner("backup")},
+                      overrides={"num_files": 1})
+    assert [r["name"] for r in only] == ["backup small"]
+    with pytest.raises(ValueError):
+        run_matrix(MATRIX, only=["nope"], runners={})
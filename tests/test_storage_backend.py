@@ -0,0 +1,30 @@
+import io
+import pytest
+from storage_backend import InMemoryBackend, StorageBackend, StorageError
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+    class Partial(StorageBackend):
+        def bucket_exists(self, bucket_name):
+            return False
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_standin_implements_the_interface():
+    client = InMemoryBackend()
+    assert isinstance(client, StorageBackend)
+    client.make_bucket("b")
+    client.put_object("b", "k", io.BytesIO(b"data"), length=4)
+    assert client.stat_object("b", "k").size == 4
+    assert [obj.object_name for obj in client.list_objects("b")] == ["k"]
+    with pytest.raises(StorageError) as error:
+        client.get_object("b", "missing")
+    assert error.value.code == "NoSuchKey"
+
+def test_minio_clients_count_as_storage_backends():
+    pytest.importorskip("minio")
+    from storage_backend import make_minio_client
+    assert isinstance(make_minio_client("localhost:9001"), StorageBackend)
@@ -0,0 +1,50 @@
+import pytest
+import topology_benchmark
+from fault_injection import FaultInjector, MemoryFault
+from storage_backend import InMemoryBackend
+from topology import Topology, QuorumWriter, load_topology
+
+def test_missing_default_file_is_the_two_region_stack(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    topology = load_topology()
+    assert [region.endpoint for region in topology.regions] == ["localhost:9001", "localhost:9002"]
+    assert topology.primary.container == "minio-region1"
+    assert [region.name for region in topology.failover_order()] == ["region2"]
+
+def test_ports_skip_the_raid_service_and_edges_follow_the_fanout():
+    topology = Topology.from_dict({"regions": 4, "fanout": "chain"})
+    assert [region.api_port for region in topology.regions] == [9001, 9002, 9004, 9005]
+    assert topology.edges() == [("region1", "region2"), ("region2", "region3"), ("region3", "region4")]
+    star = topology.subset(3, fanout="star")
+    assert star.edges() == [("region1", "region2"), ("region1", "region3")]
+    with pytest.raises(ValueError):
+        topology.subset(5)
+
+def test_quorum_write_is_acknowledged_without_the_offline_region(tmp_path):
+    path = tmp_path / "object"
+    path.write_bytes(b"x" * 100)
+    clients = {name: InMemoryBackend() for name in ("a", "b", "c")}
+    for client in clients.values():
+        client.make_bucket("bucket")
+    event = FaultInjector().inject(MemoryFault(clients["c"], "stop"))
+    writer = QuorumWriter(clients, write_quorum=2)
+    writer.put_file("bucket", "object", str(path))
+    writer.drain()
+    assert set(writer.landed_at["a"]) == set(writer.landed_at["b"]) == {"object"}
+    assert writer.landed_at["c"] == {} and [name for name, _, _ in writer.failed] == ["c"]
+
+    # Two regions down leave the quorum out of reach
+    FaultInjector().inject(MemoryFault(clients["b"], "stop"))
+    writer = QuorumWriter(clients, write_quorum=2)
+    with pytest.raises(IOError):
+        writer.put_file("bucket", "other", str(path))
+    writer.drain()
+    FaultInjector().recover(event)
+
+def test_secondary_that_never_catches_up_fails_the_run(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    # Nothing reaches the secondary, so it can never serve every object
+    monkeypatch.setattr(topology_benchmark, "replicate_graph", lambda *args, **kwargs: {})
+    metrics = topology_benchmark.run_topology_test(num_files=5, min_kb=1, max_kb=2, regions=2, rto_timeout=0.5)
+    assert metrics["RTO_seconds"] == -1
+    assert metrics["RPO_data_restored_percentage"] == 0.0
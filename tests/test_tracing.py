@@ -0,0 +1,48 @@
+import json
+import os
+import time
+import pytest
+from tracing import Tracer, summarize
+
+def run_phases(tracer):
+    with tracer.span("upload") as span:
+        time.sleep(0.02)
+        span.add(bytes=2 * 1024 * 1024, objects=4, region="region1")
+    with pytest.raises(RuntimeError):
+        with tracer.span("restore"):
+            raise RuntimeError("restore failed")
+
+def test_spans_record_time_counts_and_errors(tmp_path):
+    tracer = Tracer("test bucket", trace_dir=str(tmp_path))
+    run_phases(tracer)
+    upload, restore = tracer.spans
+    assert upload.wall_seconds >= 0.02 and upload.objects == 4 and upload.attrs == {"region": "region1"}
+    # An exception escaping a span counts as one of its errors
+    assert restore.errors == 1
+    assert [phase["phase"] for phase in tracer.phases()] == ["upload", "restore"]
+    assert "offset" not in tracer.phases()[0]
+
+    path = tracer.save({"num_files": 4})
+    with open(path) as f:
+        trace = json.load(f)
+    assert os.path.basename(path).startswith("test-bucket-")
+    assert trace["params"] == {"num_files": 4} and len(trace["spans"]) == 2
+
+def test_summary_averages_phases_over_runs(tmp_path):
+    paths = []
+    for run in range(2):
+        tracer = Tracer(f"run-{run}", trace_dir=str(tmp_path))
+        run_phases(tracer)
+        paths.append(tracer.save())
+    totals = summarize(paths)
+    assert totals["upload"]["runs"] == 2 and totals["upload"]["objects"] == 8
+    assert totals["restore"]["errors"] == 2
+
+def test_profiled_phase_writes_stats(tmp_path):
+    tracer = Tracer("profiled", cprofile_phase="work", trace_dir=str(tmp_path))
+    with tracer.span("work"):
+        sum(range(1000))
+    with tracer.span("other"):
+        pass
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".prof")] == [
+        f"{tracer._file_stem()}-work.prof"]
@@ -0,0 +1,105 @@
+import json
+import socket
+import threading
+import time
+import pytest
+from wan_proxy import WanLinks, WanProxy, get_profile, load_links
+
+def echo_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+
+    def serve(conn):
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                break
+            conn.sendall(data)
+        conn.close()
+
+    def accept():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server, f"127.0.0.1:{server.getsockname()[1]}"
+
+def round_trip(endpoint, payload):
+    host, port = endpoint.rsplit(":", 1)
+    with socket.create_connection((host, int(port))) as conn:
+        conn.sendall(payload)
+        conn.shutdown(socket.SHUT_WR)
+        received = bytearray()
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                return bytes(received)
+            received += data
+
+def test_profiles_by_name_or_with_overrides():
+    assert get_profile("metro").latency == 0.001
+    custom = get_profile({"profile": "continental", "latency_ms": 5})
+    assert (custom.name, custom.latency, custom.bytes_per_second) == ("continental", 0.005, 25 * 1000 * 1000)
+    assert get_profile("local").is_local
+    with pytest.raises(ValueError):
+        get_profile("dialup")
+
+def test_links_come_from_the_topology_wan_block(tmp_path):
+    path = tmp_path / "topology.json"
+    path.write_text(json.dumps({"regions": 3, "wan": {"client_region": "region1", "default": "continental",
+                                                      "links": {"region2-region1": "metro"}}}))
+    links = load_links(topology_path=str(path))
+    assert links.for_endpoint("localhost:9001") is None
+    assert links.for_endpoint("localhost:9002").name == "metro"
+    assert links.for_endpoint("localhost:9004").name == "continental"
+    # An explicit profile replaces the default but keeps the listed links
+    assert load_links("lossy", str(path)).for_endpoint("localhost:9004").name == "lossy"
+    assert load_links(topology_path=str(tmp_path / "none.json")) is None
+    assert WanLinks({}, "local").for_endpoint("localhost:9009") is None
+
+def test_proxy_forwards_bytes_unchanged_with_the_link_latency():
+    server, target = echo_server()
+    proxy = WanProxy(target, {"name": "test", "latency_ms": 25}).start()
+    try:
+        payload = bytes(range(256)) * 1000
+        started = time.monotonic()
+        assert round_trip(proxy.endpoint, payload) == payload
+        # Connecting costs a round trip, then the data crosses the link both ways
+        assert time.monotonic() - started >= 4 * 0.025
+        summary = proxy.summary()
+        assert summary["bytes_up"] == summary["bytes_down"] == len(payload)
+        assert summary["connections"] == 1
+    finally:
+        proxy.stop()
+        server.close()
+
+def test_proxy_caps_bandwidth():
+    server, target = echo_server()
+    # 8 Mbit/s is 1 MB/s per direction
+    proxy = WanProxy(target, {"name": "slow", "bandwidth_mbit": 8}).start()
+    try:
+        started = time.monotonic()
+        round_trip(proxy.endpoint, b"x" * 300 * 1000)
+        assert time.monotonic() - started >= 0.25
+    finally:
+        proxy.stop()
+        server.close()
+
+def test_unreachable_target_counts_as_a_failed_connection():
+    server, target = echo_server()
+    server.close()
+    proxy = WanProxy(target, "local").start()
+    try:
+        # The proxy hangs up, which the client sees as a close or a reset
+        try:
+            assert round_trip(proxy.endpoint, b"hello") == b""
+        except ConnectionResetError:
+            pass
+        assert proxy.summary()["failed_connections"] == 1
+    finally:
+        proxy.stop()
@@ -0,0 +1,45 @@
+import io
+import time
+from storage_backend import InMemoryBackend
+from write_workload import WriteJournal, WriteWorkload, WORKLOAD_PREFIX, _header
+
+def test_writes_missing_from_a_lagging_copy_count_as_lost():
+    primary = InMemoryBackend()
+    secondary = InMemoryBackend()
+    secondary.make_bucket("b")
+    workload = WriteWorkload(primary, "b", rate=200, size_mix=((1, 1),), overwrite_fraction=0).start()
+    time.sleep(0.2)
+    # The secondary only holds what had landed when it last caught up
+    for obj in primary.list_objects("b", prefix=WORKLOAD_PREFIX, recursive=True):
+        data = primary.get_object("b", obj.object_name).read()
+        secondary.put_object("b", obj.object_name, io.BytesIO(data), length=len(data))
+    time.sleep(0.1)
+    failure_time = time.time()
+    workload.stop()
+
+    assert workload.analyze_loss(primary, "b", failure_time)["lost_writes"] == 0
+    loss = workload.analyze_loss(secondary, "b", failure_time)
+    copied = {obj.object_name for obj in secondary.list_objects("b", prefix=WORKLOAD_PREFIX, recursive=True)}
+    acked = [entry for entry in workload.journal.entries if entry[4] <= failure_time]
+    lost = [entry for entry in acked if entry[1] not in copied]
+    assert loss["acked_writes"] == len(acked) >= 40
+    assert loss["lost_writes"] == len(lost) > 0
+    assert loss["lost_write_bytes"] == 1024 * len(lost)
+    assert abs(loss["lost_write_window_seconds"] - (failure_time - min(entry[4] for entry in lost))) < 1e-9
+
+def test_an_older_version_of_an_overwritten_object_loses_the_newer_write():
+    client = InMemoryBackend()
+    client.make_bucket("b")
+    name = WORKLOAD_PREFIX + "obj"
+    journal = WriteJournal()
+    for seq in (1, 2):
+        data = _header(seq) + b"payload"
+        etag = client.put_object("b", name, io.BytesIO(data), length=len(data)).etag
+        journal.record(seq, name, len(data), etag, time.time())
+    assert journal.analyze_loss(client, "b", time.time())["lost_writes"] == 0
+
+    # A restore brings back the first version, with a copy whose ETag the journal does not know
+    data = _header(1) + b"restored"
+    client.put_object("b", name, io.BytesIO(data), length=len(data))
+    loss = journal.analyze_loss(client, "b", time.time())
+    assert loss["acked_writes"] == 2 and loss["lost_writes"] == 1